@@ -1,15 +1,25 @@
 import sqlite3
+import time
+import bulk_delete
+import connection_pool
+import dictionary_encoding
+import sensor_readings
+import sensor_rollups
+import stock_movements
+import warehouse_locations
+from schema_indexes import ensure_indexes
 from sqlite3 import Error
 
-def create_connection(db_file):
+def create_connection(db_file, use_pool=False):
     """
     Nawiąż połączenie z bazą danych SQLite
     :param db_file: ścieżka do pliku bazy
+    :param use_pool: True - pożycz połączenie ze wspólnej puli (connection_pool)
     :return: obiekt połączenia lub None
     """
     conn = None # inicjalizacja zmiennej conn jako None
     try: 
-        conn = sqlite3.connect(db_file) # próba połączenia z bazą danych
+        conn = connection_pool.connect(db_file) if use_pool else sqlite3.connect(db_file) # próba połączenia z bazą danych
         return conn # zwrócenie obiektu połączenia
     except Error as e: # obsługa błędu połączenia
         print(f"✗ Błąd połączenia: {e}")
@@ -59,6 +69,8 @@ def create_warehouses_table(conn):
         cur.execute(sql)    # wykonanie polecenia SQL do utworzenia tabeli warehouses
         conn.commit()   # zatwierdzenie zmian w bazie danych
         print("✓ Tabela 'warehouses' utworzona")
+        ensure_indexes(conn, tables=("warehouses",))
+        stock_movements.create_movements_table(conn)
     except Error as e:
         print(f"✗ Błąd tworzenia tabeli: {e}")
 
@@ -79,7 +91,7 @@ def add_sensor(conn, model, typ, piny):
     '''
     try:
         cur = conn.cursor()
-        cur.execute(sql, (model, typ, piny))
+        cur.execute(sql, (model, dictionary_encoding.encode_value(conn, "sensors", "typ", typ), piny))
         conn.commit()
         print(f"✓ Nowy czujnik - {model} dodany do tabeli 'sensors'")
         return cur.lastrowid # zwrócenie id nowo dodanego rekordu
@@ -111,6 +123,8 @@ def add_warehouse(conn, sensor_id, nazwa_magazynu, alejka, regał, polka, kuweta
         cur = conn.cursor()
         cur.execute(sql, (sensor_id, nazwa_magazynu, alejka, regał, polka, kuweta, ilosc_sztuk))
         conn.commit()
+        warehouse_locations.on_insert(conn, cur.lastrowid, sensor_id, nazwa_magazynu,
+                                      alejka, regał, polka, kuweta, ilosc_sztuk)
         print(f"✓ Nowy magazyn - {nazwa_magazynu} dodany do tabeli 'warehouses'")
         return cur.lastrowid # zwrócenie id nowo dodanego rekordu
     except Error as e:
@@ -143,12 +157,48 @@ ORDER BY w.nazwa_magazynu, w.alejka, w.regał, w.polka, w.kuweta
     try:
         cur = conn.cursor()
         cur.execute(sql)
-        rows = cur.fetchall()
+        rows = list(dictionary_encoding.decode_column(conn, "sensors", "typ", cur.fetchall(), 2))
         return rows
     except Error as e:
         print(f"✗ Błąd pobierania danych: {e}")
         return []
     
+    #POBRANIE zawartości alejek / regałów (indeks lokalizacji w pamięci)
+def get_aisle_contents(conn, nazwa_magazynu, alejka_od, alejka_do=None):
+    """
+    Co leży w alejkach alejka_od..alejka_do magazynu - z warehouse_locations.py, bez zapytania SQL
+    :return: lista wpisów Location posortowana jak get_sensors_in_warehouses()
+    """
+    try:
+        return warehouse_locations.get_index(conn).in_aisles(nazwa_magazynu, alejka_od, alejka_do)
+    except Error as e:
+        print(f"✗ Błąd pobierania danych: {e}")
+        return []
+
+
+def get_rack_contents(conn, nazwa_magazynu, alejka, regal_od, regal_do=None):
+    """
+    Co leży na regałach regal_od..regal_do jednej alejki
+    :return: lista wpisów Location
+    """
+    try:
+        return warehouse_locations.get_index(conn).in_racks(nazwa_magazynu, alejka, regal_od, regal_do)
+    except Error as e:
+        print(f"✗ Błąd pobierania danych: {e}")
+        return []
+
+
+def find_sensor_locations(conn, sensor_id):
+    """
+    Gdzie leży czujnik - wszystkie jego lokalizacje
+    :return: lista wpisów Location
+    """
+    try:
+        return warehouse_locations.get_index(conn).where_is(sensor_id)
+    except Error as e:
+        print(f"✗ Błąd pobierania danych: {e}")
+        return []
+
     #POBRANIE unikalnych czujników
 def get_unique_sensors(conn):
     """
@@ -168,7 +218,7 @@ def get_unique_sensors(conn):
     try:
         cur = conn.cursor()
         cur.execute(sql)
-        rows = cur.fetchall()
+        rows = list(dictionary_encoding.decode_column(conn, "sensors", "typ", cur.fetchall(), 2))
         return rows
     except Error as e:
         print(f"✗ Błąd pobierania unikalnych czujników: {e}")
@@ -191,10 +241,63 @@ def update_warehouse_quantity(conn, warehouse_id, new_quantity):
         cur = conn.cursor()
         cur.execute(sql, (new_quantity, warehouse_id))
         conn.commit()
+        warehouse_locations.on_quantity(conn, warehouse_id, new_quantity)
         print(f"✓ Zaktualizowano ilość sztuk w magazynie ID {warehouse_id} na {new_quantity}")
     except Error as e:
         print(f"✗ Błąd aktualizacji ilości sztuk: {e}")
 
+    #RUCHY magazynowe - przyjęcia i wydania o względną ilość (stock_movements.py)
+def move_stock(conn, movements):
+    """
+    Przyjmij / wydaj sztuki - zmiana o wartość względną, stan nigdy poniżej zera
+    Wszystkie ruchy trafiają do księgi stock_movements, setki ruchów na jeden commit.
+    :param conn: obiekt Connection
+    :param movements: lista krotek (warehouse_id, zmiana) lub (warehouse_id, zmiana, opis)
+    :return: lista MovementResult (ok, ilosc_po, blad) - po jednym na ruch
+    """
+    try:
+        results = stock_movements.apply_movements(conn, movements)
+        accepted = sum(1 for result in results if result.ok)
+        print(f"✓ Ruchy magazynowe: przyjęte {accepted}, odrzucone {len(results) - accepted}")
+        return results
+    except Error as e:
+        print(f"✗ Błąd ruchów magazynowych: {e}")
+        return None
+
+    #ZAPIS odczytów czujników (tabela readings)
+def add_readings(conn, readings):
+    """
+    Zapisz paczkę odczytów czujników - buforowany zapis z sensor_readings.py,
+    razem z agregatami 1m/1h/1d (sensor_rollups.py)
+    :param conn: obiekt Connection
+    :param readings: krotki (sensor_id, czas_ms, kanal, wartosc), kolejność dowolna
+    :return: słownik ze statystyką zapisu lub None przy błędzie
+    """
+    try:
+        with sensor_rollups.rollup_writer(conn) as writer:
+            writer.add_many(readings)
+        stats = writer.stats()
+        print(f"✓ Zapisano {stats['rows_written']} odczytów (spóźnionych: {stats['late_rows']})")
+        return stats
+    except Error as e:
+        print(f"✗ Błąd zapisu odczytów: {e}")
+        return None
+
+    #POBRANIE statystyk odczytów (min/max/średnia w przedziałach)
+def get_sensor_stats(conn, sensor_id, start, end, resolution, kanal=0):
+    """
+    Statystyki odczytów czujnika - z najgrubszej tabeli agregatów, która wystarcza
+    :param start, end: zakres czasu [start, end) w ms
+    :param resolution: długość przedziału w ms (np. sensor_rollups.HOUR)
+    :return: lista (okres, liczba, minimum, maksimum, srednia)
+    """
+    try:
+        _, rows = sensor_rollups.query_rollup(conn, sensor_id, start, end, resolution, kanal)
+        return rows
+    except (Error, ValueError) as e:
+        print(f"✗ Błąd pobierania statystyk: {e}")
+        return []
+
     #DELETE wszystkich rekordów z tabel
 def delete_where(conn, table, **kwargs):  #ZMIANA: użyj **kwargs
     """
@@ -204,6 +307,7 @@ def delete_where(conn, table, **kwargs):  #ZMIANA: użyj **kwargs
     :param kwargs: dict atrybutów i wartości (np. id=3)
     :return:
     """
+    kwargs = dictionary_encoding.encode_filters(conn, table, kwargs)
     qs = []
     values = tuple()
     for k, v in kwargs.items():
@@ -216,23 +320,64 @@ def delete_where(conn, table, **kwargs):  #ZMIANA: użyj **kwargs
         cur = conn.cursor()
         cur.execute(sql, values)
         conn.commit()
+        if table == "warehouses":
+            warehouse_locations.invalidate(conn)
         print(f"✓ Usunięte rekordy z tabeli {table}")
     except Error as e:
         print(f"✗ Błąd usuwania: {e}")
 
 
-def delete_all(conn, table):  #ZMIANA: osobna funkcja do usuwania wszystkich
+def delete_many(conn, table, keys, columns=("id",), progress=None):
+    """
+    Usuń wiele rekordów naraz - paczkami, jedna transakcja na paczkę
+    :param conn: Connection object
+    :param table: nazwa tabeli
+    :param keys: lista id albo lista krotek (gdy columns ma kilka kolumn)
+    :param columns: kolumny warunku, domyślnie ("id",)
+    :param progress: funkcja (przetworzone_klucze, usunięte_wiersze) po każdej paczce
+    :return: słownik z podsumowaniem lub None przy błędzie
+    """
+    try:
+        summary = bulk_delete.delete_many(conn, table, keys, columns, progress=progress)
+        if table == "warehouses":
+            warehouse_locations.invalidate(conn)
+        print(f"✓ Usunięto {summary['deleted']} rekordów z tabeli {table} ({summary['chunks']} paczek)")
+        return summary
+    except (Error, ValueError) as e:
+        print(f"✗ Błąd usuwania: {e}")
+        return None
+
+
+def delete_all(conn, table, truncate=False, reset_sequence=False, vacuum="auto"):  #ZMIANA: osobna funkcja do usuwania wszystkich
     """
     Usuń wszystkie rekordy z tabeli
     :param conn: Connection object
     :param table: nazwa tabeli
-    :return:
+    :param truncate: True - tryb truncate z odzyskaniem miejsca (np. po nocnym resecie)
+    :param reset_sequence: (truncate) wyzeruj licznik AUTOINCREMENT
+    :param vacuum: (truncate) "none" / "incremental" / "full" / "auto"
+    :return: None, a w trybie truncate słownik z raportem
     """
+    if truncate:
+        try:
+            report = bulk_delete.truncate_table(conn, table, reset_sequence, vacuum)
+            if table == "warehouses":
+                warehouse_locations.invalidate(conn)
+            print(f"✓ Wyczyszczono tabelę {table}: {report['deleted']} rekordów, "
+                  f"odzyskano {report['bytes_reclaimed']} B w {report['seconds']} s "
+                  f"(vacuum: {report['vacuum']})")
+            return report
+        except (Error, ValueError) as e:
+            print(f"✗ Błąd usuwania: {e}")
+            return None
+
     sql = f'DELETE FROM {table}'
     try:
         cur = conn.cursor()
         cur.execute(sql)
         conn.commit()
+        if table == "warehouses":
+            warehouse_locations.invalidate(conn)
         print(f"✓ Usunięte wszystkie rekordy z tabeli {table}")
     except Error as e:
         print(f"✗ Błąd usuwania: {e}")
@@ -251,6 +396,9 @@ if __name__ == "__main__":
     # Krok 2 - tworzenie tabeli sensors i warehouses
     create_sensors_table(conn)
     create_warehouses_table(conn)
+    dictionary_encoding.enable_encoding(conn, columns=[("sensors", "typ")])
+    sensor_readings.create_readings_table(conn)
+    sensor_rollups.create_rollup_tables(conn)
 
     # Krok 3 - dodawanie przykładowych danych do tabeli sensors
     print("\nDodawanie czujników do tabeli 'sensors':")
@@ -268,6 +416,22 @@ if __name__ == "__main__":
     add_warehouse(conn, 3, "Magazyn C", 2, 1, 1, 1, 75)
     add_warehouse(conn, 4, "Magazyn A", 2, 2, 1, 1, 200)
     
+    # Krok 4a - odczyty z czujników (ostatni odczyt DHT11 przychodzi spóźniony)
+    print("\nZapis odczytów do tabeli 'readings':")
+    print("-"*40)
+    teraz = int(time.time() * 1000)
+    add_readings(conn, [
+        (1, teraz - 2000, sensor_readings.CHANNELS["temperatura"], 21.5),
+        (1, teraz - 2000, sensor_readings.CHANNELS["wilgotnosc"], 40.0),
+        (2, teraz - 1000, sensor_readings.CHANNELS["odleglosc"], 12.7),
+        (1, teraz - 5000, sensor_readings.CHANNELS["temperatura"], 21.3),
+    ])
+    print(f"Najnowsza temperatura DHT11: {sensor_readings.latest_reading(conn, 1, 'temperatura')}")
+    dzis = teraz - teraz % sensor_rollups.DAY
+    for okres, liczba, minimum, maksimum, srednia in get_sensor_stats(
+            conn, 1, dzis, dzis + sensor_rollups.DAY, sensor_rollups.DAY):
+        print(f"Temperatura DHT11 dziś: {liczba} odczytów, min {minimum}, max {maksimum}, śr {srednia:.2f}")
+
     # Krok 5 - pobieranie i wyświetlanie unikalnych czujników wraz z magazynami
     print("\nLista unikalnych czujników wraz w tabeli 'sensors' :")
     print("-"*70)
@@ -282,6 +446,19 @@ if __name__ == "__main__":
         print("\nAktualizacja ilości sztuk w magazynie ID 2 na 140:")
         update_warehouse_quantity(conn, 2, 140)
 
+    # Krok 6a - zawartość alejek i lokalizacje czujnika (indeks w pamięci)
+    print("\nMagazyn A, alejki 1-2:")
+    for location in get_aisle_contents(conn, "Magazyn A", 1, 2):
+        print(f"  alejka {location.alejka} regał {location.regał} półka {location.polka} "
+              f"kuweta {location.kuweta}: czujnik {location.sensor_id}, {location.ilosc_sztuk} szt.")
+    print(f"Czujnik 4 leży w: {[(l.nazwa_magazynu, l.alejka, l.regał) for l in find_sensor_locations(conn, 4)]}")
+
+    # Krok 6c - ruchy magazynowe (wydanie ponad stan zostaje odrzucone)
+    print("\nRuchy magazynowe:")
+    for result in move_stock(conn, [(4, -30, "wydanie"), (4, +10, "zwrot"), (3, -1000, "wydanie")]) or []:
+        status = f"stan {result.ilosc_po}" if result.ok else f"odrzucony: {result.blad}"
+        print(f"  magazyn ID {result.warehouse_id}, zmiana {result.zmiana:+}: {status}")
+
     # Test DELETE
     print("\nTest DELETE:")
     print("-"*40)
@@ -298,8 +475,8 @@ if __name__ == "__main__":
 # Czyszczenie tabel jeśli baza już istniała - odkomentuj poniższe linie, aby wyczyścić tabele przy każdym uruchomieniu
 
 # Opcjonalnie: usuń wszystkie rekordy z tabel przed dodaniem nowych danych
-#    delete_all(conn, "warehouses")
-#    delete_all(conn, "sensors")
+#    delete_all(conn, "warehouses", truncate=True, vacuum="none")
+#    delete_all(conn, "sensors", truncate=True, vacuum="full")
 #!=======================================================
     
     # Krok 5 - zamknięcie połączenia
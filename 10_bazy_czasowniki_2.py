@@ -6,14 +6,15 @@
 # fetchone() - pobiera po JEDNYM wyniku za każdym razem
 
 import sqlite3
+import connection_pool
 from sqlite3 import Error
 
 
-def create_connection(db_file):
+def create_connection(db_file, use_pool=False):
     """Nawiąż połączenie z bazą danych"""
     conn = None
     try:
-        conn = sqlite3.connect(db_file)
+        conn = connection_pool.connect(db_file) if use_pool else sqlite3.connect(db_file)
         return conn
     except Error as e:
         print(e)
@@ -1,15 +1,20 @@
 import sqlite3
+import connection_pool
+import statement_cache
+from dictionary_encoding import encode_values
+from epoch_dates import date_params
 from sqlite3 import Error
 
-def create_connection(db_file):
+def create_connection(db_file, use_pool=False):
    """ create a database connection to the SQLite database
        specified by the db_file
    :param db_file: database file
+   :param use_pool: True - pożycz połączenie ze wspólnej puli (connection_pool)
    :return: Connection object or None
    """
    conn = None
    try:
-       conn = sqlite3.connect(db_file)
+       conn = connection_pool.connect(db_file) if use_pool else sqlite3.connect(db_file)
    except Error as e:
        print(e)
 
@@ -18,29 +23,51 @@ def create_connection(db_file):
 def update(conn, table, id, **kwargs):
    """
    update status, begin_date, and end date of a task
+   SQL text is cached per (table, sorted columns) and column names are
+   checked against the cached table schema (statement_cache.py)
    :param conn:
    :param table: table name
    :param id: row id
    :return:
    """
-   parameters = [f"{k} = ?" for k in kwargs]
-   parameters = ", ".join(parameters)
-   values = tuple(v for v in kwargs.values())
-   values += (id, )
-
-   sql = f''' UPDATE {table}
-             SET {parameters}
-             WHERE id = ?'''
    try:
-       cur = conn.cursor()
-       cur.execute(sql, values)
+       # status / typ jako kod ze słownika, gdy kolumna jest zakodowana (dictionary_encoding.py)
+       # daty (date / datetime) jako liczba albo tekst - zależnie od typu kolumn (epoch_dates.py)
+       kwargs = date_params(conn, table, encode_values(conn, table, kwargs))
+       sql, columns = statement_cache.prepare_update(conn, table, kwargs)
+       values = tuple(kwargs[c] for c in columns) + (id, )
+       conn.execute(sql, values)
        conn.commit()
        print("OK")
    except sqlite3.OperationalError as e:
        print(e)
 
+def update_many(conn, table, rows):
+   """
+   update many rows at once - one executemany per column set
+   :param conn:
+   :param table: table name
+   :param rows: list of dicts, each with "id" and the columns to change
+   :return: number of updated rows
+   """
+   try:
+       # every row is checked before the first one is encoded or written
+       rows = list(rows)
+       statement_cache.check_rows(rows)
+       rows = [date_params(conn, table, encode_values(conn, table, row)) for row in rows]
+       changed = statement_cache.update_many(conn, table, rows)
+       print(f"OK ({changed} rows)")
+       return changed
+   except (sqlite3.OperationalError, ValueError) as e:
+       print(e)
+       return 0
+
 if __name__ == "__main__":
    conn = create_connection("database.db")
    update(conn, "tasks", 2, status="started")
    update(conn, "tasks", 2, stat="started")
+   update_many(conn, "tasks", [
+       {"id": 1, "status": "started"},
+       {"id": 2, "status": "started", "end_date": "2020-05-12 15:00:00"},
+   ])
    conn.close()
\ No newline at end of file
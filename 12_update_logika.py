@@ -230,6 +230,29 @@ DLACZEGO TO JEST TAKIE SPRYTNE?
    - update(conn, "projects", 5, nazwa="Nowy projekt")
 
 
+WERSJA Z CACHE (11_update.py + statement_cache.py):
+====================================================
+
+Kroki 1-5 są takie same dla każdego wywołania z tymi samymi kolumnami,
+więc nie ma sensu powtarzać ich tysiące razy:
+
+1. Klucz cache = (tabela, posortowane kolumny)
+   - update(conn, "tasks", 2, status="x", end_date="y")
+   - update(conn, "tasks", 5, end_date="y", status="x")
+   → ten sam klucz ("tasks", ("end_date", "status")) → ten sam tekst SQL
+
+2. Ten sam tekst SQL = sqlite3 używa już przygotowanego polecenia
+   (moduł sqlite3 ma własny cache poleceń, kluczem jest tekst SQL)
+
+3. Kolumny sprawdzamy z zapamiętanym schematem tabeli
+   - update(conn, "tasks", 2, stat="started")
+   → "no such column: stat" jeszcze PRZED wysłaniem SQL do bazy
+
+4. update_many(conn, "tasks", [{"id": 1, "status": "x"}, ...])
+   - wiersze grupowane po zestawie kolumn
+   - jedno executemany() na grupę, jeden commit na całość
+
+
 ANALOGIA DO CODZIENNEGO ŻYCIA:
 ==============================
 
@@ -248,13 +271,16 @@ Wyobraź sobie, że aktualizujesz danymi formularz w systemie:
 if __name__ == "__main__":
     import sqlite3
     from sqlite3 import Error
+
+    import connection_pool
     
     # Funkcje z oryginalnego kodu
     
-    def create_connection(db_file):
+    def create_connection(db_file, use_pool=False):
         conn = None
         try:
-            conn = sqlite3.connect(db_file)
+            # use_pool - pożycz połączenie ze wspólnej puli (connection_pool)
+            conn = connection_pool.connect(db_file) if use_pool else sqlite3.connect(db_file)
         except Error as e:
             print(e)
         return conn
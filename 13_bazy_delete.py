@@ -5,18 +5,22 @@
 # Delete with conditions, delete all
 
 import sqlite3
+import bulk_delete
+import connection_pool
+from dictionary_encoding import encode_filters
 from sqlite3 import Error
 
 
-def create_connection(db_file):
+def create_connection(db_file, use_pool=False):
     """
     Nawiąż połączenie z bazą danych SQLite
     :param db_file: ścieżka do pliku bazy
+    :param use_pool: True - pożycz połączenie ze wspólnej puli (connection_pool)
     :return: Connection object or None
     """
     conn = None
     try:
-        conn = sqlite3.connect(db_file)
+        conn = connection_pool.connect(db_file) if use_pool else sqlite3.connect(db_file)
         return conn
     except Error as e:
         print(f"Błąd połączenia: {e}")
@@ -128,7 +132,8 @@ def delete_where(conn, table, **kwargs):
     # Usuwa wiersz gdzie id=3 AND status="Ukończone"
     """
     
-    # KROK 1: Budowanie warunków
+    # KROK 1: Budowanie warunków (status jako kod, gdy kolumna jest zakodowana)
+    kwargs = encode_filters(conn, table, kwargs)
     qs = []  # Collect conditions like ["id=?", "status=?"]
     values = tuple()  # Collect values like (3, "Ukończone")
     
@@ -152,13 +157,48 @@ def delete_where(conn, table, **kwargs):
         print(f"✗ Błąd: {e}")
 
 
-def delete_all(conn, table):
+def delete_many(conn, table, keys, columns=("id",), progress=None):
+    """
+    Usuń WIELE rekordów naraz - paczkami zamiast jednego DELETE na rekord
+    
+    :param conn: Connection to the SQLite database
+    :param table: nazwa tabeli
+    :param keys: lista id albo lista krotek (gdy columns ma kilka kolumn)
+    :param columns: kolumny warunku, domyślnie ("id",)
+    :param progress: funkcja (przetworzone_klucze, usunięte_wiersze) po każdej paczce
+    :return: słownik z podsumowaniem lub None przy błędzie
+    
+    PRZYKŁAD:
+    ---------
+    delete_many(conn, "tasks", [1, 2, 3])
+    # DELETE FROM tasks WHERE id IN (?, ?, ?)
+    
+    delete_many(conn, "tasks", [(1, "Ukończone"), (2, "W trakcie")],
+                columns=("project_id", "status"))
+    # DELETE FROM tasks WHERE (project_id, status) IN (VALUES (?, ?), (?, ?))
+    
+    Paczka ma tyle kluczy, ile pozwala limit parametrów SQLite,
+    i każda paczka to jedna transakcja (jeden commit).
+    """
+    try:
+        summary = bulk_delete.delete_many(conn, table, keys, columns, progress=progress)
+        print(f"✓ Deleted {summary['deleted']} rows in {summary['chunks']} chunk(s)")
+        return summary
+    except (Error, ValueError) as e:
+        print(f"✗ Błąd: {e}")
+        return None
+
+
+def delete_all(conn, table, truncate=False, reset_sequence=False, vacuum="auto"):
     """
     Usuń WSZYSTKIE rekordy z tabeli
     
     :param conn: Connection to the SQLite database
     :param table: nazwa tabeli
-    :return: None
+    :param truncate: True - tryb truncate z odzyskaniem miejsca (bulk_delete.truncate_table)
+    :param reset_sequence: (truncate) wyzeruj licznik AUTOINCREMENT
+    :param vacuum: (truncate) "none" / "incremental" / "full" / "auto"
+    :return: None, a w trybie truncate słownik z raportem
     
     LOGIKA:
     -------
@@ -174,8 +214,25 @@ def delete_all(conn, table):
     --------
     Ta funkcja jest niebezpieczna - usuwa wszystkie dane!
     Zawsze upewnij się że na pewno chcesz usunąć wszystko.
+    
+    TRYB TRUNCATE:
+    --------------
+    delete_all(conn, "tasks", truncate=True, vacuum="full")
+    # Usuwa wszystko, potem VACUUM zmniejsza plik bazy
+    # ✓ Truncated tasks: 5 rows, reclaimed 8192 B in 0.004 s (vacuum: full)
     """
     
+    if truncate:
+        try:
+            report = bulk_delete.truncate_table(conn, table, reset_sequence, vacuum)
+            print(f"✓ Truncated {table}: {report['deleted']} rows, "
+                  f"reclaimed {report['bytes_reclaimed']} B in {report['seconds']} s "
+                  f"(vacuum: {report['vacuum']})")
+            return report
+        except (Error, ValueError) as e:
+            print(f"✗ Błąd: {e}")
+            return None
+    
     # KROK 1: Budowanie SQL BEZ warunku WHERE
     sql = f'DELETE FROM {table}'
     
@@ -222,11 +279,18 @@ if __name__ == "__main__":
             print(f"  ID: {task[0]}, Nazwa: {task[2]}, Status: {task[4]}")
         print()
         
+        # ============ USUNIĘCIE WIELU NARAZ ============
+        print("OPERACJA 2: delete_many(conn, 'tasks', [1, 2])")
+        print("-" * 70)
+        print("Usuwamy zadania o ID 1 i 2 jednym poleceniem\n")
+        delete_many(conn, "tasks", [1, 2])
+        print()
+        
         # ============ USUNIĘCIE WSZYSTKICH ============
-        print("OPERACJA 2: delete_all(conn, 'tasks')")
+        print("OPERACJA 3: delete_all(conn, 'tasks')")
         print("-" * 70)
         print("UWAGA: To usunie WSZYSTKIE zadania!\n")
-        delete_all(conn, "tasks")
+        delete_all(conn, "tasks", truncate=True, vacuum="full")
         
         print("\nStan po usunięciu WSZYSTKICH:")
         print("-" * 70)
@@ -7,22 +7,40 @@
 # Temat: Zarządzanie kolekcją książek bibliotecznej
 
 import sqlite3
+import connection_pool
+import pragma_profiles
+from schema_indexes import ensure_indexes
+from table_counters import install_counters, count_rows
+import book_search
+import availability_index
+from streaming import iter_rows, DEFAULT_BATCH_SIZE
 from sqlite3 import Error
 
 
-def create_connection(db_file):
+def create_connection(db_file, use_pool=False, profile=None, tracer=None):
     """
     KROK 1: POŁĄCZENIE Z BAZĄ
     Nawiąż połączenie z bazą danych SQLite
     
     :param db_file: ścieżka do pliku bazy
+    :param use_pool: True - pożycz połączenie ze wspólnej puli (connection_pool)
+    :param profile: profil PRAGMA z pragma_profiles, np. "balanced" (None = domyślne SQLite)
+    :param tracer: QueryTracer z query_tracing - mierzy czas każdego zapytania
     :return: Connection object or None
     """
     conn = None
     try:
-        conn = sqlite3.connect(db_file)
+        # Nieznany profil zgłaszamy, zanim otworzymy plik bazy
+        pragma_profiles.check_profile(profile)
+        if use_pool:
+            conn = connection_pool.connect(db_file, profile=profile)
+        else:
+            conn = sqlite3.connect(db_file)
+            pragma_profiles.apply_profile(conn, profile)
+        if tracer is not None:
+            conn = tracer.attach(conn)
         return conn
-    except Error as e:
+    except (Error, ValueError) as e:
         print(f"✗ Błąd połączenia: {e}")
     return conn
 
@@ -60,6 +78,10 @@ def create_tables(conn):
         cur.execute(create_categories_sql)
         cur.execute(create_books_sql)
         conn.commit()
+        ensure_indexes(conn, tables=("books",))
+        install_counters(conn, tables=("books",))
+        book_search.install_search_index(conn)
+        availability_index.install_version_tracking(conn)
         print("✓ Tabele utworzone\n")
     except Error as e:
         print(f"✗ Błąd: {e}")
@@ -92,6 +114,7 @@ def add_book(conn, tytul, autor, rok, category_id):
         cur = conn.cursor()
         cur.execute(sql, (tytul, autor, rok, category_id))
         conn.commit()
+        availability_index.on_insert(conn, cur.lastrowid, category_id)
         print(f"✓ Dodano książkę: {tytul}")
         return cur.lastrowid
     except Error as e:
@@ -99,10 +122,10 @@ def add_book(conn, tytul, autor, rok, category_id):
         return None
 
 
-def select_all_books(conn):
+def iter_all_books(conn, batch_size=DEFAULT_BATCH_SIZE):
     """
-    KROK 4: POBIERANIE DANYCH (READ - SELECT)
-    Pobierz wszystkie książki z bazy
+    KROK 4: POBIERANIE DANYCH (READ - SELECT) - wersja strumieniowa
+    Generator książek pobieranych partiami fetchmany()
     """
     sql = """
     SELECT books.id, books.tytul, books.autor, books.rok_wydania, 
@@ -110,11 +133,16 @@ def select_all_books(conn):
     FROM books
     INNER JOIN categories ON books.category_id = categories.id
     """
+    return iter_rows(conn, sql, batch_size=batch_size)
+
+
+def select_all_books(conn):
+    """
+    KROK 4: POBIERANIE DANYCH (READ - SELECT)
+    Pobierz wszystkie książki z bazy
+    """
     try:
-        cur = conn.cursor()
-        cur.execute(sql)
-        rows = cur.fetchall()
-        return rows
+        return list(iter_all_books(conn))
     except Error as e:
         print(f"✗ Błąd: {e}")
         return []
@@ -139,17 +167,28 @@ def select_books_by_category(conn, category_id):
         return []
 
 
+def search_books(conn, fraza, limit=20):
+    """
+    KROK 4: POBIERANIE DANYCH (WYSZUKIWANIE PEŁNOTEKSTOWE)
+    Znajdź książki po fragmencie tytułu lub autora (indeks FTS5 z book_search.py)
+    - prefiksy słów: "mistr małg" → "Mistrz i Małgorzata"
+    - bez polskich znaków: "malgorzata" też zadziała
+    """
+    try:
+        return book_search.search(conn, fraza, limit=limit)
+    except Error as e:
+        print(f"✗ Błąd: {e}")
+        return []
+
+
 def count_books(conn):
     """
     KROK 4: POBIERANIE DANYCH (COUNT)
     Policz ile jest wszystkich książek
+    - licznik utrzymywany przez triggery (table_counters.py), bez niego COUNT(*)
     """
-    sql = "SELECT COUNT(*) FROM books"
     try:
-        cur = conn.cursor()
-        cur.execute(sql)
-        result = cur.fetchone()
-        return result[0]
+        return count_rows(conn, "books")
     except Error as e:
         print(f"✗ Błąd: {e}")
         return 0
@@ -165,12 +204,41 @@ def update_book_availability(conn, book_id, dostepna):
         cur = conn.cursor()
         cur.execute(sql, (dostepna, book_id))
         conn.commit()
+        availability_index.on_update(conn, book_id, dostepna)
         status = "dostępna" if dostepna else "wypożyczona"
         print(f"✓ Książka teraz: {status}")
     except Error as e:
         print(f"✗ Błąd: {e}")
 
 
+def count_available_books(conn, category_id):
+    """
+    KROK 5: DOSTĘPNOŚĆ Z INDEKSU W PAMIĘCI
+    Ile książek z kategorii jest dostępnych - bitmapy z availability_index.py,
+    bez przeglądania tabeli (indeks ładowany raz, zmieniany razem z UPDATE;
+    przed odczytem jedno krótkie zapytanie sprawdza, czy baza się nie zmieniła)
+    :return: krotka (dostępne, wszystkie)
+    """
+    try:
+        index = availability_index.get_index(conn)
+        return index.count_available(category_id), index.count_total(category_id)
+    except Error as e:
+        print(f"✗ Błąd: {e}")
+        return 0, 0
+
+
+def available_book_ids(conn, category_id):
+    """
+    KROK 5: DOSTĘPNOŚĆ Z INDEKSU W PAMIĘCI
+    Posortowana lista id dostępnych książek z kategorii
+    """
+    try:
+        return availability_index.get_index(conn).available_ids(category_id)
+    except Error as e:
+        print(f"✗ Błąd: {e}")
+        return []
+
+
 def delete_book(conn, book_id):
     """
     KROK 6: USUWANIE DANYCH (DELETE Z WARUNKIEM)
@@ -181,6 +249,7 @@ def delete_book(conn, book_id):
         cur = conn.cursor()
         cur.execute(sql, (book_id,))
         conn.commit()
+        availability_index.on_delete(conn, book_id)
         print(f"✓ Usunięto książkę o ID {book_id}")
     except Error as e:
         print(f"✗ Błąd: {e}")
@@ -262,11 +331,21 @@ if __name__ == "__main__":
             print(f"  • {book[1]} - {book[2]} ({book[3]})")
         print()
         
+        # Wyszukiwanie po fragmencie tytułu/autora - bez polskich znaków
+        print("Wyszukiwanie: 'mistrz malgo'")
+        print("-" * 80)
+        for book in search_books(conn, "mistrz malgo"):
+            print(f"  • {book[1]} - {book[2]} ({book[3]})")
+        print()
+        
         # KROK 5: AKTUALIZACJA DANYCH (UPDATE)
         print("\nKROK 5: Aktualizacja danych (UPDATE)")
         print("-" * 80)
         print("Symulacja: Wypożyczenie książki 'Clean Code'")
         update_book_availability(conn, 4, 0)  # dostepna = 0 (wypożyczona)
+        dostepne, wszystkie = count_available_books(conn, cat_programming)
+        print(f"  Programowanie: dostępne {dostepne}/{wszystkie}, "
+              f"id: {available_book_ids(conn, cat_programming)}")
         
         print("\nSymulacja: Zwrot książki 'Clean Code'")
         update_book_availability(conn, 4, 1)  # dostepna = 1 (dostępna)
@@ -285,7 +364,8 @@ if __name__ == "__main__":
         display_all_books(conn)
         display_statistics(conn)
         
-        # ZAMKNIĘCIE POŁĄCZENIA
+        # ZAMKNIĘCIE POŁĄCZENIA - snapshot indeksu dostępności na następne uruchomienie
+        availability_index.save_index(conn)
         conn.close()
         print("✓ Połączenie zamknięte\n")
         
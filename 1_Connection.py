@@ -1,13 +1,17 @@
 # `ex_01_conection_to_db.py`
 
 import sqlite3
+import connection_pool
 from sqlite3 import Error
 
-def create_connection(db_file):
-   """ create a database connection to a SQLite database """
+def create_connection(db_file, use_pool=False):
+   """ create a database connection to a SQLite database
+   :param use_pool: True - pożycz połączenie ze wspólnej puli (connection_pool),
+                    close() oddaje je do puli zamiast zamykać plik
+   """
    conn = None
    try:
-       conn = sqlite3.connect(db_file)
+       conn = connection_pool.connect(db_file) if use_pool else sqlite3.connect(db_file)
        print(f"Connected to {db_file}, sqlite version: {sqlite3.version}")
    except Error as e:
        print(e)
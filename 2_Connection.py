@@ -1,18 +1,20 @@
 # ex_02_create_tables.py
 
 import sqlite3 # import the sqlite3 library
+import connection_pool
 from sqlite3 import Error # import the Error class
 from tkinter import INSERT # import INSERT constant - 
 
-def create_connection(db_file): 
+def create_connection(db_file, use_pool=False):
    """ create a database connection to the SQLite database
        specified by db_file
    :param db_file: database file
+   :param use_pool: True - pożycz połączenie ze wspólnej puli (connection_pool)
    :return: Connection object or None
    """
    conn = None # inicjalizacja zmiennej conn jako None
    try:
-       conn = sqlite3.connect(db_file) # próba połączenia z bazą danych
+       conn = connection_pool.connect(db_file) if use_pool else sqlite3.connect(db_file) # próba połączenia z bazą danych
        return conn
    except Error as e:
        print(e)
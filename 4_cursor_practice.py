@@ -5,18 +5,20 @@
 # jak używać kursora do komunikacji z bazą danych
 
 import sqlite3
+import connection_pool
 from sqlite3 import Error
 
 
-def create_connection(db_file):
+def create_connection(db_file, use_pool=False):
     """
     Nawiąz połączenie z bazą danych SQLite
     :param db_file: ścieżka do pliku bazy danych
+    :param use_pool: True - pożycz połączenie ze wspólnej puli (connection_pool)
     :return: obiekt Connection lub None
     """
     conn = None
     try:
-        conn = sqlite3.connect(db_file)
+        conn = connection_pool.connect(db_file) if use_pool else sqlite3.connect(db_file)
         print(f"✓ Połączenie z bazą '{db_file}' nawiązane")
         return conn
     except Error as e:
@@ -4,22 +4,41 @@
 # Zaawansowany przykład z funkcjami do wstawiania projektów i zadań
 # Kursor jest teraz ukryty wewnątrz funkcji - czystszy kod!
 
-import sqlite3
+import connection_pool
+import pragma_profiles
+from schema_indexes import ensure_indexes
+from table_counters import install_counters
+import epoch_dates
+from epoch_dates import date_param, enable_epoch_dates, tasks_between
+from dictionary_encoding import enable_encoding, encode_value, decode_column
+from streaming import iter_rows, DEFAULT_BATCH_SIZE
 from sqlite3 import Error
 
 
-def create_connection(db_file):
+def create_connection(db_file, use_pool=False, profile=None, tracer=None):
     """
     Nawiąz połączenie z bazą danych SQLite
     :param db_file: ścieżka do pliku bazy danych
+    :param use_pool: True - pożycz połączenie ze wspólnej puli (connection_pool)
+    :param profile: profil PRAGMA z pragma_profiles, np. "balanced" (None = domyślne SQLite)
+    :param tracer: QueryTracer z query_tracing - mierzy czas każdego zapytania
     :return: obiekt Connection
     """
     conn = None
     try:
-        conn = sqlite3.connect(db_file)
+        # Nieznany profil zgłaszamy, zanim otworzymy plik bazy
+        pragma_profiles.check_profile(profile)
+        if use_pool:
+            conn = connection_pool.connect(db_file, profile=profile)
+        else:
+            # Daty z kolumn EPOCH (epoch_dates.py) wracają jako datetime
+            conn = epoch_dates.connect(db_file)
+            pragma_profiles.apply_profile(conn, profile)
+        if tracer is not None:
+            conn = tracer.attach(conn)
         print(f"✓ Połączenie z bazą '{db_file}' nawiązane")
         return conn
-    except Error as e:
+    except (Error, ValueError) as e:
         print(f"✗ Błąd połączenia: {e}")
         return None
 
@@ -27,15 +46,15 @@ def create_connection(db_file):
 def add_project(conn, project):
     """
     Dodaj nowy projekt do tabeli projects
-    :param conn: obiekt Connection
-    :param project: krotka (nazwa, start_date, end_date)
+    :param conn: obiekt Connection lub GroupCommitWriter (commit grupowy, patrz group_commit.py)
+    :param project: krotka (nazwa, start_date, end_date) - daty jako tekst, date lub datetime
     :return: ID nowo dodanego projektu
     """
     sql = '''INSERT INTO projects(nazwa, start_date, end_date)
              VALUES(?, ?, ?)'''
     try:
         cur = conn.cursor()
-        cur.execute(sql, project)
+        cur.execute(sql, (project[0], *(date_param(conn, "projects", value) for value in project[1:])))
         conn.commit()
         print(f"✓ Projekt '{project[0]}' dodany z ID: {cur.lastrowid}")
         return cur.lastrowid
@@ -47,15 +66,17 @@ def add_project(conn, project):
 def add_task(conn, task):
     """
     Dodaj nowe zadanie do tabeli tasks
-    :param conn: obiekt Connection
-    :param task: krotka (project_id, nazwa, opis, status, start_date, end_date)
+    :param conn: obiekt Connection lub GroupCommitWriter (commit grupowy, patrz group_commit.py)
+    :param task: krotka (project_id, nazwa, opis, status, start_date, end_date) - daty jak w add_project()
     :return: ID nowo dodanego zadania
     """
     sql = '''INSERT INTO tasks(project_id, nazwa, opis, status, start_date, end_date)
              VALUES(?, ?, ?, ?, ?, ?)'''
     try:
         cur = conn.cursor()
-        cur.execute(sql, task)
+        # Status jako kod ze słownika (dictionary_encoding.py), gdy kolumna jest zakodowana
+        cur.execute(sql, (*task[:3], encode_value(conn, "tasks", "status", task[3]),
+                          *(date_param(conn, "tasks", value) for value in task[4:])))
         conn.commit()
         print(f"✓ Zadanie '{task[1]}' dodane z ID: {cur.lastrowid}")
         return cur.lastrowid
@@ -64,17 +85,44 @@ def add_task(conn, task):
         return None
 
 
+def iter_all_projects(conn, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Generator projektów - pobiera wiersze partiami zamiast całej tabeli naraz
+    :param conn: obiekt Connection
+    :param batch_size: ile wierszy na jedno fetchmany()
+    """
+    return iter_rows(conn, 'SELECT * FROM projects', batch_size=batch_size)
+
+
+def iter_all_tasks(conn, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Generator zadań - pobiera wiersze partiami zamiast całej tabeli naraz
+    :param conn: obiekt Connection
+    :param batch_size: ile wierszy na jedno fetchmany()
+    """
+    rows = iter_rows(conn, 'SELECT * FROM tasks', batch_size=batch_size)
+    return decode_column(conn, "tasks", "status", rows, 4)
+
+
+def iter_tasks_by_project(conn, project_id, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Generator zadań danego projektu
+    :param conn: obiekt Connection
+    :param project_id: ID projektu
+    :param batch_size: ile wierszy na jedno fetchmany()
+    """
+    rows = iter_rows(conn, 'SELECT * FROM tasks WHERE project_id = ?', (project_id,), batch_size)
+    return decode_column(conn, "tasks", "status", rows, 4)
+
+
 def get_all_projects(conn):
     """
     Pobierz wszystkie projekty
     :param conn: obiekt Connection
     :return: lista projektów
     """
-    sql = 'SELECT * FROM projects'
     try:
-        cur = conn.cursor()
-        cur.execute(sql)
-        projects = cur.fetchall()
+        projects = list(iter_all_projects(conn))
         return projects
     except Error as e:
         print(f"✗ Błąd pobierania projektów: {e}")
@@ -87,11 +135,8 @@ def get_all_tasks(conn):
     :param conn: obiekt Connection
     :return: lista zadań
     """
-    sql = 'SELECT * FROM tasks'
     try:
-        cur = conn.cursor()
-        cur.execute(sql)
-        tasks = cur.fetchall()
+        tasks = list(iter_all_tasks(conn))
         return tasks
     except Error as e:
         print(f"✗ Błąd pobierania zadań: {e}")
@@ -105,17 +150,31 @@ def get_tasks_by_project(conn, project_id):
     :param project_id: ID projektu
     :return: lista zadań należących do projektu
     """
-    sql = 'SELECT * FROM tasks WHERE project_id = ?'
     try:
-        cur = conn.cursor()
-        cur.execute(sql, (project_id,))
-        tasks = cur.fetchall()
+        tasks = list(iter_tasks_by_project(conn, project_id))
         return tasks
     except Error as e:
         print(f"✗ Błąd pobierania zadań: {e}")
         return None
 
 
+def get_tasks_between(conn, start, end, project_id=None):
+    """
+    Pobierz zadania trwające choć chwilę w przedziale [start, end]
+    Po create_tables(conn, epoch_dates=True) zapytanie korzysta z indeksu przedziałów.
+    :param conn: obiekt Connection
+    :param start: początek - tekst "RRRR-MM-DD", date lub datetime
+    :param end: koniec (włącznie)
+    :param project_id: tylko zadania tego projektu (None = wszystkie)
+    :return: lista zadań posortowana po dacie rozpoczęcia
+    """
+    try:
+        return list(decode_column(conn, "tasks", "status", tasks_between(conn, start, end, project_id), 4))
+    except (Error, ValueError) as e:
+        print(f"✗ Błąd pobierania zadań: {e}")
+        return None
+
+
 def update_project(conn, project_id, new_name):
     """
     Zaktualizuj nazwę projektu
@@ -147,7 +206,7 @@ def update_task_status(conn, task_id, new_status):
     sql = 'UPDATE tasks SET status = ? WHERE id = ?'
     try:
         cur = conn.cursor()
-        cur.execute(sql, (new_status, task_id))
+        cur.execute(sql, (encode_value(conn, "tasks", "status", new_status), task_id))
         conn.commit()
         print(f"✓ Zadanie o ID {task_id} zmienione na status: {new_status}")
         return True
@@ -224,10 +283,12 @@ def print_tasks(tasks):
         print("Brak zadań w bazie")
 
 
-def create_tables(conn):
+def create_tables(conn, epoch_dates=False, encode_status=False):
     """
     Stwórz tabele projects i tasks
     :param conn: obiekt Connection
+    :param epoch_dates: True - daty jako liczby sekund + indeks przedziałów (epoch_dates.py)
+    :param encode_status: True - status jako kod ze słownika task_statuses (dictionary_encoding.py)
     """
     create_projects_sql = """
     CREATE TABLE IF NOT EXISTS projects (
@@ -257,6 +318,12 @@ def create_tables(conn):
         cur.execute(create_tasks_sql)
         conn.commit()
         print("✓ Tabele utworzone pomyślnie")
+        ensure_indexes(conn, tables=("tasks",))
+        install_counters(conn, tables=("projects", "tasks"))
+        if epoch_dates:
+            enable_epoch_dates(conn)
+        if encode_status:
+            enable_encoding(conn, columns=[("tasks", "status")])
     except Error as e:
         print(f"✗ Błąd tworzenia tabel: {e}")
 
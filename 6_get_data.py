@@ -5,19 +5,29 @@
 # Uczymy się SELECT, fetchall(), fetchone() i różnych sposobów
 # wyświetlania danych pobranych z bazy
 
-import sqlite3
+import connection_pool
+import epoch_dates
+from schema_indexes import ensure_indexes
+from table_counters import install_counters, has_counters, tasks_per_project
+from streaming import iter_rows, DEFAULT_BATCH_SIZE
+from dictionary_encoding import encode, decode_column
 from sqlite3 import Error
 
 
-def create_connection(db_file):
+def create_connection(db_file, use_pool=False, tracer=None):
     """
     Nawiąż połączenie z bazą danych SQLite
     :param db_file: ścieżka do pliku bazy danych
+    :param use_pool: True - pożycz połączenie ze wspólnej puli (connection_pool)
+    :param tracer: QueryTracer z query_tracing - mierzy czas każdego zapytania
     :return: obiekt Connection
     """
     conn = None
     try:
-        conn = sqlite3.connect(db_file)
+        # epoch_dates.connect - daty z kolumn EPOCH wracają jako datetime
+        conn = connection_pool.connect(db_file) if use_pool else epoch_dates.connect(db_file)
+        if tracer is not None:
+            conn = tracer.attach(conn)
         print(f"✓ Połączenie z bazą '{db_file}' nawiązane\n")
         return conn
     except Error as e:
@@ -57,6 +67,8 @@ def create_tables(conn):
         cur.execute(create_tasks_sql)
         conn.commit()
         print("✓ Tabele utworzone")
+        ensure_indexes(conn, tables=("tasks",))
+        install_counters(conn, tables=("projects", "tasks"))
     except Error as e:
         print(f"✗ Błąd tworzenia tabel: {e}")
 
@@ -94,6 +106,33 @@ def add_sample_data(conn):
         print(f"✗ Błąd dodawania danych: {e}")
 
 
+def iter_all_projects(conn, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Generator wszystkich projektów - wiersze pobierane partiami fetchmany()
+    :param batch_size: ile wierszy na jedno fetchmany()
+    """
+    return iter_rows(conn, "SELECT * FROM projects;", batch_size=batch_size)
+
+
+def iter_all_tasks(conn, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Generator wszystkich zadań - wiersze pobierane partiami fetchmany()
+    """
+    return decode_column(conn, "tasks", "status", iter_rows(conn, "SELECT * FROM tasks;", batch_size=batch_size), 4)
+
+
+def iter_with_join(conn, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Generator wyników JOIN projects + tasks (projekt, zadanie, status)
+    """
+    sql = """
+    SELECT projects.nazwa AS projekt, tasks.nazwa AS zadanie, tasks.status
+    FROM tasks
+    INNER JOIN projects ON tasks.project_id = projects.id;
+    """
+    return decode_column(conn, "tasks", "status", iter_rows(conn, sql, batch_size=batch_size), 2)
+
+
 def select_all_projects(conn):
     """
     ĆWICZENIE 1: Pobierz wszystkie projekty
@@ -103,18 +142,9 @@ def select_all_projects(conn):
     print("ĆWICZENIE 1: SELECT * - Pobieranie wszystkich projektów")
     print("="*70)
     
-    # Zapytanie SQL
-    sql = "SELECT * FROM projects;"
-    
     try:
-        # Tworzenie kursora
-        cur = conn.cursor()
-        
-        # Wykonanie zapytania
-        cur.execute(sql)
-        
-        # Pobranie WSZYSTKICH wyników za pomocą fetchall()
-        projects = cur.fetchall()
+        # Pobranie WSZYSTKICH wyników - lista budowana z generatora
+        projects = list(iter_all_projects(conn))
         
         print(f"\nZnaleziono {len(projects)} projektów:\n")
         
@@ -137,12 +167,8 @@ def select_all_tasks(conn):
     print("ĆWICZENIE 2: Pobieranie wszystkich zadań")
     print("="*70)
     
-    sql = "SELECT * FROM tasks;"
-    
     try:
-        cur = conn.cursor()
-        cur.execute(sql)
-        tasks = cur.fetchall()
+        tasks = list(iter_all_tasks(conn))
         
         print(f"\nZnaleziono {len(tasks)} zadań:\n")
         
@@ -171,7 +197,7 @@ def select_specific_columns(conn):
     try:
         cur = conn.cursor()
         cur.execute(sql)
-        results = cur.fetchall()
+        results = list(decode_column(conn, "tasks", "status", cur.fetchall(), 1))
         
         print("\nNazwa zadania | Status")
         print("-" * 50)
@@ -200,8 +226,8 @@ def select_with_where(conn):
     
     try:
         cur = conn.cursor()
-        cur.execute(sql, ("W trakcie",))
-        results = cur.fetchall()
+        cur.execute(sql, (encode(conn, "tasks", "status", "W trakcie"),))
+        results = list(decode_column(conn, "tasks", "status", cur.fetchall(), 4))
         
         print("\nZadania ze statusem 'W trakcie':\n")
         
@@ -224,16 +250,8 @@ def select_with_join(conn):
     print("ĆWICZENIE 5: SELECT z JOIN - łączenie tabel")
     print("="*70)
     
-    sql = """
-    SELECT projects.nazwa AS projekt, tasks.nazwa AS zadanie, tasks.status
-    FROM tasks
-    INNER JOIN projects ON tasks.project_id = projects.id;
-    """
-    
     try:
-        cur = conn.cursor()
-        cur.execute(sql)
-        results = cur.fetchall()
+        results = list(iter_with_join(conn))
         
         print("\nProjekt | Zadanie | Status")
         print("-" * 70)
@@ -279,6 +297,7 @@ def select_with_group_by(conn):
     """
     ĆWICZENIE 7: GROUP BY - grupowanie wyników
     Zlicz ile zadań jest w każdym projekcie
+    - jeśli baza ma liczniki z table_counters.py, sumujemy je zamiast zliczać wiersze tasks
     """
     print("\n" + "="*70)
     print("ĆWICZENIE 7: GROUP BY - grupowanie i zliczanie")
@@ -292,9 +311,12 @@ def select_with_group_by(conn):
     """
     
     try:
-        cur = conn.cursor()
-        cur.execute(sql)
-        results = cur.fetchall()
+        if has_counters(conn, "tasks"):
+            results = tasks_per_project(conn)
+        else:
+            cur = conn.cursor()
+            cur.execute(sql)
+            results = cur.fetchall()
         
         print("\nProjekt | Liczba zadań")
         print("-" * 40)
@@ -351,7 +373,7 @@ def select_with_limit(conn):
     try:
         cur = conn.cursor()
         cur.execute(sql)
-        results = cur.fetchall()
+        results = list(decode_column(conn, "tasks", "status", cur.fetchall(), 4))
         
         print("\nPierwsze 3 zadania:\n")
         
@@ -384,7 +406,7 @@ def select_tasks_by_project(conn, project_id):
     try:
         cur = conn.cursor()
         cur.execute(sql, (project_id,))
-        results = cur.fetchall()
+        results = list(decode_column(conn, "tasks", "status", cur.fetchall(), 4))
         
         if results:
             print(f"\nProjekt: {results[0][7]}")
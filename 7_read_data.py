@@ -4,17 +4,25 @@
 # Program na podstawie materiałów z PDFs
 # Pokazuje praktyczną implementację pobierania danych z bazy
 
-import sqlite3
+import connection_pool
+import epoch_dates
+from table_counters import install_counters, count_rows
+from dictionary_encoding import encode, decode_column
 from sqlite3 import Error
 
 
-def create_connection(db_file):
+def create_connection(db_file, use_pool=False, tracer=None):
     """
     Utwórz połączenie z bazą danych SQLite
+    - use_pool: pożycz połączenie ze wspólnej puli (connection_pool)
+    - tracer: QueryTracer z query_tracing - mierzy czas każdego zapytania
     """
     conn = None
     try:
-        conn = sqlite3.connect(db_file)
+        # epoch_dates.connect - daty z kolumn EPOCH wracają jako datetime
+        conn = connection_pool.connect(db_file) if use_pool else epoch_dates.connect(db_file)
+        if tracer is not None:
+            conn = tracer.attach(conn)
         return conn
     except Error as e:
         print(e)
@@ -51,7 +59,7 @@ def select_all_tasks(conn):
     try:
         cur = conn.cursor()
         cur.execute(sql)
-        rows = cur.fetchall()
+        rows = list(decode_column(conn, "tasks", "status", cur.fetchall(), 4))
         
         print("\n--- WSZYSTKIE ZADANIA ---")
         for row in rows:
@@ -93,7 +101,7 @@ def select_tasks_by_project(conn, project_id):
     try:
         cur = conn.cursor()
         cur.execute(sql, (project_id,))
-        rows = cur.fetchall()
+        rows = list(decode_column(conn, "tasks", "status", cur.fetchall(), 4))
         
         print(f"\n--- ZADANIA DLA PROJEKTU ID {project_id} ---")
         for row in rows:
@@ -111,8 +119,9 @@ def select_by_status(conn, status):
     sql = "SELECT * FROM tasks WHERE status=?"
     try:
         cur = conn.cursor()
-        cur.execute(sql, (status,))
-        rows = cur.fetchall()
+        # Przy zakodowanym statusie filtr porównuje kody (indeks idx_tasks_status na liczbach)
+        cur.execute(sql, (encode(conn, "tasks", "status", status),))
+        rows = list(decode_column(conn, "tasks", "status", cur.fetchall(), 4))
         
         print(f"\n--- ZADANIA ZE STATUSEM '{status}' ---")
         for row in rows:
@@ -126,37 +135,31 @@ def select_by_status(conn, status):
 def count_tasks(conn):
     """
     Zlicz liczbę zadań w bazie
-    - COUNT(*) agregacja
-    - fetchone() - pobranie jednego wyniku
+    - licznik utrzymywany przez triggery (table_counters.py)
+    - bez liczników: COUNT(*) agregacja
     """
-    sql = "SELECT COUNT(*) FROM tasks"
     try:
-        cur = conn.cursor()
-        cur.execute(sql)
-        result = cur.fetchone()
+        result = count_rows(conn, "tasks")
         
         print(f"\n--- LICZBA ZADAŃ ---")
-        print(f"Łącznie zadań: {result[0]}")
+        print(f"Łącznie zadań: {result}")
         
-        return result[0]
+        return result
     except Error as e:
         print(e)
 
 
 def count_projects(conn):
     """
-    Zlicz liczbę projektów w bazie
+    Zlicz liczbę projektów w bazie (licznik lub COUNT(*))
     """
-    sql = "SELECT COUNT(*) FROM projects"
     try:
-        cur = conn.cursor()
-        cur.execute(sql)
-        result = cur.fetchone()
+        result = count_rows(conn, "projects")
         
         print(f"\n--- LICZBA PROJEKTÓW ---")
-        print(f"Łącznie projektów: {result[0]}")
+        print(f"Łącznie projektów: {result}")
         
-        return result[0]
+        return result
     except Error as e:
         print(e)
 
@@ -228,6 +231,7 @@ def create_tables(conn):
         cur.execute(create_tasks_table)
         conn.commit()
         print("✓ Tabele utworzone")
+        install_counters(conn, tables=("projects", "tasks"))
     except Error as e:
         print(e)
 
@@ -1,15 +1,17 @@
 # ex_03.py
 import sqlite3
+import connection_pool
 
-def create_connection(db_file):
+def create_connection(db_file, use_pool=False):
    """ create a database connection to the SQLite database
        specified by db_file
    :param db_file: database file
+   :param use_pool: True - pożycz połączenie ze wspólnej puli (connection_pool)
    :return: Connection object or None
    """
    conn = None
    try:
-       conn = sqlite3.connect(db_file)
+       conn = connection_pool.connect(db_file) if use_pool else sqlite3.connect(db_file)
        return conn
    except sqlite3.Error as e:
        print(e)
@@ -18,7 +20,7 @@ def create_connection(db_file):
 def add_project(conn, project):
    """
    Create a new project into the projects table
-   :param conn:
+   :param conn: Connection object or GroupCommitWriter (group_commit.py)
    :param project:
    :return: project id
    """
@@ -32,7 +34,7 @@ def add_project(conn, project):
 def add_task(conn, task):
    """
    Create a new task into the tasks table
-   :param conn:
+   :param conn: Connection object or GroupCommitWriter (group_commit.py)
    :param task:
    :return: task id
    """
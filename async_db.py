@@ -0,0 +1,287 @@
+# ============================================
+# Asyncio - funkcje bazy bez blokowania pętli zdarzeń
+# ============================================
+# Funkcje z 5_db_funkctions.py i 14_my_base.py są synchroniczne: wywołane
+# w korutynie zatrzymują całą pętlę asyncio na czas zapytania.
+# AsyncDatabase uruchamia je we własnych wątkach:
+#   - N wątków czytających, każdy z własnym połączeniem (query_only) -
+#     równoległe odczyty rozkładają się na najmniej zajęte połączenia
+#   - jeden wątek zapisujący z własnym połączeniem - zapisy idą po kolei,
+#     więc nie walczą o blokadę bazy ("database is locked")
+#   - max_pending ogranicza liczbę wywołań w toku (reszta czeka w await)
+#   - profil "balanced" (WAL) - odczyty nie czekają na zapis
+#
+# Anulowanie (task.cancel(), asyncio.wait_for z timeoutem): wywołanie, które
+# jeszcze czeka w kolejce, nie zostanie uruchomione, a trwające zapytanie
+# jest przerywane przez Connection.interrupt().
+#
+#   async with AsyncProjects("project_manager.db") as db:
+#       pid = await db.add_project(("Projekt", "2024-01-01", "2024-06-30"))
+#       tasks = await db.get_tasks_by_project(pid)
+#       async for task in db.iter_all_tasks():
+#           ...
+
+import asyncio
+import importlib
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import availability_index
+import epoch_dates
+import pragma_profiles
+from streaming import DEFAULT_BATCH_SIZE
+
+
+db_tasks = importlib.import_module("5_db_funkctions")
+db_books = importlib.import_module("14_my_base")
+
+
+class _Worker:
+    """Jeden wątek i jedno połączenie - wszystko, co dotyka połączenia, dzieje się w tym wątku"""
+
+    def __init__(self, db_file, name, profile, read_only):
+        self.db_file = db_file
+        self.profile = profile
+        self.read_only = read_only
+        self.conn = None
+        self.pending = 0            # wywołania przypisane do wątku (w kolejce + trwające)
+        self._current = None        # znacznik trwającego wywołania
+        self._lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=name, initializer=self._open)
+
+    def _open(self):
+        self.conn = epoch_dates.connect(self.db_file)
+        pragma_profiles.apply_profile(self.conn, self.profile)
+        if self.read_only:
+            self.conn.execute("PRAGMA query_only = 1")
+
+    def call(self, token, func, args, kwargs):
+        """Wykonaj func(conn, *args) w wątku workera (token - do anulowania)"""
+        with self._lock:
+            if token.cancelled:
+                return None
+            self._current = token
+        try:
+            return func(self.conn, *args, **kwargs)
+        finally:
+            with self._lock:
+                self._current = None
+
+    def interrupt(self, token):
+        """Przerwij zapytanie, jeśli właśnie wykonuje się wywołanie token"""
+        with self._lock:
+            token.cancelled = True
+            if self._current is token and self.conn is not None:
+                self.conn.interrupt()
+
+    def close(self):
+        def _close():
+            if self.conn is not None:
+                self.conn.close()
+                self.conn = None
+        self.executor.submit(_close)
+        self.executor.shutdown(wait=True)
+
+
+class _Token:
+    __slots__ = ("cancelled",)
+
+    def __init__(self):
+        self.cancelled = False
+
+
+class AsyncDatabase:
+    """
+    Asynchroniczny dostęp do jednego pliku bazy
+
+    :param db_file: ścieżka do pliku bazy (nie ":memory:" - każdy wątek ma własne połączenie)
+    :param readers: liczba wątków / połączeń do odczytu
+    :param max_pending: maksymalna liczba wywołań w toku, kolejne czekają
+    :param profile: profil PRAGMA z pragma_profiles (WAL - odczyty równolegle z zapisem)
+    """
+
+    def __init__(self, db_file, readers=4, max_pending=64, profile="balanced"):
+        if db_file == ":memory:":
+            raise ValueError("AsyncDatabase wymaga pliku bazy - baza w pamięci nie jest wspólna dla połączeń")
+        self.db_file = db_file
+        self._writer = _Worker(db_file, "db-writer", profile, read_only=False)
+        self._readers = [_Worker(db_file, f"db-reader-{i}", profile, read_only=True) for i in range(readers)]
+        self._max_pending = max_pending
+        self._slots = None          # asyncio.Semaphore - tworzony w pętli, która go używa
+        self._closed = False
+
+    async def _run(self, worker, func, *args, **kwargs):
+        if self._closed:
+            raise RuntimeError("AsyncDatabase jest zamknięta")
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self._max_pending)
+        async with self._slots:
+            token = _Token()
+            loop = asyncio.get_running_loop()
+            worker.pending += 1
+            try:
+                return await loop.run_in_executor(worker.executor, worker.call, token, func, args, kwargs)
+            except asyncio.CancelledError:
+                worker.interrupt(token)
+                raise
+            finally:
+                worker.pending -= 1
+
+    def _reader(self):
+        return min(self._readers, key=lambda worker: worker.pending)
+
+    async def read(self, func, *args, **kwargs):
+        """await func(conn, *args) na najmniej zajętym połączeniu do odczytu"""
+        return await self._run(self._reader(), func, *args, **kwargs)
+
+    async def write(self, func, *args, **kwargs):
+        """await func(conn, *args) w wątku zapisującym - zapisy wykonują się po kolei"""
+        return await self._run(self._writer, func, *args, **kwargs)
+
+    async def iterate(self, func, *args, batch_size=DEFAULT_BATCH_SIZE):
+        """
+        async for po wierszach generatora func(conn, *args) (np. iter_all_tasks)
+        Generator żyje w jednym wątku czytającym, wiersze przychodzą paczkami po batch_size.
+        Przerwanie pętli (break, anulowanie) zamyka kursor.
+        """
+        worker = self._reader()
+        rows = await self._run(worker, lambda conn: iter(func(conn, *args)))
+        try:
+            while True:
+                batch = await self._run(worker, lambda conn: list(itertools.islice(rows, batch_size)))
+                if not batch:
+                    break
+                for row in batch:
+                    yield row
+        finally:
+            # Kursor należy do wątku workera - zamykamy go tam (bez czekania)
+            if hasattr(rows, "close") and not self._closed:
+                worker.executor.submit(rows.close)
+
+    async def close(self):
+        """Dokończ wywołania w toku i zamknij wszystkie połączenia"""
+        if self._closed:
+            return
+        self._closed = True
+        loop = asyncio.get_running_loop()
+        for worker in [self._writer, *self._readers]:
+            await loop.run_in_executor(None, worker.close)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+
+def _mirror(func, kind):
+    """Metoda korutyny wywołująca funkcję modułu przez read() / write() / iterate()"""
+    if kind == "iterate":
+        def method(self, *args, batch_size=DEFAULT_BATCH_SIZE):
+            return self.iterate(func, *args, batch_size=batch_size)
+    else:
+        async def method(self, *args, **kwargs):
+            return await getattr(self, kind)(func, *args, **kwargs)
+    method.__name__ = func.__name__
+    method.__doc__ = func.__doc__
+    return method
+
+
+class AsyncProjects(AsyncDatabase):
+    """Funkcje z 5_db_funkctions.py (projects / tasks) jako korutyny"""
+
+    READS = ("get_all_projects", "get_all_tasks", "get_tasks_by_project", "get_tasks_between")
+    WRITES = ("create_tables", "add_project", "add_task", "update_project", "update_task_status",
+              "delete_project", "delete_task")
+    ITERATORS = ("iter_all_projects", "iter_all_tasks", "iter_tasks_by_project")
+
+
+class AsyncLibrary(AsyncDatabase):
+    """Funkcje z 14_my_base.py (biblioteka) jako korutyny"""
+
+    READS = ("select_all_books", "select_books_by_category", "search_books", "count_books",
+             "count_available_books", "available_book_ids")
+    WRITES = ("add_category", "add_book", "update_book_availability", "delete_book")
+    ITERATORS = ("iter_all_books",)
+
+    async def prepare(self):
+        """
+        Jednorazowe przygotowanie bazy przez wątek zapisujący - tabela wersji indeksu
+        dostępności (availability_index.py), której połączenia do odczytu nie mogą założyć
+        """
+        def install(conn):
+            if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'books'").fetchone():
+                availability_index.install_version_tracking(conn)
+
+        await self.write(install)
+
+    async def __aenter__(self):
+        await self.prepare()
+        return self
+
+    async def create_tables(self, *args, **kwargs):
+        """create_tables() z 14_my_base.py + prepare() - triggery wersji potrzebują tabeli books"""
+        result = await self.write(db_books.create_tables, *args, **kwargs)
+        await self.prepare()
+        return result
+
+
+for _cls, _module in ((AsyncProjects, db_tasks), (AsyncLibrary, db_books)):
+    for _kind, _names in (("read", _cls.READS), ("write", _cls.WRITES), ("iterate", _cls.ITERATORS)):
+        for _name in _names:
+            setattr(_cls, _name, _mirror(getattr(_module, _name), _kind))
+
+
+if __name__ == "__main__":
+    import contextlib
+    import io
+    import os
+    import tempfile
+    import time
+
+    async def main():
+        path = os.path.join(tempfile.mkdtemp(), "async_demo.db")
+        async with AsyncProjects(path, readers=4) as db:
+            await db.create_tables()
+            with contextlib.redirect_stdout(io.StringIO()):  # funkcje z 5_db_funkctions.py drukują ✓ przy każdym wierszu
+                pids = await asyncio.gather(*(db.add_project((f"Projekt {i}", "2024-01-01", "2024-12-31"))
+                                              for i in range(20)))
+                await asyncio.gather(*(db.add_task((pid, f"Zadanie {j}", "", "W trakcie", "2024-01-01", "2024-02-01"))
+                                       for pid in pids for j in range(50)))
+            print(f"✓ Zapisano {len(pids)} projektów i {len(pids) * 50} zadań przez jeden wątek zapisujący")
+
+            # Pętla zdarzeń żyje w trakcie zapytań - licznik tyka równolegle
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0.001)
+                    ticks += 1
+
+            ticking = asyncio.create_task(ticker())
+            started = time.perf_counter()
+            results = await asyncio.gather(*(db.get_tasks_by_project(pid) for pid in pids * 10))
+            elapsed = time.perf_counter() - started
+            print(f"✓ {len(results)} równoległych odczytów w {elapsed * 1000:.0f} ms, pętla obsłużyła {ticks} ticków")
+
+            count = 0
+            async for _ in db.iter_all_tasks(batch_size=100):
+                count += 1
+            print(f"✓ async for po zadaniach: {count} wierszy")
+
+            # Anulowanie długiego zapytania - interrupt() przerywa je w wątku czytającym
+            def slow_query(conn):
+                sql = "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n) SELECT count(*) FROM n"
+                return conn.execute(sql).fetchone()
+
+            started = time.perf_counter()
+            try:
+                await asyncio.wait_for(db.read(slow_query), timeout=0.2)
+            except asyncio.TimeoutError:
+                print(f"✓ Zapytanie anulowane po {time.perf_counter() - started:.2f} s")
+            print(f"Po anulowaniu połączenie działa: {len(await db.get_all_projects())} projektów")
+            ticking.cancel()
+
+    asyncio.run(main())
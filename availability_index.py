@@ -0,0 +1,445 @@
+# ============================================
+# Indeks dostępności książek w pamięci (bitmapy)
+# ============================================
+# Pytanie "które książki z kategorii X są dostępne" to w SQLite przegląd
+# tabeli books. Tu dla każdej kategorii trzymamy dwie bitmapy (bytearray):
+#   - members[kategoria]   - bit "id" ustawiony = książka należy do kategorii
+#   - available[kategoria] - bit "id" ustawiony = książka jest dostępna
+# Liczba dostępnych to liczba ustawionych bitów, lista id to pozycje bitów -
+# bez ani jednego zapytania do bazy. 10 mln książek = ok. 1,25 MB na bitmapę.
+#
+# Indeks ładujemy raz: z pliku snapshotu obok bazy (odczyt surowych bajtów),
+# a gdy snapshot jest nieaktualny - jednym przejściem po tabeli books.
+# Aktualność sprawdzamy licznikiem zmian utrzymywanym przez triggery
+# (tylko INSERT i UPDATE - trigger DELETE wyłączyłby truncate) oraz
+# liczbą i największym id książek.
+#
+# Funkcje z 14_my_base.py (add_book, update_book_availability, delete_book)
+# po commicie wołają on_insert() / on_update() / on_delete(), więc
+# załadowany indeks zmienia się razem z bazą. Zmiany z innych miejsc
+# (delete_many, truncate_table, update z 11_update.py, inny proces) wykrywa
+# get_index(). Przed odczytem sprawdza tylko PRAGMA data_version (zmienia się
+# po commicie innego połączenia) i conn.total_changes (zapisy tego połączenia).
+# Dopiero gdy któreś się zmieniło, porównuje fingerprint bazy z tym, który
+# indeks zapamiętał, i przy różnicy buduje indeks od nowa.
+
+import json
+import os
+import struct
+import threading
+from array import array
+from sqlite3 import Error
+
+from streaming import iter_rows
+from table_counters import count_rows
+
+
+SNAPSHOT_SUFFIX = ".availability"
+_MAGIC = b"AVIX1"
+
+VERSION_SCHEMA_SQL = [
+    """
+    CREATE TABLE IF NOT EXISTS index_versions (
+        nazwa TEXT PRIMARY KEY,
+        wersja INTEGER NOT NULL
+    ) WITHOUT ROWID
+    """,
+    "INSERT OR IGNORE INTO index_versions (nazwa, wersja) VALUES ('books_availability', 0)",
+]
+
+_BUMP_VERSION = "UPDATE index_versions SET wersja = wersja + 1 WHERE nazwa = 'books_availability';"
+
+# nazwa triggera: zdarzenie
+TRIGGERS = {
+    "trg_books_availability_insert": "AFTER INSERT",
+    "trg_books_availability_update": "AFTER UPDATE OF dostepna, category_id",
+}
+
+
+def _bit_count(bits):
+    return int.from_bytes(bits, "little").bit_count()
+
+
+def _iter_bits(bits):
+    for position, byte in enumerate(bits):
+        if byte:
+            base = position * 8
+            for bit in range(8):
+                if byte >> bit & 1:
+                    yield base + bit
+
+
+class AvailabilityIndex:
+    """
+    Bitmapy dostępności per kategoria
+
+    Wszystkie metody są bezpieczne dla wielu wątków (jedna blokada).
+    """
+
+    def __init__(self):
+        self.members = {}
+        self.available = {}
+        # id książki → id kategorii (0 = brak książki o tym id)
+        self.category_of = array("I")
+        # fingerprint() bazy, z którym indeks jest zgodny (None = nieznany)
+        self.fingerprint = None
+        self._lock = threading.Lock()
+
+    # -------- zmiany --------
+
+    def _bitmaps(self, category_id):
+        members = self.members.get(category_id)
+        if members is None:
+            members = self.members[category_id] = bytearray()
+            self.available[category_id] = bytearray()
+        return members, self.available[category_id]
+
+    def _grow(self, book_id):
+        size = book_id + 1
+        if len(self.category_of) < size:
+            self.category_of.extend([0] * (size - len(self.category_of)))
+
+    def _set(self, book_id, category_id, dostepna):
+        self._grow(book_id)
+        old_category = self.category_of[book_id]
+        if old_category and old_category != category_id:
+            self._clear(book_id)
+        self.category_of[book_id] = category_id
+        members, available = self._bitmaps(category_id)
+        byte, mask = book_id >> 3, 1 << (book_id & 7)
+        if len(members) <= byte:
+            grow = byte + 1 - len(members)
+            members.extend(bytes(grow))
+            available.extend(bytes(grow))
+        members[byte] |= mask
+        if dostepna:
+            available[byte] |= mask
+        else:
+            available[byte] &= ~mask & 0xFF
+
+    def _clear(self, book_id):
+        if book_id >= len(self.category_of) or not self.category_of[book_id]:
+            return False
+        members, available = self._bitmaps(self.category_of[book_id])
+        byte, mask = book_id >> 3, ~(1 << (book_id & 7)) & 0xFF
+        members[byte] &= mask
+        available[byte] &= mask
+        self.category_of[book_id] = 0
+        return True
+
+    def add(self, book_id, category_id, dostepna=True):
+        """Nowa książka (albo zmiana kategorii istniejącej)"""
+        with self._lock:
+            self._set(book_id, category_id, dostepna)
+
+    def set_available(self, book_id, dostepna):
+        """
+        Zmień dostępność książki
+        :return: False, gdy książki nie ma w indeksie
+        """
+        with self._lock:
+            if book_id >= len(self.category_of) or not self.category_of[book_id]:
+                return False
+            self._set(book_id, self.category_of[book_id], dostepna)
+            return True
+
+    def remove(self, book_id):
+        """
+        Usuń książkę z indeksu
+        :return: False, gdy książki nie ma w indeksie
+        """
+        with self._lock:
+            return self._clear(book_id)
+
+    # -------- odczyt --------
+
+    def count_available(self, category_id):
+        with self._lock:
+            return _bit_count(self.available.get(category_id, b""))
+
+    def count_total(self, category_id):
+        with self._lock:
+            return _bit_count(self.members.get(category_id, b""))
+
+    def available_ids(self, category_id):
+        """Posortowana lista id dostępnych książek z kategorii"""
+        with self._lock:
+            return list(_iter_bits(self.available.get(category_id, b"")))
+
+    def unavailable_ids(self, category_id):
+        """Posortowana lista id wypożyczonych książek z kategorii"""
+        with self._lock:
+            members = self.members.get(category_id, b"")
+            available = self.available.get(category_id, b"")
+            lent = bytes(m & ~a & 0xFF for m, a in zip(members, available))
+            return list(_iter_bits(lent))
+
+    def is_available(self, book_id):
+        """True / False, None gdy książki nie ma w indeksie"""
+        with self._lock:
+            if book_id >= len(self.category_of) or not self.category_of[book_id]:
+                return None
+            available = self.available[self.category_of[book_id]]
+            byte = book_id >> 3
+            return byte < len(available) and bool(available[byte] >> (book_id & 7) & 1)
+
+    def categories(self):
+        with self._lock:
+            return sorted(self.members)
+
+    def last_id(self):
+        """Największe id książki w indeksie (0 = pusty)"""
+        with self._lock:
+            for book_id in range(len(self.category_of) - 1, 0, -1):
+                if self.category_of[book_id]:
+                    return book_id
+            return 0
+
+    # -------- budowanie i zapis --------
+
+    @classmethod
+    def from_db(cls, conn):
+        """Zbuduj indeks jednym przejściem po tabeli books"""
+        index = cls()
+        max_id = conn.execute("SELECT MAX(id) FROM books").fetchone()[0] or 0
+        index._grow(max_id)
+        size = (max_id >> 3) + 1
+        # Bitmapy od razu w pełnym rozmiarze - w pętli tylko ustawianie bitów
+        for (category_id,) in conn.execute("SELECT DISTINCT category_id FROM books").fetchall():
+            index.members[category_id] = bytearray(size)
+            index.available[category_id] = bytearray(size)
+        members, available, category_of = index.members, index.available, index.category_of
+        for book_id, category_id, dostepna in iter_rows(
+                conn, "SELECT id, category_id, dostepna FROM books", batch_size=10000):
+            byte, mask = book_id >> 3, 1 << (book_id & 7)
+            category_of[book_id] = category_id
+            members[category_id][byte] |= mask
+            if dostepna:
+                available[category_id][byte] |= mask
+        return index
+
+    def save(self, path, fingerprint):
+        """
+        Zapisz snapshot: nagłówek JSON + surowe bajty tablic
+        Zapis do pliku tymczasowego i os.replace() - nigdy nie zostaje połowa pliku.
+        """
+        with self._lock:
+            layout = [[category, len(self.members[category])] for category in sorted(self.members)]
+            header = json.dumps({"fingerprint": list(fingerprint), "books": len(self.category_of),
+                                 "categories": layout}).encode("utf-8")
+            temp_path = path + ".tmp"
+            with open(temp_path, "wb") as f:
+                f.write(_MAGIC + struct.pack("<I", len(header)) + header)
+                f.write(self.category_of.tobytes())
+                for category, _ in layout:
+                    f.write(self.members[category])
+                    f.write(self.available[category])
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Wczytaj snapshot
+        :return: (indeks, fingerprint) albo (None, None), gdy pliku nie ma lub jest uszkodzony
+        """
+        try:
+            with open(path, "rb") as f:
+                if f.read(len(_MAGIC)) != _MAGIC:
+                    return None, None
+                (header_size,) = struct.unpack("<I", f.read(4))
+                header = json.loads(f.read(header_size))
+                index = cls()
+                index.category_of.frombytes(f.read(header["books"] * index.category_of.itemsize))
+                for category, size in header["categories"]:
+                    index.members[category] = bytearray(f.read(size))
+                    index.available[category] = bytearray(f.read(size))
+                    if len(index.available[category]) != size:
+                        return None, None
+            if len(index.category_of) != header["books"]:
+                return None, None
+            return index, tuple(header["fingerprint"])
+        except (OSError, ValueError, KeyError, struct.error):
+            return None, None
+
+
+# ============================================
+# Indeks dla bazy - ładowanie i aktualizacja razem z zapisami
+# ============================================
+
+# pełna ścieżka pliku bazy (baza w pamięci: samo połączenie) → AvailabilityIndex
+_indexes = {}
+# klucz jak w _indexes → (połączenie, PRAGMA data_version, conn.total_changes)
+# z ostatniego pełnego sprawdzenia fingerprintu. Jedno połączenie na indeks:
+# trzymamy je samo (nie id()), żeby nowe połączenie pod tym samym adresem
+# nie przejęło cudzego stanu.
+_checked = {}
+_indexes_lock = threading.Lock()
+
+
+def _db_path(conn):
+    """Ścieżka pliku bazy ("" dla bazy w pamięci)"""
+    for _, name, path in conn.execute("PRAGMA database_list").fetchall():
+        if name == "main":
+            return os.path.abspath(path) if path else ""
+    return ""
+
+
+def _key(conn):
+    return _db_path(conn) or conn
+
+
+def install_version_tracking(conn):
+    """Tabela index_versions i triggery licznika zmian (idempotentne)"""
+    installed = conn.execute(
+        f"SELECT count(*) FROM sqlite_master WHERE type = 'trigger' AND name IN ({', '.join('?' * len(TRIGGERS))})",
+        tuple(TRIGGERS)).fetchone()[0]
+    if installed == len(TRIGGERS):
+        # Już założone - bez zapisu, więc działa też na połączeniu tylko do odczytu
+        return
+    try:
+        for sql in VERSION_SCHEMA_SQL:
+            conn.execute(sql)
+        for name, event in TRIGGERS.items():
+            conn.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {event} ON books BEGIN {_BUMP_VERSION} END")
+        conn.commit()
+    except Error as e:
+        print(f"✗ Błąd tworzenia licznika zmian: {e}")
+
+
+def fingerprint(conn):
+    """(licznik zmian, liczba książek, największe id) - zmienia się przy każdej zmianie indeksu"""
+    version = conn.execute(
+        "SELECT wersja FROM index_versions WHERE nazwa = 'books_availability'").fetchone()
+    max_id = conn.execute("SELECT MAX(id) FROM books").fetchone()[0] or 0
+    return (version[0] if version else None, count_rows(conn, "books"), max_id)
+
+
+def _unchanged(conn, data_version):
+    """Indeks sprawdzony ostatnio przez to połączenie, o ile baza od tamtej pory się nie zmieniła"""
+    with _indexes_lock:
+        for key, (checked, version, changes) in _checked.items():
+            if checked is conn:
+                if version == data_version and changes == conn.total_changes:
+                    return _indexes.get(key)
+                return None
+    return None
+
+
+def get_index(conn):
+    """
+    Indeks dla bazy połączenia - ładowany raz na proces
+    Szybka ścieżka: połączenie nic nie zapisało i nikt inny nie zrobił commitu
+    od ostatniego sprawdzenia → jedno PRAGMA data_version. W przeciwnym razie:
+    załadowany i zgodny z fingerprintem bazy → aktualny snapshot z pliku →
+    przebudowa z tabeli (i zapis snapshotu).
+    """
+    data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+    index = _unchanged(conn, data_version)
+    if index is not None:
+        return index
+
+    path = _db_path(conn)
+    key = path or conn
+    install_version_tracking(conn)
+    current = fingerprint(conn)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is not None and index.fingerprint == current:
+            _checked[key] = (conn, data_version, conn.total_changes)
+            return index
+
+    index = None
+    if path:
+        index, saved = AvailabilityIndex.load(path + SNAPSHOT_SUFFIX)
+        if saved != current:
+            index = None
+    if index is None:
+        index = AvailabilityIndex.from_db(conn)
+        if path:
+            index.save(path + SNAPSHOT_SUFFIX, current)
+    index.fingerprint = current
+    with _indexes_lock:
+        _checked[key] = (conn, data_version, conn.total_changes)
+        loaded = _indexes.get(key)
+        if loaded is not None and loaded.fingerprint == current:
+            return loaded
+        _indexes[key] = index
+        return index
+
+
+def save_index(conn):
+    """Zapisz snapshot załadowanego indeksu (np. przed zamknięciem programu)"""
+    path = _db_path(conn)
+    with _indexes_lock:
+        index = _indexes.get(path) if path else None
+    # Zapisujemy fingerprint, z którym indeks jest zgodny - nie bieżący bazy
+    if index is not None and index.fingerprint is not None:
+        index.save(path + SNAPSHOT_SUFFIX, index.fingerprint)
+
+
+def drop_index(conn):
+    """Zapomnij załadowany indeks - następne get_index() wczyta go od nowa"""
+    key = _key(conn)
+    with _indexes_lock:
+        _indexes.pop(key, None)
+        _checked.pop(key, None)
+
+
+def _loaded(conn):
+    with _indexes_lock:
+        if not _indexes:
+            return None
+    key = _key(conn)
+    with _indexes_lock:
+        return _indexes.get(key)
+
+
+def _applied(index, versions=0, books=0, max_id=None):
+    # Zmiana z haka jest już w indeksie - przesuń zapamiętany fingerprint o tę
+    # jedną zmianę, żeby get_index() nie budował indeksu od nowa po każdym
+    # zapisie. Nie czytamy go z bazy: odczyt po commicie wchłonąłby też zmianę
+    # zrobioną w międzyczasie przez inne połączenie.
+    if index.fingerprint is None:
+        return
+    version, count, last_id = index.fingerprint
+    if version is not None:
+        version += versions
+    index.fingerprint = (version, count + books, last_id if max_id is None else max_id)
+
+
+def on_insert(conn, book_id, category_id, dostepna=True):
+    """Wywołaj po zapisaniu nowej książki (bez załadowanego indeksu nic nie robi)"""
+    index = _loaded(conn)
+    if index is not None:
+        index.add(book_id, category_id, dostepna)
+        # trigger INSERT podbija licznik zmian
+        _applied(index, versions=1, books=1, max_id=index.last_id())
+
+
+def on_update(conn, book_id, dostepna):
+    """Wywołaj po zmianie dostępności książki"""
+    index = _loaded(conn)
+    if index is not None and index.set_available(book_id, dostepna):
+        _applied(index, versions=1)
+
+
+def on_delete(conn, book_id):
+    """Wywołaj po usunięciu książki"""
+    index = _loaded(conn)
+    if index is not None and index.remove(book_id):
+        # DELETE nie ma triggera - zmienia się tylko liczba i ewentualnie największe id
+        _applied(index, books=-1, max_id=index.last_id())
+
+
+if __name__ == "__main__":
+    import sqlite3
+    import time
+
+    conn = sqlite3.connect("moja_biblioteka.db")
+    start = time.perf_counter()
+    index = get_index(conn)
+    print(f"✓ Indeks gotowy w {(time.perf_counter() - start) * 1000:.1f} ms")
+    for category in index.categories():
+        print(f"Kategoria {category}: dostępne {index.count_available(category)}"
+              f"/{index.count_total(category)} → {index.available_ids(category)[:10]}")
+    conn.close()
@@ -0,0 +1,382 @@
+# ============================================
+# Benchmark funkcji CRUD z całego projektu
+# ============================================
+# Powtarzalny pomiar: dane syntetyczne ze stałym ziarnem (seed), świeża
+# baza w pliku tymczasowym przy każdym uruchomieniu, wyniki w JSON.
+# Wyniki można porównać z zapisanym wcześniej punktem odniesienia (baseline):
+#
+#   python benchmark.py --size 1k --out wyniki.json
+#   python benchmark.py --size 1k --baseline wyniki.json   # po zmianie w kodzie
+#
+# Schematy: projects/tasks, sensors/warehouses, categories/books, students
+# Rozmiary: 1k / 100k / 10M wierszy w głównej tabeli każdego schematu
+
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import os
+import platform
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from itertools import islice
+
+
+SIZES = {"1k": 1_000, "100k": 100_000, "10M": 10_000_000}
+STATUSES = ["Rozpoczęte", "W trakcie", "Ukończone", "Oczekujące"]
+SENSOR_TYPES = ["Temperatura i Wilgotność", "Odległość", "Ciśnienie i Temperatura", "Gaz"]
+
+# Moduły z funkcjami, które mierzymy (nazwy zaczynają się od cyfry - importlib)
+db_tasks = importlib.import_module("5_db_funkctions")
+db_fetch = importlib.import_module("6_get_data")
+db_update = importlib.import_module("11_update")
+db_delete = importlib.import_module("13_bazy_delete")
+db_books = importlib.import_module("14_my_base")
+db_sensors = importlib.import_module("00_Bazy_piach")
+
+import bulk_delete  # noqa: E402
+
+
+def _quiet():
+    # Funkcje projektu wypisują "✓ ..." przy każdym wywołaniu - nie mierzymy print()
+    return contextlib.redirect_stdout(io.StringIO())
+
+
+def _insert_stream(conn, sql, rows, chunk=50_000):
+    """executemany() paczkami, żeby 10M wierszy nie trzymać w pamięci"""
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, chunk))
+        if not batch:
+            break
+        conn.executemany(sql, batch)
+    conn.commit()
+
+
+def _commit(conn, sql, parameters):
+    """Pojedyncze polecenie z commitem - jak w funkcjach projektu (schemat students ich nie ma)"""
+    conn.execute(sql, parameters)
+    conn.commit()
+
+
+# ============================================
+# Generator danych syntetycznych
+# ============================================
+
+def _date(rng):
+    return f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+
+
+def generate_projects_tasks(conn, rows, rng):
+    with _quiet():
+        db_tasks.create_tables(conn)
+    projects = max(rows // 100, 1)
+    _insert_stream(conn, "INSERT INTO projects VALUES (?, ?, ?, ?)",
+                   ((i, f"Projekt {i}", _date(rng), _date(rng)) for i in range(1, projects + 1)))
+    _insert_stream(conn, "INSERT INTO tasks VALUES (?, ?, ?, ?, ?, ?, ?)",
+                   ((i, rng.randint(1, projects), f"Zadanie {i}", "opis", rng.choice(STATUSES),
+                     _date(rng), _date(rng)) for i in range(1, rows + 1)))
+    return {"projects": projects, "tasks": rows}
+
+
+def generate_sensors_warehouses(conn, rows, rng):
+    with _quiet():
+        db_sensors.create_sensors_table(conn)
+        db_sensors.create_warehouses_table(conn)
+    sensors = max(rows // 20, 1)
+    _insert_stream(conn, "INSERT INTO sensors VALUES (?, ?, ?, ?)",
+                   ((i, f"MODEL-{i}", rng.choice(SENSOR_TYPES), rng.randint(1, 8))
+                    for i in range(1, sensors + 1)))
+    _insert_stream(conn, "INSERT INTO warehouses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                   ((i, rng.randint(1, sensors), f"Magazyn {rng.choice('ABCDE')}", rng.randint(1, 50),
+                     rng.randint(1, 20), rng.randint(1, 6), rng.randint(1, 10), rng.randint(0, 500))
+                    for i in range(1, rows + 1)))
+    return {"sensors": sensors, "warehouses": rows}
+
+
+def generate_categories_books(conn, rows, rng):
+    with _quiet():
+        db_books.create_tables(conn)
+    categories = 20
+    _insert_stream(conn, "INSERT INTO categories VALUES (?, ?, ?)",
+                   ((i, f"Kategoria {i}", "") for i in range(1, categories + 1)))
+    _insert_stream(conn, "INSERT INTO books VALUES (?, ?, ?, ?, ?, ?)",
+                   ((i, f"Tytuł {i}", f"Autor {rng.randint(1, max(rows // 10, 1))}",
+                     rng.randint(1900, 2024), rng.randint(1, categories), rng.randint(0, 1))
+                    for i in range(1, rows + 1)))
+    return {"categories": categories, "books": rows}
+
+
+def generate_students(conn, rows, rng):
+    # Schemat z 4_cursor_practice.py (curriculum.db)
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS students (
+        id INTEGER PRIMARY KEY,
+        imie TEXT NOT NULL,
+        nazwisko TEXT NOT NULL,
+        ocena REAL NOT NULL
+    )""")
+    _insert_stream(conn, "INSERT INTO students VALUES (?, ?, ?, ?)",
+                   ((i, f"Imię {i}", f"Nazwisko {i}", rng.choice([2.0, 3.0, 3.5, 4.0, 4.5, 5.0]))
+                    for i in range(1, rows + 1)))
+    return {"students": rows}
+
+
+GENERATORS = [generate_projects_tasks, generate_sensors_warehouses,
+              generate_categories_books, generate_students]
+
+
+def generate_all(conn, rows, seed=42):
+    """Wypełnij bazę wszystkimi czterema schematami - ten sam seed = te same dane"""
+    rng = random.Random(seed)
+    counts = {}
+    for generator in GENERATORS:
+        counts.update(generator(conn, rows, rng))
+    return counts
+
+
+# ============================================
+# Pomiary
+# ============================================
+
+def _measure(func, ops):
+    """Wywołaj func(i) dla i w 0..ops-1; zwróć czas łączny i percentyle pojedynczej operacji"""
+    samples = []
+    with _quiet():
+        for i in range(ops):
+            start = time.perf_counter()
+            func(i)
+            samples.append(time.perf_counter() - start)
+    samples.sort()
+    total = sum(samples)
+    return {
+        "ops": ops,
+        "seconds": round(total, 6),
+        "ops_per_second": round(ops / total, 1) if total else None,
+        "p50_ms": round(samples[len(samples) // 2] * 1000, 4),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000, 4),
+    }
+
+
+def run_benchmarks(conn, counts, ops, seed=42):
+    """
+    Zmierz funkcje CRUD - kolejność ma znaczenie: usuwanie na końcu
+    :param ops: liczba wywołań dla operacji punktowych
+    :return: słownik {nazwa_pomiaru: wynik}
+    """
+    rng = random.Random(seed + 1)
+    projects, tasks = counts["projects"], counts["tasks"]
+    books, categories = counts["books"], counts["categories"]
+    sensors, warehouses, students = counts["sensors"], counts["warehouses"], counts["students"]
+    project_ids = [rng.randint(1, projects) for _ in range(ops)]
+    task_ids = [rng.randint(1, tasks) for _ in range(ops)]
+    sensor_ids = [rng.randint(1, sensors) for _ in range(ops)]
+    warehouse_ids = [rng.randint(1, warehouses) for _ in range(ops)]
+    student_ids = [rng.randint(1, students) for _ in range(ops)]
+    heavy_ops = 3  # pełne JOIN-y i GROUP BY na dużej tabeli wykonujemy kilka razy
+
+    results = {}
+    results["insert.add_task"] = _measure(
+        lambda i: db_tasks.add_task(conn, (project_ids[i], f"Nowe {i}", "", "W trakcie",
+                                           "2024-01-01", "2024-01-02")), ops)
+    results["insert.add_book"] = _measure(
+        lambda i: db_books.add_book(conn, f"Nowa {i}", "Autor", 2024, 1 + i % categories), ops)
+    results["insert.add_sensor"] = _measure(
+        lambda i: db_sensors.add_sensor(conn, f"NOWY-{i}", SENSOR_TYPES[i % 4], 4), ops)
+    results["insert.add_warehouse"] = _measure(
+        lambda i: db_sensors.add_warehouse(conn, sensor_ids[i], "Magazyn A", 1 + i % 50, 1, 1, 1, 10), ops)
+    results["insert.student"] = _measure(
+        lambda i: _commit(conn, "INSERT INTO students (imie, nazwisko, ocena) VALUES (?, ?, ?)",
+                          (f"Nowy {i}", "Student", 4.0)), ops)
+    results["lookup.get_tasks_by_project"] = _measure(
+        lambda i: db_tasks.get_tasks_by_project(conn, project_ids[i]), ops)
+    results["lookup.task_by_id"] = _measure(
+        lambda i: conn.execute("SELECT * FROM tasks WHERE id = ?", (task_ids[i],)).fetchone(), ops)
+    results["lookup.select_books_by_category"] = _measure(
+        lambda i: db_books.select_books_by_category(conn, 1 + i % categories), min(ops, 20))
+    results["lookup.find_sensor_locations"] = _measure(
+        lambda i: db_sensors.find_sensor_locations(conn, sensor_ids[i]), ops)
+    results["lookup.warehouse_by_id"] = _measure(
+        lambda i: conn.execute("SELECT * FROM warehouses WHERE id = ?", (warehouse_ids[i],)).fetchone(), ops)
+    results["lookup.student_by_id"] = _measure(
+        lambda i: conn.execute("SELECT * FROM students WHERE id = ?", (student_ids[i],)).fetchone(), ops)
+    results["join.select_with_join"] = _measure(
+        lambda i: sum(1 for _ in db_fetch.iter_with_join(conn)), heavy_ops)
+    results["join.select_all_books"] = _measure(
+        lambda i: db_books.select_all_books(conn), heavy_ops)
+    results["join.get_sensors_in_warehouses"] = _measure(
+        lambda i: db_sensors.get_sensors_in_warehouses(conn), heavy_ops)
+    results["group_by.select_with_group_by"] = _measure(
+        lambda i: db_fetch.select_with_group_by(conn), heavy_ops)
+    results["group_by.students_by_grade"] = _measure(
+        lambda i: conn.execute("SELECT ocena, COUNT(*) FROM students GROUP BY ocena").fetchall(), heavy_ops)
+    results["update.update"] = _measure(
+        lambda i: db_update.update(conn, "tasks", task_ids[i], status=STATUSES[i % 4]), ops)
+    results["update.update_many"] = _measure(
+        lambda i: db_update.update_many(conn, "tasks", [{"id": t, "status": "Ukończone"} for t in task_ids]), 1)
+    results["update.update_book_availability"] = _measure(
+        lambda i: db_books.update_book_availability(conn, 1 + i % books, i % 2), ops)
+    results["update.update_warehouse_quantity"] = _measure(
+        lambda i: db_sensors.update_warehouse_quantity(conn, warehouse_ids[i], i % 500), ops)
+    results["update.student"] = _measure(
+        lambda i: db_update.update(conn, "students", student_ids[i], ocena=5.0), ops)
+    results["delete.delete_where"] = _measure(
+        lambda i: db_delete.delete_where(conn, "tasks", id=task_ids[i]), ops)
+    results["delete.delete_many"] = _measure(
+        lambda i: bulk_delete.delete_many(conn, "tasks", range(tasks // 2, tasks // 2 + ops * 10)), 1)
+    results["delete.delete_where_warehouses"] = _measure(
+        lambda i: db_sensors.delete_where(conn, "warehouses", id=warehouse_ids[i]), ops)
+    results["delete.delete_where_students"] = _measure(
+        lambda i: db_delete.delete_where(conn, "students", id=student_ids[i]), ops)
+    return results
+
+
+def environment():
+    return {
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+    }
+
+
+def run(size="1k", ops=1000, seed=42, db_file=None):
+    """
+    Pełny przebieg: generowanie danych + pomiary
+    :param db_file: plik bazy (None = plik tymczasowy usuwany po pomiarze)
+    :return: słownik z wynikami gotowy do zapisu w JSON
+    """
+    rows = SIZES[size]
+    temp_dir = None
+    if db_file is None:
+        temp_dir = tempfile.TemporaryDirectory()
+        db_file = os.path.join(temp_dir.name, "benchmark.db")
+    try:
+        conn = sqlite3.connect(db_file)
+        start = time.perf_counter()
+        counts = generate_all(conn, rows, seed)
+        generate_seconds = time.perf_counter() - start
+        results = run_benchmarks(conn, counts, min(ops, rows), seed)
+        conn.close()
+    finally:
+        if temp_dir is not None:
+            temp_dir.cleanup()
+    return {
+        "meta": {
+            "size": size,
+            "rows": rows,
+            "ops": min(ops, rows),
+            "seed": seed,
+            "generate_seconds": round(generate_seconds, 3),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "environment": environment(),
+        },
+        "results": results,
+    }
+
+
+# Parametry przebiegu, które muszą być takie same, żeby czasy były porównywalne
+_COMPARABLE_META = ("size", "rows", "ops", "seed")
+
+
+def meta_differences(current, baseline):
+    """
+    Różnice w parametrach przebiegu między wynikami a punktem odniesienia
+    :return: (różnice parametrów, różnice środowiska) - listy (klucz, stara, nowa)
+    """
+    old_meta, new_meta = baseline.get("meta", {}), current.get("meta", {})
+    params = [(key, old_meta.get(key), new_meta.get(key)) for key in _COMPARABLE_META
+              if old_meta.get(key) != new_meta.get(key)]
+    old_env, new_env = old_meta.get("environment", {}), new_meta.get("environment", {})
+    env = [(key, old_env.get(key), new_env.get(key)) for key in sorted(set(old_env) | set(new_env))
+           if old_env.get(key) != new_env.get(key)]
+    return params, env
+
+
+def compare(current, baseline, tolerance=0.10, min_delta_ms=0.05, force=False):
+    """
+    Porównaj wyniki z punktem odniesienia po medianie pojedynczej operacji (p50)
+    - mediana jest mniej wrażliwa na pojedyncze przestoje dysku niż czas łączny
+    :param tolerance: względna zmiana, poniżej której wynik uznajemy za bez zmian
+    :param min_delta_ms: różnice mniejsze niż tyle ms to szum pomiaru
+    :param force: True - porównaj mimo innych parametrów przebiegu (rozmiar, liczba operacji)
+    :return: lista (nazwa, stare_p50_ms, nowe_p50_ms, zmiana, ocena)
+    :raises ValueError: gdy punkt odniesienia zmierzono z innymi parametrami (i force=False)
+    """
+    params, _ = meta_differences(current, baseline)
+    if params and not force:
+        details = ", ".join(f"{key}: {old} → {new}" for key, old, new in params)
+        raise ValueError(f"Punkt odniesienia zmierzono z innymi parametrami ({details})")
+    rows = []
+    for name, result in current["results"].items():
+        old = baseline.get("results", {}).get(name)
+        if old is None:
+            rows.append((name, None, result["p50_ms"], None, "nowy"))
+            continue
+        delta = result["p50_ms"] - old["p50_ms"]
+        change = delta / old["p50_ms"] if old["p50_ms"] else 0.0
+        if abs(delta) < min_delta_ms or abs(change) <= tolerance:
+            verdict = "bez zmian"
+        elif change > 0:
+            verdict = "WOLNIEJ"
+        else:
+            verdict = "szybciej"
+        rows.append((name, old["p50_ms"], result["p50_ms"], change, verdict))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark funkcji CRUD projektu")
+    parser.add_argument("--size", choices=SIZES, default="1k")
+    parser.add_argument("--ops", type=int, default=1000, help="liczba operacji punktowych")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", help="zapisz wyniki do pliku JSON")
+    parser.add_argument("--baseline", help="porównaj z wynikami z pliku JSON")
+    parser.add_argument("--tolerance", type=float, default=0.10)
+    parser.add_argument("--min-delta-ms", type=float, default=0.05)
+    parser.add_argument("--force", action="store_true",
+                        help="porównaj mimo innego rozmiaru / liczby operacji niż w punkcie odniesienia")
+    args = parser.parse_args(argv)
+
+    print(f"Benchmark: {args.size} wierszy, {args.ops} operacji, seed {args.seed}")
+    report = run(args.size, args.ops, args.seed)
+    print(f"✓ Dane wygenerowane w {report['meta']['generate_seconds']} s\n")
+    for name, result in report["results"].items():
+        print(f"{name:38} {result['ops']:6} ops | {result['seconds']:10.4f} s | p50 {result['p50_ms']:9.4f} ms")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n✓ Wyniki zapisane do {args.out}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        params, env = meta_differences(report, baseline)
+        if params and not args.force:
+            print(f"\n✗ Nie porównuję z {args.baseline} - inne parametry przebiegu:")
+            for key, old, new in params:
+                print(f"  {key}: {old} → {new}")
+            print("  Uruchom z tymi samymi --size/--ops/--seed albo dodaj --force")
+            return 2
+        print(f"\nPorównanie z {args.baseline} (tolerancja {args.tolerance:.0%}):")
+        for key, old, new in params + env:
+            print(f"  ! inne {key}: {old} → {new} - wyniki mogą być nieporównywalne")
+        regressions = 0
+        comparison = compare(report, baseline, args.tolerance, args.min_delta_ms, force=args.force)
+        for name, old, new, change, verdict in comparison:
+            if change is None:
+                print(f"  {name:38} {verdict}")
+                continue
+            print(f"  {name:38} p50 {old:9.4f} ms → {new:9.4f} ms ({change:+.0%}) {verdict}")
+            regressions += verdict == "WOLNIEJ"
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
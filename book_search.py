@@ -0,0 +1,194 @@
+# ============================================
+# Wyszukiwanie pełnotekstowe książek (FTS5)
+# ============================================
+# Szukanie po fragmencie tytułu lub autora przez LIKE '%...%' przegląda
+# całą tabelę books. Indeks FTS5 books_fts trzyma słowa z books.tytul
+# i books.autor i znajduje pasujące wiersze bez skanowania tabeli:
+#   - dopasowanie prefiksów: "mistr małg" znajdzie "Mistrz i Małgorzata"
+#   - ranking bm25 - trafienie w tytule waży więcej niż w autorze
+#   - polskie znaki: "zolc" = "żółć", "lodz" = "Łódź"
+#
+# Tokenizer unicode61 z remove_diacritics zdejmuje ogonki (ą, ć, ę, ń, ó,
+# ś, ź, ż), ale "ł" nie jest w Unicode literą z ogonkiem - dlatego indeks
+# czyta dane przez widok books_fts_source, który zamienia ł → l.
+#
+# Indeks jest utrzymywany przez triggery na books, więc add_book(),
+# delete_book() i każda inna zmiana tabeli od razu trafiają do wyszukiwarki.
+# Trigger DELETE wyłącza optymalizację truncate, dlatego
+# bulk_delete.truncate_table() zdejmuje go na czas czyszczenia
+# (suspended_search_index()) i potem odbudowuje pusty indeks.
+#
+#   install_search_index(conn)
+#   search(conn, "orwell 19")
+
+import re
+import unicodedata
+from contextlib import contextmanager
+from sqlite3 import Error, OperationalError
+
+
+# Kolumny indeksu i ich wagi w rankingu bm25
+COLUMNS = ("tytul", "autor")
+WEIGHTS = (10.0, 5.0)
+
+_FOLD_SQL = "replace(replace({0}, 'ł', 'l'), 'Ł', 'L')"
+_WORD = re.compile(r"\w+")
+
+SEARCH_SCHEMA_SQL = [
+    f"""
+    CREATE VIEW IF NOT EXISTS books_fts_source AS
+    SELECT id, {_FOLD_SQL.format('tytul')} AS tytul, {_FOLD_SQL.format('autor')} AS autor
+    FROM books
+    """,
+    # prefix='2 3' - dodatkowe indeksy krótkich prefiksów, żeby "ma*" nie przeglądało całego słownika
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS books_fts USING fts5(
+        tytul, autor,
+        content='books_fts_source', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+    """,
+]
+
+_INSERT_FTS = (f"INSERT INTO books_fts (rowid, tytul, autor) "
+               f"VALUES (NEW.id, {_FOLD_SQL.format('NEW.tytul')}, {_FOLD_SQL.format('NEW.autor')});")
+_DELETE_FTS = (f"INSERT INTO books_fts (books_fts, rowid, tytul, autor) "
+               f"VALUES ('delete', OLD.id, {_FOLD_SQL.format('OLD.tytul')}, {_FOLD_SQL.format('OLD.autor')});")
+
+# nazwa triggera: (zdarzenie, ciało)
+TRIGGERS = {
+    "trg_books_fts_insert": ("AFTER INSERT", _INSERT_FTS),
+    "trg_books_fts_delete": ("AFTER DELETE", _DELETE_FTS),
+    "trg_books_fts_update": ("AFTER UPDATE OF tytul, autor", _DELETE_FTS + " " + _INSERT_FTS),
+}
+
+
+def fold(text):
+    """Tekst bez polskich znaków: "Łódź" → "Lodz" (to samo robi indeks)"""
+    text = text.replace("ł", "l").replace("Ł", "L")
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def _exists(conn, kind, name):
+    sql = "SELECT 1 FROM sqlite_master WHERE type = ? AND name = ?"
+    return conn.execute(sql, (kind, name)).fetchone() is not None
+
+
+def has_search_index(conn):
+    """Czy baza ma indeks books_fts wraz z triggerami"""
+    return _exists(conn, "table", "books_fts") and all(_exists(conn, "trigger", name) for name in TRIGGERS)
+
+
+def _create_triggers(conn):
+    for name, (event, body) in TRIGGERS.items():
+        conn.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {event} ON books BEGIN {body} END")
+
+
+def install_search_index(conn):
+    """
+    Utwórz indeks FTS5 dla books i wypełnij go istniejącymi książkami
+    Funkcja jest idempotentna - gdy indeks już jest, nic nie robi.
+
+    :param conn: obiekt Connection
+    :return: True, jeśli indeks został utworzony w tym wywołaniu
+    """
+    try:
+        if not _exists(conn, "table", "books") or has_search_index(conn):
+            return False
+        conn.commit()
+        with conn:
+            conn.execute("BEGIN")
+            for sql in SEARCH_SCHEMA_SQL:
+                conn.execute(sql)
+            _create_triggers(conn)
+            weights = ", ".join(str(weight) for weight in WEIGHTS)
+            conn.execute("INSERT INTO books_fts (books_fts, rank) VALUES ('rank', ?)", (f"bm25({weights})",))
+            conn.execute("INSERT INTO books_fts (books_fts) VALUES ('rebuild')")
+        print("✓ Indeks wyszukiwania books_fts utworzony")
+        return True
+    except Error as e:
+        print(f"✗ Błąd tworzenia indeksu wyszukiwania: {e}")
+        return False
+
+
+def rebuild_search_index(conn):
+    """Zbuduj indeks od nowa z tabeli books (np. po imporcie z wyłączonymi triggerami)"""
+    with conn:
+        conn.execute("INSERT INTO books_fts (books_fts) VALUES ('rebuild')")
+
+
+@contextmanager
+def suspended_search_index(conn, table):
+    """
+    Zdejmij triggery indeksu na czas bloku (tylko dla tabeli books), potem odbuduj indeks
+    Wywołujący odpowiada za transakcję (BEGIN ... COMMIT) wokół bloku.
+    """
+    active = table == "books" and has_search_index(conn)
+    if active:
+        for name in TRIGGERS:
+            conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+    yield active
+    if active:
+        conn.execute("INSERT INTO books_fts (books_fts) VALUES ('rebuild')")
+        _create_triggers(conn)
+
+
+def build_query(text, prefix=True, column=None):
+    """
+    Zamień frazę użytkownika na zapytanie MATCH
+    Każde słowo w cudzysłowie (bez składni FTS5 od użytkownika), wszystkie słowa muszą wystąpić.
+
+    :param prefix: True - każde słowo dopasowane jako prefiks ("orw" → Orwell)
+    :param column: "tytul" / "autor" - szukaj tylko w tej kolumnie (None = w obu)
+    :return: tekst zapytania lub None, gdy fraza nie zawiera słów
+    """
+    if column is not None and column not in COLUMNS:
+        raise OperationalError(f"no such column: {column}")
+    words = _WORD.findall(fold(text))
+    if not words:
+        return None
+    star = "*" if prefix else ""
+    query = " ".join(f'"{word}"{star}' for word in words)
+    return f"{column} : ({query})" if column else query
+
+
+def search(conn, text, limit=20, prefix=True, column=None):
+    """
+    Szukaj książek po tytule i autorze - najlepsze trafienia pierwsze
+
+    :param conn: obiekt Connection
+    :param text: fraza, np. "mistrz malgorzata" albo "orw"
+    :param limit: maksymalna liczba wyników
+    :param prefix: dopasowanie prefiksów słów
+    :param column: ogranicz do "tytul" lub "autor"
+    :return: lista (id, tytul, autor, rok_wydania, kategoria, dostepna) jak select_all_books()
+    """
+    query = build_query(text, prefix, column)
+    if query is None:
+        return []
+    # Najpierw najlepsze trafienia z samego indeksu (ORDER BY rank LIMIT),
+    # dopiero potem złączenie - JOIN dotyczy tylko "limit" wierszy
+    sql = """
+    SELECT books.id, books.tytul, books.autor, books.rok_wydania,
+           categories.nazwa, books.dostepna
+    FROM (SELECT rowid, rank FROM books_fts WHERE books_fts MATCH ? ORDER BY rank LIMIT ?) AS hits
+    INNER JOIN books ON books.id = hits.rowid
+    INNER JOIN categories ON books.category_id = categories.id
+    ORDER BY hits.rank
+    """
+    return conn.execute(sql, (query, limit)).fetchall()
+
+
+if __name__ == "__main__":
+    import sqlite3
+    import sys
+
+    conn = sqlite3.connect("moja_biblioteka.db")
+    install_search_index(conn)
+    for phrase in sys.argv[1:] or ["orwell", "mistrz malg", "małgorzata", "code"]:
+        print(f"\nSzukaj: {phrase!r}")
+        for book in search(conn, phrase):
+            print(f"  • {book[1]} - {book[2]} ({book[3]})")
+    conn.close()
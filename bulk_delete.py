@@ -0,0 +1,205 @@
+# ============================================
+# Masowe usuwanie - delete_many() partiami
+# ============================================
+# delete_where(conn, "tasks", id=3) usuwa jeden zestaw warunków
+# i robi commit - 100 000 id to 100 000 zapytań i 100 000 fsync.
+# delete_many() zbiera klucze w paczki "WHERE id IN (?, ?, ...)"
+# tak duże, jak pozwala limit parametrów SQLite, i każdą paczkę
+# usuwa w jednej transakcji.
+#
+#   delete_many(conn, "tasks", [1, 2, 3, ...])                       # po id
+#   delete_many(conn, "tasks", [(1, "Ukończone"), (2, "W trakcie")],
+#               columns=("project_id", "status"))                    # wiele kolumn
+
+import sqlite3
+import time
+from itertools import islice
+from sqlite3 import OperationalError, ProgrammingError
+
+from statement_cache import table_columns
+from book_search import suspended_search_index
+from dictionary_encoding import encode, is_encoded
+from epoch_dates import suspended_interval_index
+from table_counters import suspended_counters
+
+# Domyślny limit parametrów w starszych wersjach SQLite
+_FALLBACK_VARIABLE_LIMIT = 999
+# Górna granica paczki - nowsze SQLite pozwalają na 250 000 parametrów,
+# ale tak duża transakcja długo blokuje bazę i rzadko raportuje postęp
+DEFAULT_CHUNK_SIZE = 10000
+
+
+def variable_limit(conn):
+    """Maksymalna liczba parametrów "?" w jednym poleceniu dla tego połączenia"""
+    getlimit = getattr(conn, "getlimit", None)  # Python 3.11+
+    if getlimit is None:
+        return _FALLBACK_VARIABLE_LIMIT
+    return getlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER)
+
+
+def _require_no_transaction(conn, operation):
+    if conn.in_transaction:
+        raise ProgrammingError(f"{operation}() wymaga połączenia bez otwartej transakcji - "
+                               "najpierw zatwierdź lub wycofaj własne zmiany")
+
+
+def _build_delete_sql(table, columns, count):
+    if len(columns) == 1:
+        placeholders = ", ".join("?" * count)
+        return f"DELETE FROM {table} WHERE {columns[0]} IN ({placeholders})"
+    # Wiele kolumn: (a, b) IN (VALUES (?, ?), (?, ?), ...)
+    row = "(" + ", ".join("?" * len(columns)) + ")"
+    values = ", ".join([row] * count)
+    return f"DELETE FROM {table} WHERE ({', '.join(columns)}) IN (VALUES {values})"
+
+
+def delete_many(conn, table, keys, columns=("id",), chunk_size=None, progress=None):
+    """
+    Usuń wiele wierszy partiami
+
+    :param conn: obiekt Connection
+    :param table: nazwa tabeli
+    :param keys: iterowalny obiekt kluczy - wartości (jedna kolumna) lub krotki (wiele kolumn)
+    :param columns: kolumny, po których szukamy (domyślnie id)
+    :param chunk_size: ile kluczy na paczkę (None = DEFAULT_CHUNK_SIZE); zawsze w granicach limitu parametrów
+    :param progress: funkcja (przetworzone_klucze, usunięte_wiersze) wołana po każdej paczce
+    :return: słownik z podsumowaniem (keys, deleted, chunks, seconds)
+    :raises ProgrammingError: gdy połączenie ma otwartą transakcję (każda paczka
+                              to osobny commit, który zatwierdziłby też ją)
+    """
+    _require_no_transaction(conn, "delete_many")
+    if isinstance(columns, str):
+        columns = (columns,)
+    columns = tuple(columns)
+    known = table_columns(conn, table)
+    for column in columns:
+        if column not in known:
+            raise OperationalError(f"no such column: {column}")
+
+    # Kolumny ze słownikiem (dictionary_encoding.py) - teksty w kluczach zamieniamy na kody
+    encoded = [i for i, column in enumerate(columns) if is_encoded(conn, table, column)]
+
+    max_keys = variable_limit(conn) // len(columns)
+    chunk_size = min(chunk_size or DEFAULT_CHUNK_SIZE, max_keys)
+    single = len(columns) == 1
+
+    processed = deleted = chunks = 0
+    sql_cache = {}
+    start = time.perf_counter()
+    keys = iter(keys)
+    while True:
+        chunk = list(islice(keys, chunk_size))
+        if not chunk:
+            break
+        if single:
+            parameters = chunk
+        else:
+            parameters = [value for key in chunk for value in key]
+            if len(parameters) != len(chunk) * len(columns):
+                raise ValueError(f"Każdy klucz musi mieć {len(columns)} wartości: {columns}")
+        for i in encoded:
+            parameters[i::len(columns)] = [encode(conn, table, columns[i], value)
+                                           for value in parameters[i::len(columns)]]
+        # Tylko ostatnia paczka ma inny rozmiar - tekst SQL dla pełnych paczek się powtarza
+        sql = sql_cache.get(len(chunk))
+        if sql is None:
+            sql = sql_cache[len(chunk)] = _build_delete_sql(table, columns, len(chunk))
+        with conn:
+            deleted += conn.execute(sql, parameters).rowcount
+        processed += len(chunk)
+        chunks += 1
+        if progress is not None:
+            progress(processed, deleted)
+
+    return {
+        "table": table,
+        "keys": processed,
+        "deleted": deleted,
+        "chunks": chunks,
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+
+
+# ============================================
+# Szybkie czyszczenie całej tabeli + odzyskanie miejsca
+# ============================================
+# "DELETE FROM tabela" bez WHERE SQLite wykonuje jako truncate - zwalnia
+# całe strony tabeli zamiast usuwać wiersz po wierszu. Optymalizacja nie
+# działa, gdy tabela ma triggery DELETE albo jest rodzicem klucza obcego
+# przy PRAGMA foreign_keys = ON. Triggery liczników (table_counters.py)
+# i wyszukiwarki (book_search.py) są na czas czyszczenia zdejmowane.
+# Zwolnione strony trafiają na freelist, więc plik się nie zmniejsza -
+# do tego służy VACUUM.
+
+VACUUM_POLICIES = ("none", "incremental", "full", "auto")
+
+
+def _database_bytes(conn):
+    page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+    page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+    freelist = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    return page_size * page_count, page_size * freelist
+
+
+def truncate_table(conn, table, reset_sequence=False, vacuum="auto", auto_threshold=0.25):
+    """
+    Usuń wszystkie wiersze tabeli i (opcjonalnie) odzyskaj miejsce na dysku
+
+    :param conn: obiekt Connection
+    :param table: nazwa tabeli
+    :param reset_sequence: True - wyzeruj licznik AUTOINCREMENT (sqlite_sequence)
+    :param vacuum: polityka odzyskiwania miejsca:
+        "none"        - zostaw wolne strony w pliku
+        "incremental" - PRAGMA incremental_vacuum (wymaga auto_vacuum = INCREMENTAL)
+        "full"        - VACUUM całej bazy (przepisuje plik, wymaga wolnego miejsca)
+        "auto"        - incremental, jeśli baza go obsługuje; w przeciwnym razie
+                        full, gdy wolne strony to więcej niż auto_threshold pliku
+    :return: słownik (deleted, vacuum, bytes_before, bytes_after, bytes_reclaimed, seconds)
+    :raises ProgrammingError: gdy połączenie ma otwartą transakcję
+    """
+    if vacuum not in VACUUM_POLICIES:
+        raise ValueError(f"Nieznana polityka VACUUM '{vacuum}', dostępne: {', '.join(VACUUM_POLICIES)}")
+    _require_no_transaction(conn, "truncate_table")
+    table_columns(conn, table)  # sprawdza, czy tabela istnieje
+
+    start = time.perf_counter()
+    bytes_before, _ = _database_bytes(conn)
+    with conn:
+        # Jawny BEGIN - zdjęcie i ponowne założenie triggerów w tej samej transakcji
+        conn.execute("BEGIN")
+        with suspended_counters(conn, table), suspended_search_index(conn, table), \
+                suspended_interval_index(conn, table):
+            deleted = conn.execute(f"DELETE FROM {table}").rowcount
+        if reset_sequence and conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'sqlite_sequence'").fetchone():
+            conn.execute("DELETE FROM sqlite_sequence WHERE name = ?", (table,))
+
+    used = vacuum
+    if vacuum == "auto":
+        auto_vacuum = conn.execute("PRAGMA auto_vacuum").fetchone()[0]  # 2 = INCREMENTAL
+        size, free = _database_bytes(conn)
+        if auto_vacuum == 2:
+            used = "incremental"
+        elif size and free / size > auto_threshold:
+            used = "full"
+        else:
+            used = "none"
+    if used == "incremental":
+        conn.execute("PRAGMA incremental_vacuum").fetchall()
+        conn.commit()
+    elif used == "full":
+        conn.execute("VACUUM")
+    if used != "none" and conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal":
+        # W trybie WAL plik bazy maleje dopiero po checkpoincie
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+
+    bytes_after, _ = _database_bytes(conn)
+    return {
+        "table": table,
+        "deleted": deleted,
+        "vacuum": used,
+        "bytes_before": bytes_before,
+        "bytes_after": bytes_after,
+        "bytes_reclaimed": bytes_before - bytes_after,
+        "seconds": round(time.perf_counter() - start, 3),
+    }
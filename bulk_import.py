@@ -0,0 +1,340 @@
+# ============================================
+# Masowy import projektów i zadań z CSV / JSONL
+# ============================================
+# add_sample_data() (6_get_data.py) i create_sample_data() (7_read_data.py)
+# wstawiają dane z listy w pamięci. Tu czytamy plik strumieniowo,
+# kawałek po kawałku (chunk), więc zużycie pamięci nie rośnie z rozmiarem pliku.
+#
+# Co robi import:
+#   1. czyta wiersze z CSV (nagłówek = nazwy kolumn) lub JSONL (jeden obiekt JSON na linię)
+#   2. sprawdza typy (liczby całkowite, wymagane pola, daty ISO)
+#   3. dla zadań rozwiązuje project_id - po ID albo po nazwie projektu (kolumna "projekt")
+#   4. status zadania zamienia na kod ze słownika, gdy kolumna jest zakodowana
+#      (dictionary_encoding.py) - trigger nie musi poprawiać każdego wiersza
+#   5. na czas importu usuwa indeksy tabeli (poza UNIQUE) i odtwarza je na końcu
+#   6. wstawia executemany() w dużych transakcjach - własnych, więc nie można
+#      go wołać w otwartej transakcji wywołującego
+
+import csv
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from itertools import islice
+from sqlite3 import Error, IntegrityError, ProgrammingError
+
+from dictionary_encoding import encode_value, get_dictionary, is_encoded
+
+
+# Kolumny tabel: (nazwa, typ, wymagana)
+SCHEMAS = {
+    "projects": [
+        ("id", int, False),
+        ("nazwa", str, True),
+        ("start_date", "date", False),
+        ("end_date", "date", False),
+    ],
+    "tasks": [
+        ("id", int, False),
+        ("project_id", int, True),
+        ("nazwa", str, True),
+        ("opis", str, False),
+        ("status", str, True),
+        ("start_date", "date", True),
+        ("end_date", "date", True),
+    ],
+}
+
+
+class MalformedLine(ValueError):
+    """Linia JSONL, która nie jest obiektem JSON (read_rows(..., strict=False))"""
+
+    def __init__(self, line, message):
+        super().__init__(f"niepoprawna linia JSONL: {message}")
+        self.line = line
+
+
+def read_rows(path, file_format=None, strict=True):
+    """
+    Czytaj wiersze z pliku jako słowniki - generator, nic nie trzyma w pamięci
+    :param path: ścieżka do pliku .csv lub .jsonl
+    :param file_format: "csv" / "jsonl" (None = rozpoznaj po rozszerzeniu)
+    :param strict: True - uszkodzona linia JSONL zgłasza wyjątek;
+                   False - zamiast wiersza dostajemy MalformedLine i czytamy dalej
+    """
+    if file_format is None:
+        file_format = os.path.splitext(path)[1].lstrip(".").lower()
+    if file_format == "csv":
+        with open(path, newline="", encoding="utf-8") as f:
+            yield from csv.DictReader(f)
+    elif file_format in ("jsonl", "ndjson"):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    row = json.loads(line)
+                    if not isinstance(row, dict):
+                        raise MalformedLine(line, f"oczekiwano obiektu, jest {type(row).__name__}")
+                except json.JSONDecodeError as e:
+                    row = MalformedLine(line, e.msg)
+                except MalformedLine as e:
+                    row = e
+                if isinstance(row, MalformedLine) and strict:
+                    raise row
+                yield row
+    else:
+        raise ValueError(f"Nieobsługiwany format pliku: {file_format}")
+
+
+def _check_date(value):
+    # Akceptujemy "2024-01-01" i "2024-01-01 12:00:00", zapisujemy bez zmian
+    datetime.fromisoformat(value)
+    return value
+
+
+_CONVERTERS = {int: int, str: str, "date": _check_date}
+
+
+def _make_validator(table):
+    """
+    Przygotuj funkcję walidującą wiersze danej tabeli
+    Konwertery wybieramy raz, a nie dla każdego wiersza osobno.
+    """
+    columns = [(name, _CONVERTERS[kind], required) for name, kind, required in SCHEMAS[table]]
+
+    def validate(row):
+        values = []
+        append = values.append
+        for name, convert, required in columns:
+            value = row.get(name)
+            if value is None or value == "":
+                if required:
+                    raise ValueError(f"brak wymaganego pola '{name}'")
+                append(None)
+                continue
+            try:
+                append(convert(value))
+            except (TypeError, ValueError):
+                raise ValueError(f"niepoprawna wartość pola '{name}': {value!r}")
+        return tuple(values)
+    return validate
+
+
+def validate_row(table, row):
+    """
+    Zamień wiersz (słownik) na krotkę w kolejności kolumn tabeli
+    :return: krotka wartości
+    :raises ValueError: gdy brakuje wymaganego pola albo typ się nie zgadza
+    """
+    return _make_validator(table)(row)
+
+
+class _ProjectResolver:
+    """Rozwiązywanie project_id - po ID lub po nazwie projektu"""
+
+    def __init__(self, conn):
+        self.ids = set()
+        self.by_name = {}
+        for project_id, nazwa in conn.execute("SELECT id, nazwa FROM projects"):
+            self.ids.add(project_id)
+            self.by_name.setdefault(nazwa, project_id)
+
+    def resolve(self, row):
+        if row.get("project_id") in (None, "") and row.get("projekt"):
+            project_id = self.by_name.get(row["projekt"])
+            if project_id is None:
+                raise ValueError(f"nieznany projekt '{row['projekt']}'")
+            row = dict(row, project_id=project_id)
+        elif row.get("project_id") not in (None, ""):
+            try:
+                project_id = int(row["project_id"])
+            except (TypeError, ValueError):
+                raise ValueError(f"niepoprawne project_id: {row['project_id']!r}")
+            if project_id not in self.ids:
+                raise ValueError(f"projekt o ID {project_id} nie istnieje")
+        return row
+
+
+class _StatusEncoder:
+    """Status zadania → kod ze słownika (słownik z pamięci, nowe teksty dopisywane raz)"""
+
+    POSITION = [name for name, _, _ in SCHEMAS["tasks"]].index("status")
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.codes = dict(get_dictionary(conn, "tasks", "status").codes)
+
+    def encode(self, values):
+        status = values[self.POSITION]
+        code = self.codes.get(status)
+        if code is None:
+            # Nowy tekst - dopisany do słownika w bieżącej transakcji importu
+            code = self.codes[status] = encode_value(self.conn, "tasks", "status", status)
+        return values[:self.POSITION] + (code,) + values[self.POSITION + 1:]
+
+
+def _insert_batch(conn, sql, batch, reject):
+    """
+    Wstaw paczkę jednym executemany()
+    Gdy któryś wiersz łamie ograniczenie bazy (IntegrityError), paczka jest
+    wycofywana do SAVEPOINT i wstawiana wiersz po wierszu - odrzucone zostają
+    tylko złe wiersze, reszta paczki trafia do bazy.
+    :param batch: lista (numer_wiersza, wiersz, krotka wartości)
+    :return: liczba wstawionych wierszy
+    """
+    if not conn.in_transaction:
+        # Jawny BEGIN - RELEASE zewnętrznego SAVEPOINT zatwierdziłby transakcję
+        conn.execute("BEGIN")
+    conn.execute("SAVEPOINT import_chunk")
+    try:
+        conn.executemany(sql, [values for _, _, values in batch])
+        conn.execute("RELEASE import_chunk")
+        return len(batch)
+    except IntegrityError:
+        conn.execute("ROLLBACK TO import_chunk")
+    inserted = 0
+    for line_no, row, values in batch:
+        try:
+            conn.execute(sql, values)
+            inserted += 1
+        except IntegrityError as e:
+            reject(line_no, row, str(e))
+    conn.execute("RELEASE import_chunk")
+    return inserted
+
+
+def _drop_indexes(conn, table):
+    """
+    Usuń indeksy tabeli i zwróć ich definicje do późniejszego odtworzenia
+    Indeksy UNIQUE zostają: bez nich import wpuściłby duplikaty, a CREATE UNIQUE
+    INDEX na końcu by się nie udał - tabela zostałaby bez ograniczenia.
+    """
+    rows = conn.execute(
+        "SELECT m.name, m.sql FROM sqlite_master AS m "
+        "JOIN pragma_index_list(?) AS i ON i.name = m.name "
+        "WHERE m.type = 'index' AND m.sql IS NOT NULL AND NOT i.\"unique\"",
+        (table,),
+    ).fetchall()
+    for name, _ in rows:
+        conn.execute(f'DROP INDEX "{name}"')
+    return [sql for _, sql in rows]
+
+
+def bulk_import(conn, table, source, chunk_size=10000, commit_every=200000,
+                defer_indexes=True, on_error=None):
+    """
+    Zaimportuj wiersze do tabeli projects lub tasks
+
+    :param conn: obiekt Connection
+    :param table: "projects" albo "tasks"
+    :param source: ścieżka do pliku .csv/.jsonl albo iterowalny obiekt słowników
+    :param chunk_size: ile wierszy na jedno executemany()
+    :param commit_every: ile wierszy na jedną transakcję
+    :param defer_indexes: True - usuń indeksy na czas importu i odtwórz je na końcu
+    :param on_error: funkcja (numer_wiersza, wiersz, komunikat) dla odrzuconych wierszy -
+                     błędne dane, uszkodzone linie JSONL i wiersze łamiące ograniczenia bazy
+    :return: słownik z podsumowaniem (inserted, rejected, seconds, rows_per_second)
+    :raises ProgrammingError: gdy połączenie ma otwartą transakcję - import
+                              zatwierdza własne transakcje, więc zatwierdziłby też ją
+
+    Każdy inny błąd przerywa import: bieżąca transakcja jest wycofywana
+    (wcześniej zatwierdzone co commit_every wiersze zostają), indeksy są odtwarzane.
+    """
+    if table not in SCHEMAS:
+        raise ValueError(f"Nieobsługiwana tabela: {table}")
+    if conn.in_transaction:
+        raise ProgrammingError("bulk_import() wymaga połączenia bez otwartej transakcji - "
+                               "najpierw zatwierdź lub wycofaj własne zmiany")
+
+    rows = read_rows(source, strict=False) if isinstance(source, str) else iter(source)
+    columns = [name for name, _, _ in SCHEMAS[table]]
+    sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+    resolver = _ProjectResolver(conn) if table == "tasks" else None
+    encoder = _StatusEncoder(conn) if table == "tasks" and is_encoded(conn, "tasks", "status") else None
+    validate = _make_validator(table)
+
+    inserted = line_no = in_transaction = 0
+    rejected = []
+
+    def reject(line_no, row, message):
+        rejected.append(line_no)
+        if on_error is not None:
+            on_error(line_no, row, message)
+
+    start = time.perf_counter()
+    index_sql = _drop_indexes(conn, table) if defer_indexes else []
+    try:
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+            batch = []
+            for row in chunk:
+                line_no += 1
+                if isinstance(row, MalformedLine):
+                    reject(line_no, row.line, str(row))
+                    continue
+                try:
+                    if not isinstance(row, dict):
+                        raise ValueError(f"wiersz nie jest słownikiem: {row!r}")
+                    if resolver is not None:
+                        row = resolver.resolve(row)
+                    values = validate(row)
+                    batch.append((line_no, row, values if encoder is None else encoder.encode(values)))
+                except ValueError as e:
+                    reject(line_no, row, str(e))
+            if batch:
+                added = _insert_batch(conn, sql, batch, reject)
+                inserted += added
+                in_transaction += added
+            if in_transaction >= commit_every:
+                conn.commit()
+                in_transaction = 0
+        conn.commit()
+    except BaseException:
+        # Także błąd spoza sqlite3 (np. z pliku) - nie zatwierdzamy połowy paczki
+        conn.rollback()
+        raise
+    finally:
+        # Indeksy odtwarzamy także po błędzie, żeby nie zostawić bazy bez nich
+        for statement in index_sql:
+            conn.execute(statement)
+        conn.commit()
+
+    seconds = time.perf_counter() - start
+    return {
+        "table": table,
+        "inserted": inserted,
+        "rejected": len(rejected),
+        "seconds": round(seconds, 3),
+        "rows_per_second": int(inserted / seconds) if seconds else inserted,
+    }
+
+
+if __name__ == "__main__":
+    # python bulk_import.py project_manager.db tasks zadania.csv
+    if len(sys.argv) != 4:
+        print("Użycie: python bulk_import.py <baza.db> <projects|tasks> <plik.csv|plik.jsonl>")
+        sys.exit(1)
+
+    import sqlite3
+    import pragma_profiles
+
+    db_file, table, path = sys.argv[1:]
+    try:
+        conn = sqlite3.connect(db_file)
+        pragma_profiles.apply_profile(conn, "bulk-load")
+
+        def print_error(line_no, row, message):
+            print(f"✗ Wiersz {line_no}: {message}")
+
+        summary = bulk_import(conn, table, path, on_error=print_error)
+        print(f"✓ Zaimportowano {summary['inserted']} wierszy do '{table}' "
+              f"({summary['rejected']} odrzuconych) w {summary['seconds']} s "
+              f"- {summary['rows_per_second']} wierszy/s")
+        conn.close()
+    except (Error, OSError, ValueError) as e:
+        print(f"✗ Błąd importu: {e}")
@@ -0,0 +1,303 @@
+# ============================================
+# Pula połączeń SQLite - wspólna dla wszystkich skryptów
+# ============================================
+# Zamiast otwierać nowe sqlite3.connect() przy każdym wywołaniu
+# create_connection(), pożyczamy gotowe połączenie z puli.
+# Pula jest osobna dla każdego pliku bazy i profilu PRAGMA
+# (klucz = pełna ścieżka + nazwa profilu z pragma_profiles.py).
+
+import os
+import sqlite3
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from sqlite3 import Error
+
+import epoch_dates
+import pragma_profiles
+
+
+class PoolTimeoutError(Error):
+    """Brak wolnego połączenia w puli w zadanym czasie"""
+
+
+class PooledConnection:
+    """
+    Połączenie pożyczone z puli
+    Zachowuje się jak sqlite3.Connection, ale close() oddaje je do puli
+    zamiast zamykać plik bazy. Obiekt porzucony bez close() oddaje połączenie
+    przy sprzątaniu (weakref.finalize) - inaczej jego miejsce w puli byłoby
+    zajęte na zawsze, a acquire(timeout=None) czekałoby bez końca.
+    """
+
+    def __init__(self, pool, conn):
+        self._pool = pool
+        self._conn = conn
+        self._finalizer = weakref.finalize(self, pool.release, conn)
+
+    @property
+    def raw(self):
+        """Oryginalny obiekt sqlite3.Connection"""
+        return self._conn
+
+    def close(self):
+        """Oddaj połączenie do puli (można wołać wielokrotnie)"""
+        if self._conn is not None:
+            self._conn = None
+            # finalize wywołuje release() najwyżej raz - także gdy obiekt zniknie później
+            self._finalizer()
+
+    def __getattr__(self, name):
+        if self._conn is None:
+            raise sqlite3.ProgrammingError("Połączenie zostało już oddane do puli")
+        return getattr(self._conn, name)
+
+    def __enter__(self):
+        self._conn.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return self._conn.__exit__(exc_type, exc, tb)
+
+
+class ConnectionPool:
+    """
+    Pula połączeń do jednego pliku bazy SQLite
+
+    :param db_file: ścieżka do pliku bazy
+    :param max_size: maksymalna liczba otwartych połączeń (wolne + pożyczone)
+    :param idle_timeout: po ilu sekundach bezczynności zamknąć wolne połączenie
+    :param initializer: funkcja wołana raz na każdym NOWYM połączeniu, np. PRAGMA
+    :param profile: profil PRAGMA z pragma_profiles ustawiany na każdym NOWYM połączeniu
+                    (przed initializer)
+    """
+
+    def __init__(self, db_file, max_size=5, idle_timeout=60.0, initializer=None, profile=None):
+        if _is_private_db(db_file):
+            raise sqlite3.NotSupportedError(
+                f"Baza '{db_file}' jest osobna dla każdego połączenia - nie można jej współdzielić w puli"
+            )
+        pragma_profiles.check_profile(profile)
+        self.db_file = db_file
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.initializer = initializer
+        self.profile = profile
+        self._idle = []          # lista (conn, czas_oddania)
+        self._in_use = 0
+        self._lock = threading.Condition()
+        self._closed = False
+        self.created = 0         # statystyki
+        self.reused = 0
+        self.discarded = 0
+
+    def _open(self):
+        # epoch_dates.connect - kolumny dat EPOCH wracają jako datetime, tak jak bez puli
+        conn = epoch_dates.connect(self.db_file, check_same_thread=False)
+        pragma_profiles.apply_profile(conn, self.profile)
+        if self.initializer is not None:
+            self.initializer(conn)
+        self.created += 1
+        return conn
+
+    def _is_healthy(self, conn):
+        """Health check - proste SELECT 1 na połączeniu"""
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except Error:
+            return False
+
+    def _prune_idle(self):
+        """Zamknij połączenia bezczynne dłużej niż idle_timeout"""
+        if self.idle_timeout is None:
+            return
+        now = time.monotonic()
+        keep = []
+        for conn, released_at in self._idle:
+            if now - released_at > self.idle_timeout:
+                conn.close()
+                self.discarded += 1
+            else:
+                keep.append((conn, released_at))
+        self._idle = keep
+
+    def acquire(self, timeout=None):
+        """
+        Pożycz połączenie z puli
+        :param timeout: ile sekund czekać na wolne połączenie (None = bez limitu)
+        :return: obiekt sqlite3.Connection
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            while True:
+                if self._closed:
+                    raise sqlite3.ProgrammingError("Pula jest zamknięta")
+                self._prune_idle()
+                while self._idle:
+                    conn, _ = self._idle.pop()
+                    if self._is_healthy(conn):
+                        self._in_use += 1
+                        self.reused += 1
+                        return conn
+                    conn.close()
+                    self.discarded += 1
+                if self._in_use < self.max_size:
+                    # Rezerwujemy miejsce zanim otworzymy plik poza blokadą
+                    self._in_use += 1
+                    break
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise PoolTimeoutError(
+                        f"Brak wolnego połączenia do '{self.db_file}' (max_size={self.max_size})"
+                    )
+                self._lock.wait(remaining)
+        try:
+            return self._open()
+        except Exception:
+            with self._lock:
+                self._in_use -= 1
+                self._lock.notify()
+            raise
+
+    def release(self, conn):
+        """
+        Oddaj połączenie do puli
+        Niezatwierdzona transakcja jest wycofywana (tak jak przy conn.close()).
+        """
+        with self._lock:
+            self._in_use -= 1
+            try:
+                if conn.in_transaction:
+                    conn.rollback()
+                healthy = not self._closed
+            except Error:
+                healthy = False
+            if healthy:
+                self._idle.append((conn, time.monotonic()))
+            else:
+                conn.close()
+                self.discarded += 1
+            self._lock.notify()
+
+    @contextmanager
+    def connection(self, timeout=None):
+        """
+        Context manager - pożycz połączenie i oddaj je automatycznie
+
+        with pool.connection() as conn:
+            conn.execute(...)
+        """
+        conn = self.acquire(timeout)
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close_all(self):
+        """Zamknij wszystkie wolne połączenia i zablokuj pulę"""
+        with self._lock:
+            self._closed = True
+            for conn, _ in self._idle:
+                conn.close()
+            self._idle = []
+            self._lock.notify_all()
+
+    def stats(self):
+        """Słownik ze stanem puli"""
+        with self._lock:
+            return {
+                "db_file": self.db_file,
+                "profile": self.profile,
+                "idle": len(self._idle),
+                "in_use": self._in_use,
+                "max_size": self.max_size,
+                "created": self.created,
+                "reused": self.reused,
+                "discarded": self.discarded,
+            }
+
+
+# ============================================
+# Rejestr pul - jedna pula na plik bazy i profil
+# ============================================
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _is_private_db(db_file):
+    # ":memory:" i "" (baza tymczasowa) to za każdym razem inna, pusta baza -
+    # połączenie z puli nie widziałoby danych zapisanych przez poprzednie
+    return str(db_file) in (":memory:", "")
+
+
+def _pool_key(db_file):
+    if str(db_file).startswith("file:"):
+        return str(db_file)
+    return os.path.abspath(db_file)
+
+
+def get_pool(db_file, max_size=5, idle_timeout=60.0, initializer=None, profile=None):
+    """
+    Pobierz (lub utwórz) wspólną pulę dla danego pliku bazy i profilu
+    Każdy profil ma własną pulę, więc połączenie zawsze ma PRAGMA z profilu,
+    o który prosimy. Pozostałe parametry (max_size, idle_timeout, initializer)
+    są brane pod uwagę tylko przy pierwszym utworzeniu puli.
+    :raises ValueError: gdy profil nie istnieje
+    :raises sqlite3.NotSupportedError: dla ":memory:" - każde połączenie to inna baza
+    """
+    pragma_profiles.check_profile(profile)
+    key = (_pool_key(db_file), profile)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = ConnectionPool(db_file, max_size, idle_timeout, initializer, profile)
+            _pools[key] = pool
+        return pool
+
+
+def connect(db_file, timeout=None, initializer=None, profile=None):
+    """
+    Odpowiednik sqlite3.connect() korzystający z puli
+    Zwraca PooledConnection - conn.close() oddaje połączenie do puli.
+    :param initializer: patrz get_pool() - liczy się tylko przy tworzeniu puli
+    :param profile: profil PRAGMA z pragma_profiles - wybiera pulę (patrz get_pool())
+    """
+    pool = get_pool(db_file, initializer=initializer, profile=profile)
+    return PooledConnection(pool, pool.acquire(timeout))
+
+
+@contextmanager
+def pooled_connection(db_file, timeout=None, profile=None):
+    """Context manager na wspólnej puli dla db_file i profilu"""
+    with get_pool(db_file, profile=profile).connection(timeout) as conn:
+        yield conn
+
+
+def close_all_pools():
+    """Zamknij wszystkie pule (np. na końcu programu)"""
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close_all()
+        _pools.clear()
+
+
+if __name__ == "__main__":
+    print("="*70)
+    print("PULA POŁĄCZEŃ - DEMONSTRACJA")
+    print("="*70)
+
+    pool = get_pool("database.db", max_size=2)
+
+    for i in range(5):
+        with pool.connection() as conn:
+            conn.execute("SELECT 1")
+
+    conn = connect("database.db")
+    print(f"✓ Pożyczone połączenie: {conn.raw}")
+    conn.close()
+
+    print(f"✓ Statystyki puli: {pool.stats()}")
+    close_all_pools()
@@ -0,0 +1,330 @@
+# ============================================
+# Kodowanie słownikowe: status zadania, typ czujnika
+# ============================================
+# tasks.status ("W trakcie", "Ukończone", "Oczekujące", "started") i
+# sensors.typ powtarzają ten sam tekst w każdym wierszu. Po
+# enable_encoding(conn) wiersz trzyma tylko mały kod (INTEGER), a teksty
+# leżą raz w tabeli słownika:
+#   task_statuses (id, nazwa)   sensor_types (id, nazwa)
+# idx_tasks_status jest wtedy indeksem na liczbach - filtr po statusie
+# porównuje liczby, a wiersze i indeks są mniejsze.
+#
+# Funkcje z 5_db_funkctions.py, 6_get_data.py, 7_read_data.py i
+# 00_Bazy_piach.py dalej przyjmują i zwracają teksty:
+#   - encode(): tekst → kod ze słownika w pamięci (bez zapytania do bazy)
+#   - decode() / decode_column(): kod → tekst w zwracanych wierszach
+#   - encode_value(): wartość do zapisu - tekst spoza słownika jest od razu
+#     dopisywany do słownika (add_task, update_task_status, update() z 11_update.py)
+#   - nowy tekst zapisany wprost w kolumnie (własny INSERT / UPDATE) zamienia
+#     trigger: dopisuje go do słownika i wstawia kod. Wyjątek: tekst wyglądający
+#     jak liczba ("1") kolumna INTEGER zamienia na liczbę, zanim trigger go
+#     zobaczy - taki tekst trzeba zapisać przez encode_value()
+#
+#   enable_encoding(conn)
+#   encode(conn, "tasks", "status", "W trakcie")  # → 2
+#   decode(conn, "tasks", "status", 2)            # → "W trakcie"
+
+import os
+import re
+import threading
+from sqlite3 import Error
+
+from schema_rebuild import declared_types, rebuild_session, rebuild_table
+from table_counters import has_counters, rebuild_counters, refresh_counter_triggers
+
+
+# (tabela, kolumna): tabela słownika
+ENCODED_COLUMNS = {
+    ("tasks", "status"): "task_statuses",
+    ("sensors", "typ"): "sensor_types",
+}
+
+CODE_TYPE = "INTEGER"
+
+# Tekst, który kolumna INTEGER zamienia na liczbę (powinowactwo typu) - zanim zobaczy go trigger
+_NUMERIC_TEXT = re.compile(r"\s*[+-]?(\d+(\.\d*)?|\.\d+)([eE][+-]?\d+)?\s*")
+
+
+def _triggers(table, column, lookup):
+    """{nazwa triggera: (zdarzenie, ciało)} - tekst wpisany do kolumny zamieniany na kod"""
+    body = f"""
+    INSERT OR IGNORE INTO {lookup} (nazwa) VALUES (NEW.{column});
+    UPDATE {table} SET {column} = (SELECT id FROM {lookup} WHERE nazwa = NEW.{column}) WHERE id = NEW.id;
+    """
+    return {
+        f"trg_{table}_{column}_encode_insert": ("AFTER INSERT", body),
+        f"trg_{table}_{column}_encode_update": (f"AFTER UPDATE OF {column}", body),
+    }
+
+
+class Dictionary:
+    """
+    Słownik kod ↔ tekst jednej tabeli słownika, w pamięci
+    Brakujący kod lub tekst → ponowne wczytanie tabeli (ktoś mógł dopisać nową wartość).
+    """
+
+    def __init__(self, lookup):
+        self.lookup = lookup
+        self.codes = {}
+        self.names = {}
+        self._lock = threading.Lock()
+
+    def load(self, conn):
+        rows = conn.execute(f"SELECT id, nazwa FROM {self.lookup}").fetchall()
+        with self._lock:
+            self.names = dict(rows)
+            self.codes = {nazwa: code for code, nazwa in rows}
+
+    def code(self, conn, nazwa):
+        """Kod tekstu albo None, gdy tekstu nie ma w słowniku"""
+        code = self.codes.get(nazwa)
+        if code is None:
+            self.load(conn)
+            code = self.codes.get(nazwa)
+        return code
+
+    def name(self, conn, code):
+        nazwa = self.names.get(code)
+        if nazwa is None:
+            self.load(conn)
+            nazwa = self.names.get(code, code)
+        return nazwa
+
+
+# ============================================
+# Słowniki dla bazy - ładowane raz na proces
+# ============================================
+
+# (pełna ścieżka pliku bazy, tabela słownika) → Dictionary (baza w pamięci: samo połączenie)
+_dictionaries = {}
+# (pełna ścieżka pliku bazy, tabela, kolumna) → czy kolumna jest zakodowana
+_encoded = {}
+_lock = threading.Lock()
+
+
+def _key(conn):
+    for _, name, path in conn.execute("PRAGMA database_list").fetchall():
+        if name == "main":
+            return os.path.abspath(path) if path else conn
+    return conn
+
+
+def _exists(conn, kind, name):
+    sql = "SELECT 1 FROM sqlite_master WHERE type = ? AND name = ?"
+    return conn.execute(sql, (kind, name)).fetchone() is not None
+
+
+def has_encoding(conn, table, column):
+    """Czy kolumna trzyma kody ze słownika (sprawdzane w bazie, bez pamięci podręcznej)"""
+    lookup = ENCODED_COLUMNS.get((table, column))
+    return (lookup is not None
+            and declared_types(conn, table).get(column, "").upper() == CODE_TYPE
+            and _exists(conn, "table", lookup)
+            and all(_exists(conn, "trigger", name) for name in _triggers(table, column, lookup)))
+
+
+def is_encoded(conn, table, column):
+    """has_encoding() zapamiętane na proces"""
+    if (table, column) not in ENCODED_COLUMNS:
+        return False
+    key = (_key(conn), table, column)
+    encoded = _encoded.get(key)
+    if encoded is None:
+        encoded = _encoded[key] = has_encoding(conn, table, column)
+    return encoded
+
+
+def get_dictionary(conn, table, column):
+    """Dictionary kolumny - przy pierwszym użyciu wczytany z bazy"""
+    key = (_key(conn), ENCODED_COLUMNS[(table, column)])
+    with _lock:
+        dictionary = _dictionaries.get(key)
+        if dictionary is None:
+            dictionary = _dictionaries[key] = Dictionary(key[1])
+            dictionary.load(conn)
+    return dictionary
+
+
+def invalidate(conn):
+    """Zapomnij słowniki i stan kodowania bazy (np. po przebudowie w innym procesie)"""
+    key = _key(conn)
+    with _lock:
+        for cache in (_dictionaries, _encoded):
+            for cached in [cached for cached in cache if cached[0] == key]:
+                del cache[cached]
+
+
+# ============================================
+# Kodowanie wartości
+# ============================================
+
+def encode(conn, table, column, value):
+    """
+    Wartość filtra: tekst → kod, gdy kolumna jest zakodowana
+    Tekst spoza słownika nie pasuje do żadnego wiersza - zostaje bez zmian, a gdy
+    wygląda jak liczba (porównanie z kolumną INTEGER zamieniłoby go na kod) - None.
+    Do zapisu służy encode_value().
+    """
+    if not isinstance(value, str) or not is_encoded(conn, table, column):
+        return value
+    code = get_dictionary(conn, table, column).code(conn, value)
+    if code is None:
+        return None if _NUMERIC_TEXT.fullmatch(value) else value
+    return code
+
+
+def encode_value(conn, table, column, value):
+    """
+    Wartość do zapisu: tekst → kod, gdy kolumna jest zakodowana
+    Tekst spoza słownika jest dopisywany do słownika w bieżącej transakcji
+    (zatwierdza go commit wywołującego) - jawnie, nie przez trigger, bo tekst
+    "1" kolumna INTEGER zamieniłaby na kod 1, zanim trigger by go zobaczył.
+    """
+    if not isinstance(value, str) or not is_encoded(conn, table, column):
+        return value
+    dictionary = get_dictionary(conn, table, column)
+    code = dictionary.code(conn, value)
+    if code is None:
+        conn.execute(f"INSERT OR IGNORE INTO {dictionary.lookup} (nazwa) VALUES (?)", (value,))
+        code = conn.execute(f"SELECT id FROM {dictionary.lookup} WHERE nazwa = ?", (value,)).fetchone()[0]
+    return code
+
+
+def encode_values(conn, table, values):
+    """Słownik {kolumna: wartość} do zapisu (np. **kwargs update()) z tekstami zamienionymi na kody"""
+    return {column: encode_value(conn, table, column, value) for column, value in values.items()}
+
+
+def decode(conn, table, column, value):
+    """Wartość z bazy: kod → tekst (tekst i NULL bez zmian)"""
+    if not isinstance(value, int) or not is_encoded(conn, table, column):
+        return value
+    return get_dictionary(conn, table, column).name(conn, value)
+
+
+def encode_filters(conn, table, values):
+    """Słownik {kolumna: wartość} (np. **kwargs delete_where) z tekstami zamienionymi na kody"""
+    return {column: encode(conn, table, column, value) for column, value in values.items()}
+
+
+def decode_column(conn, table, column, rows, position):
+    """
+    Wiersze z kodem na pozycji position zamienionym na tekst (generator)
+    Gdy kolumna nie jest zakodowana - te same wiersze bez kopiowania.
+    """
+    if not is_encoded(conn, table, column):
+        yield from rows
+        return
+    dictionary = get_dictionary(conn, table, column)
+    names = dictionary.names
+    for row in rows:
+        row = list(row)
+        code = row[position]
+        nazwa = names.get(code)
+        if nazwa is None and isinstance(code, int):
+            # Kod dopisany po wczytaniu słownika
+            nazwa = dictionary.name(conn, code)
+            names = dictionary.names
+        if nazwa is not None:
+            row[position] = nazwa
+        yield tuple(row)
+
+
+# ============================================
+# Migracja schematu
+# ============================================
+
+def enable_encoding(conn, columns=None):
+    """
+    Zamień kolumny z ENCODED_COLUMNS na kody ze słowników
+    Funkcja jest idempotentna - zakodowane kolumny i nieistniejące tabele są pomijane.
+    Wszystko dzieje się w jednej transakcji.
+
+    :param conn: obiekt Connection
+    :param columns: lista (tabela, kolumna) - None = wszystkie z ENCODED_COLUMNS
+    :return: lista zakodowanych w tym wywołaniu (tabela, kolumna)
+    """
+    converted = []
+    try:
+        with rebuild_session(conn), conn:
+            conn.execute("BEGIN")
+            for (table, column), lookup in ENCODED_COLUMNS.items():
+                if columns is not None and (table, column) not in columns:
+                    continue
+                if not _exists(conn, "table", table) or has_encoding(conn, table, column):
+                    continue
+                conn.execute(f"""
+                    CREATE TABLE IF NOT EXISTS {lookup} (
+                        id INTEGER PRIMARY KEY,
+                        nazwa TEXT NOT NULL UNIQUE
+                    )""")
+                # Kody w kolejności alfabetycznej tekstów - ORDER BY kolumny daje ten sam porządek co wcześniej
+                conn.execute(f"""
+                    INSERT OR IGNORE INTO {lookup} (nazwa)
+                    SELECT DISTINCT {column} FROM {table}
+                    WHERE typeof({column}) = 'text' ORDER BY {column}""")
+                if declared_types(conn, table)[column].upper() != CODE_TYPE:
+                    code = (f"CASE WHEN typeof({column}) = 'text' "
+                            f"THEN (SELECT id FROM {lookup} WHERE nazwa = {column}) ELSE {column} END")
+                    rebuild_table(conn, table, {column: CODE_TYPE}, {column: code})
+                for name, (event, body) in _triggers(table, column, lookup).items():
+                    conn.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {event} ON {table} "
+                                 f"WHEN typeof(NEW.{column}) = 'text' BEGIN {body} END")
+                refresh_counter_triggers(conn, table)
+                converted.append((table, column))
+        invalidate(conn)
+        # Liczniki (project_id, status) trzymały teksty - teraz kody
+        if ("tasks", "status") in converted and has_counters(conn, "tasks"):
+            rebuild_counters(conn, "tasks")
+        if converted:
+            print(f"✓ Kodowanie słownikowe: {', '.join(f'{table}.{column}' for table, column in converted)}")
+    except Error as e:
+        print(f"✗ Błąd kodowania kolumn: {e}")
+    return converted
+
+
+if __name__ == "__main__":
+    import random
+    import sqlite3
+    import time
+
+    conn = sqlite3.connect(":memory:")
+    conn.execute("""CREATE TABLE tasks (id INTEGER PRIMARY KEY, project_id INTEGER NOT NULL,
+        nazwa VARCHAR(250) NOT NULL, opis TEXT, status VARCHAR(15) NOT NULL,
+        start_date TEXT NOT NULL, end_date TEXT NOT NULL)""")
+    conn.execute("CREATE INDEX idx_tasks_status ON tasks (status)")
+    rng = random.Random(2)
+    statuses = ["W trakcie", "Ukończone", "Oczekujące", "Rozpoczęte", "started"]
+    conn.executemany("INSERT INTO tasks (project_id, nazwa, status, start_date, end_date) VALUES (?, ?, ?, ?, ?)",
+                     [(i % 100, f"Zadanie {i}", rng.choice(statuses), "2024-01-01", "2024-02-01")
+                      for i in range(500_000)])
+    conn.commit()
+
+    def timed_filter():
+        started = time.perf_counter()
+        code = encode(conn, "tasks", "status", "Oczekujące")
+        rows = list(decode_column(conn, "tasks", "status",
+                                  conn.execute("SELECT * FROM tasks WHERE status = ?", (code,)), 4))
+        return rows, (time.perf_counter() - started) * 1000
+
+    def index_pages():
+        sql = "SELECT COUNT(*) FROM dbstat WHERE name = 'idx_tasks_status'"
+        try:
+            return conn.execute(sql).fetchone()[0]
+        except Error:
+            return "?"  # SQLite bez rozszerzenia dbstat
+
+    text_rows, text_ms = timed_filter()
+    text_pages = index_pages()
+    enable_encoding(conn)
+    conn.execute("VACUUM")
+    code_rows, code_ms = timed_filter()
+    print(f"Filtr 'Oczekujące': {len(code_rows)} zadań - tekst {text_ms:.1f} ms ({text_pages} stron indeksu), "
+          f"kody {code_ms:.1f} ms ({index_pages()} stron indeksu)")
+    print(f"✓ Te same wiersze: {text_rows == code_rows}")
+    print(f"Słownik: {get_dictionary(conn, 'tasks', 'status').names}")
+
+    # Nowy status zapisany tekstem - trigger dopisuje go do słownika
+    conn.execute("UPDATE tasks SET status = 'Zablokowane' WHERE id = 1")
+    print(f"Zadanie 1: {decode(conn, 'tasks', 'status', conn.execute('SELECT status FROM tasks WHERE id = 1').fetchone()[0])}")
+    conn.close()
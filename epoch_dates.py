@@ -0,0 +1,338 @@
+# ============================================
+# Daty projektów i zadań jako liczby (epoch) + indeks przedziałów
+# ============================================
+# projects.start_date/end_date i tasks.start_date/end_date są zapisane jako
+# TEXT ("2024-01-01", "2020-05-11 12:00:00"):
+#   - ORDER BY start_date porównuje napisy, nie daty
+#   - "zadania trwające w tygodniu W" musi przejrzeć i sparsować każdy wiersz
+#
+# enable_epoch_dates(conn) przebudowuje obie tabele tak, że daty są liczbami
+# sekund od 1970-01-01 UTC (kolumny typu "EPOCH INTEGER"), i zakłada dla
+# każdej tabeli indeks przedziałów R*Tree ({tabela}_span: id, od, do).
+# Zapytanie "co nakłada się na [start, end]" to przeszukanie drzewa -
+# O(log n + liczba wyników) zamiast pełnego skanu.
+#
+# Zapis i odczyt bez zmian w istniejących funkcjach:
+#   - add_project() / add_task() / update() z datą jako tekstem dalej działają:
+#     trigger zamienia tekst na liczbę (unixepoch), błędny tekst → błąd zapisu
+#   - datetime / date jako parametr: funkcje projektu zamieniają je jawnie
+#     przez date_param() - na liczbę w tabeli EPOCH, na tekst ISO w tabeli TEXT.
+#     Nie rejestrujemy sqlite3.register_adapter(datetime, ...) - adapter działa
+#     na WSZYSTKIE połączenia w procesie i zmieniłby zapis dat w innych bazach
+#   - połączenie z connect() (detect_types) zwraca daty jako datetime (UTC);
+#     zwykłe sqlite3.connect() nie widzi żadnej zmiany
+#
+#   enable_epoch_dates(conn)
+#   tasks_between(conn, "2024-03-01", "2024-03-31")
+#   tasks_in_week(conn, 2024, 10)
+
+import sqlite3
+from contextlib import contextmanager
+from datetime import date, datetime, time, timedelta, timezone
+from sqlite3 import Error
+
+from schema_rebuild import declared_types, rebuild_session, rebuild_table
+
+
+DATE_TABLES = ("projects", "tasks")
+DATE_COLUMNS = ("start_date", "end_date")
+
+# Pierwsze słowo typu wybiera konwerter (PARSE_DECLTYPES), "INTEGER" daje powinowactwo liczbowe
+EPOCH_TYPE = "EPOCH INTEGER"
+
+# Brak daty w projekcie (NULL) = przedział otwarty z tej strony
+_OPEN = 1e13
+
+
+def _epoch_sql(value):
+    """Wyrażenie SQL: data jako liczba sekund (tekst przez unixepoch(), liczba bez zmian)"""
+    return f"CASE WHEN typeof({value}) = 'text' THEN unixepoch({value}) ELSE {value} END"
+
+
+def _invalid_sql(value):
+    return f"(typeof({value}) = 'text' AND unixepoch({value}) IS NULL)"
+
+
+def _span_values(prefix):
+    start = f"coalesce({_epoch_sql(prefix + '.start_date')}, -{_OPEN})"
+    end = f"coalesce({_epoch_sql(prefix + '.end_date')}, {_OPEN})"
+    # R*Tree wymaga od <= do - odwrócone przedziały zapisujemy jako [min, max]
+    return f"{prefix}.id, min({start}, {end}), max({start}, {end})"
+
+
+def _triggers(table):
+    """{nazwa triggera: (zdarzenie, warunek WHEN, ciało)} dla tabeli"""
+    is_text = "typeof(NEW.start_date) = 'text' OR typeof(NEW.end_date) = 'text'"
+    invalid = f"{_invalid_sql('NEW.start_date')} OR {_invalid_sql('NEW.end_date')}"
+    reject = f"SELECT RAISE(ABORT, '{table}: nieprawidłowa data (oczekiwano RRRR-MM-DD [GG:MM:SS])');"
+    to_epoch = (f"UPDATE {table} SET start_date = {_epoch_sql('start_date')}, "
+                f"end_date = {_epoch_sql('end_date')} WHERE id = NEW.id;")
+    span = f"INSERT OR REPLACE INTO {table}_span (id, od, do) VALUES ({_span_values('NEW')});"
+    return {
+        f"trg_{table}_dates_check_insert": ("BEFORE INSERT", f"WHEN {invalid}", reject),
+        f"trg_{table}_dates_check_update": ("BEFORE UPDATE OF start_date, end_date", f"WHEN {invalid}", reject),
+        f"trg_{table}_dates_insert": ("AFTER INSERT", f"WHEN {is_text}", to_epoch),
+        f"trg_{table}_dates_update": ("AFTER UPDATE OF start_date, end_date", f"WHEN {is_text}", to_epoch),
+        f"trg_{table}_span_insert": ("AFTER INSERT", "", span),
+        f"trg_{table}_span_update": ("AFTER UPDATE OF id, start_date, end_date", "",
+                                     f"DELETE FROM {table}_span WHERE id = OLD.id; {span}"),
+        f"trg_{table}_span_delete": ("AFTER DELETE", "", f"DELETE FROM {table}_span WHERE id = OLD.id;"),
+    }
+
+
+def _create_triggers(conn, table, names=None):
+    for name, (event, when, body) in _triggers(table).items():
+        if names is None or name in names:
+            conn.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {event} ON {table} {when} BEGIN {body} END")
+
+
+def _span_triggers(table):
+    return [name for name in _triggers(table) if "_span_" in name]
+
+
+# ============================================
+# Konwersja wartości
+# ============================================
+
+def to_epoch(value):
+    """
+    Data jako liczba sekund od 1970-01-01 UTC
+    :param value: None, int, date, datetime (naiwny = UTC) albo tekst "RRRR-MM-DD[ GG:MM:SS]"
+    """
+    if value is None or isinstance(value, int):
+        return value
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    elif not isinstance(value, datetime):
+        value = datetime.combine(value, time())
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
+
+
+def from_epoch(value):
+    """Liczba sekund → datetime (UTC, bez strefy - jak w tekstowych datach)"""
+    if value is None:
+        return None
+    return datetime.fromtimestamp(value, timezone.utc).replace(tzinfo=None)
+
+
+def _convert_epoch(raw):
+    try:
+        return from_epoch(int(raw))
+    except ValueError:
+        # Wartość niezamieniona na liczbę (np. wpisana z wyłączonymi triggerami)
+        return raw.decode()
+
+
+def register_converters():
+    """
+    Kolumna typu EPOCH → datetime
+    Konwerter działa tylko na połączeniach otwartych z detect_types (connect()),
+    zwykłe sqlite3.connect() dalej dostaje liczby.
+    """
+    sqlite3.register_converter("EPOCH", _convert_epoch)
+
+
+def connect(db_file, **kwargs):
+    """sqlite3.connect() zwracające daty z kolumn EPOCH jako datetime"""
+    register_converters()
+    kwargs.setdefault("detect_types", sqlite3.PARSE_DECLTYPES)
+    return sqlite3.connect(db_file, **kwargs)
+
+
+def date_param(conn, table, value):
+    """
+    Data jako parametr zapisu do kolumny daty tabeli
+    date / datetime → liczba sekund (tabela z datami EPOCH) albo tekst ISO (tabela z datami TEXT),
+    pozostałe wartości (tekst, liczba, None) bez zmian.
+    """
+    if not isinstance(value, date):
+        return value
+    if has_epoch_dates(conn, table):
+        return to_epoch(value)
+    return value.isoformat(" ") if isinstance(value, datetime) else value.isoformat()
+
+
+def date_params(conn, table, values):
+    """Słownik {kolumna: wartość} do zapisu (np. **kwargs update()) z datami przez date_param()"""
+    return {column: date_param(conn, table, value) if column in DATE_COLUMNS else value
+            for column, value in values.items()}
+
+
+# ============================================
+# Migracja schematu
+# ============================================
+
+def _exists(conn, kind, name):
+    sql = "SELECT 1 FROM sqlite_master WHERE type = ? AND name = ?"
+    return conn.execute(sql, (kind, name)).fetchone() is not None
+
+
+def has_epoch_dates(conn, table):
+    """Czy daty tabeli są zapisane jako liczby i czy tabela ma indeks przedziałów"""
+    types = declared_types(conn, table)
+    return (all(types.get(column, "").upper() == EPOCH_TYPE for column in DATE_COLUMNS)
+            and _exists(conn, "table", f"{table}_span")
+            and all(_exists(conn, "trigger", name) for name in _triggers(table)))
+
+
+def enable_epoch_dates(conn, tables=DATE_TABLES):
+    """
+    Przełącz tabele na daty zapisane jako liczby i załóż indeksy przedziałów
+    Funkcja jest idempotentna - tabele już przełączone są pomijane.
+    Wszystko dzieje się w jednej transakcji: błędna data w danych = nic nie zostaje zmienione.
+
+    :param conn: obiekt Connection
+    :param tables: tabele z kolumnami start_date / end_date
+    :return: lista przełączonych tabel
+    """
+    converted = []
+    try:
+        with rebuild_session(conn), conn:
+            conn.execute("BEGIN")
+            for table in tables:
+                if not _exists(conn, "table", table) or has_epoch_dates(conn, table):
+                    continue
+                types = declared_types(conn, table)
+                if any(types.get(column, "").upper() != EPOCH_TYPE for column in DATE_COLUMNS):
+                    invalid = " OR ".join(_invalid_sql(column) for column in DATE_COLUMNS)
+                    bad = conn.execute(f"SELECT COUNT(*) FROM {table} WHERE {invalid}").fetchone()[0]
+                    if bad:
+                        raise ValueError(f"{table}: {bad} wierszy z datą, której nie da się odczytać")
+                    rebuild_table(conn, table, {column: EPOCH_TYPE for column in DATE_COLUMNS},
+                                  {column: _epoch_sql(column) for column in DATE_COLUMNS})
+                conn.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS {table}_span USING rtree(id, od, do)")
+                conn.execute(f"DELETE FROM {table}_span")
+                conn.execute(f"INSERT INTO {table}_span (id, od, do) SELECT {_span_values(table)} FROM {table}")
+                _create_triggers(conn, table)
+                converted.append(table)
+        if converted:
+            print(f"✓ Daty jako liczby + indeks przedziałów: {', '.join(converted)}")
+    except (Error, ValueError) as e:
+        print(f"✗ Błąd przełączania dat: {e}")
+    return converted
+
+
+@contextmanager
+def suspended_interval_index(conn, table):
+    """
+    Zdejmij triggery indeksu przedziałów na czas bloku, potem odbuduj indeks
+    (bulk_delete.truncate_table() - trigger DELETE wyłącza szybkie czyszczenie tabeli)
+    Wywołujący odpowiada za transakcję (BEGIN ... COMMIT) wokół bloku.
+    """
+    active = table in DATE_TABLES and _exists(conn, "table", table) and has_epoch_dates(conn, table)
+    if active:
+        for name in _span_triggers(table):
+            conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+    yield active
+    if active:
+        conn.execute(f"DELETE FROM {table}_span")
+        conn.execute(f"INSERT INTO {table}_span (id, od, do) SELECT {_span_values(table)} FROM {table}")
+        _create_triggers(conn, table, _span_triggers(table))
+
+
+# ============================================
+# Zapytania o przedziały
+# ============================================
+
+def _overlapping(conn, table, start, end, condition="", parameters=()):
+    """Wiersze tabeli, których [start_date, end_date] nakłada się na [start, end] (włącznie)"""
+    start, end = to_epoch(start), to_epoch(end)
+    if has_epoch_dates(conn, table):
+        # R*Tree trzyma współrzędne jako float (zaokrąglone na zewnątrz) - drzewo
+        # wybiera kandydatów, a warunek na kolumnach tabeli sprawdza dokładnie
+        sql = f"""
+        SELECT t.* FROM {table}_span AS s INNER JOIN {table} AS t ON t.id = s.id
+        WHERE s.od <= :end AND s.do >= :start
+          AND (t.start_date IS NULL OR t.start_date <= :end)
+          AND (t.end_date IS NULL OR t.end_date >= :start) {condition}
+        ORDER BY t.start_date, t.id
+        """
+    else:
+        # Tabela z datami jako tekst - ten sam wynik, ale pełny skan
+        start_date, end_date = _epoch_sql("t.start_date"), _epoch_sql("t.end_date")
+        sql = f"""
+        SELECT t.* FROM {table} AS t
+        WHERE ({start_date} IS NULL OR {start_date} <= :end)
+          AND ({end_date} IS NULL OR {end_date} >= :start) {condition}
+        ORDER BY {start_date}, t.id
+        """
+    return conn.execute(sql, {"start": start, "end": end, **dict(parameters)}).fetchall()
+
+
+def projects_between(conn, start, end):
+    """Projekty trwające choć chwilę w [start, end]"""
+    return _overlapping(conn, "projects", start, end)
+
+
+def tasks_between(conn, start, end, project_id=None):
+    """
+    Zadania trwające choć chwilę w [start, end] (włącznie)
+    :param start, end: tekst "RRRR-MM-DD[ GG:MM:SS]", date, datetime albo liczba sekund
+    :param project_id: tylko zadania tego projektu (None = wszystkie)
+    """
+    if project_id is None:
+        return _overlapping(conn, "tasks", start, end)
+    return _overlapping(conn, "tasks", start, end, "AND t.project_id = :project_id", {"project_id": project_id})
+
+
+def week_range(rok, tydzien):
+    """Tydzień ISO jako (poniedziałek 00:00, niedziela 23:59:59) w sekundach"""
+    monday = datetime.combine(date.fromisocalendar(rok, tydzien, 1), time())
+    return to_epoch(monday), to_epoch(monday + timedelta(days=7)) - 1
+
+
+def tasks_in_week(conn, rok, tydzien, project_id=None):
+    """Zadania aktywne w tygodniu ISO (rok, numer tygodnia)"""
+    return tasks_between(conn, *week_range(rok, tydzien), project_id=project_id)
+
+
+if __name__ == "__main__":
+    import random
+    import time as clock
+
+    conn = connect(":memory:")
+    conn.execute("CREATE TABLE projects (id INTEGER PRIMARY KEY, nazwa TEXT NOT NULL, start_date TEXT, end_date TEXT)")
+    conn.execute("""CREATE TABLE tasks (id INTEGER PRIMARY KEY, project_id INTEGER NOT NULL,
+        nazwa VARCHAR(250) NOT NULL, opis TEXT, status VARCHAR(15) NOT NULL,
+        start_date TEXT NOT NULL, end_date TEXT NOT NULL)""")
+    conn.execute("CREATE INDEX idx_tasks_project_id ON tasks (project_id)")
+
+    # 200 000 zadań z datami jako tekst, od kilku godzin do kilku miesięcy
+    rng = random.Random(5)
+    base = datetime(2020, 1, 1)
+    conn.execute("INSERT INTO projects VALUES (1, 'Demo', '2020-01-01', NULL)")
+    rows = []
+    for i in range(200_000):
+        start = base + timedelta(minutes=rng.randint(0, 5 * 365 * 24 * 60))
+        end = start + timedelta(hours=rng.choice((3, 30, 300, 3000)))
+        rows.append((1, f"Zadanie {i}", "started", start.isoformat(" "), end.isoformat(" ")))
+    conn.executemany("INSERT INTO tasks (project_id, nazwa, status, start_date, end_date) VALUES (?, ?, ?, ?, ?)", rows)
+    conn.commit()
+
+    started = clock.perf_counter()
+    text_result = tasks_in_week(conn, 2022, 10)
+    text_ms = (clock.perf_counter() - started) * 1000
+
+    enable_epoch_dates(conn)
+    started = clock.perf_counter()
+    epoch_result = tasks_in_week(conn, 2022, 10)
+    epoch_ms = (clock.perf_counter() - started) * 1000
+
+    print(f"Tydzień 2022-W10: {len(epoch_result)} zadań - tekst (pełny skan) {text_ms:.1f} ms, "
+          f"indeks przedziałów {epoch_ms:.1f} ms")
+    print(f"✓ Te same zadania: {[row[0] for row in text_result] == [row[0] for row in epoch_result]}")
+
+    # Zapis tekstem po przełączeniu - trigger zamienia na liczbę, odczyt jako datetime
+    conn.execute("INSERT INTO tasks (project_id, nazwa, status, start_date, end_date) "
+                 "VALUES (1, 'Nowe', 'started', '2022-03-08', ?)", (date_param(conn, "tasks", datetime(2022, 3, 9, 12)),))
+    task_id = conn.execute("SELECT max(id) FROM tasks").fetchone()[0]
+    print(f"Nowe zadanie: {conn.execute('SELECT * FROM tasks WHERE id = ?', (task_id,)).fetchone()}")
+    print(f"✓ Znalezione w 2022-W10: {task_id in [row[0] for row in tasks_in_week(conn, 2022, 10)]}")
+    try:
+        conn.execute("INSERT INTO tasks (project_id, nazwa, status, start_date, end_date) "
+                     "VALUES (1, 'Złe', 'started', 'jutro', '2022-03-09')")
+    except Error as e:
+        print(f"✓ Błędna data odrzucona: {e}")
+    conn.close()
@@ -0,0 +1,285 @@
+# ============================================
+# Zapytania przez wiele plików bazy naraz
+# ============================================
+# Dane leżą w osobnych plikach (database.db, project_manager.db,
+# fetch_practice.db, read_practice.db, tasks_demo.db, delete_demo.db, ...)
+# z tym samym schematem projects / tasks. Raport "ile zadań w projekcie"
+# z 6_get_data.py trzeba by uruchomić osobno dla każdego pliku i zsumować ręcznie.
+#
+# federated_query() robi to za nas:
+#   - to samo zapytanie idzie do każdego pliku w osobnym procesie
+#     (ProcessPoolExecutor - każdy plik na innym rdzeniu, bez GIL)
+#   - każdy plik zwraca częściowe agregaty dla swoich grup
+#   - wyniki częściowe są łączone według rodzaju kolumny:
+#       "key"   - kolumna grupująca
+#       "count" / "sum" - suma wyników częściowych
+#       "min" / "max"   - min / max wyników częściowych
+#     AVG nie da się połączyć ze średnich - trzeba pobrać SUM i COUNT
+#     i podzielić po połączeniu
+#   - top-k: ORDER BY + LIMIT liczone PO połączeniu grup (grupa rozłożona
+#     na kilka plików może trafić do czołówki dopiero po zsumowaniu)
+#
+#   rows = federated_query(discover(), """
+#       SELECT projects.nazwa, COUNT(tasks.id) FROM projects
+#       LEFT JOIN tasks ON projects.id = tasks.project_id GROUP BY projects.nazwa
+#       """, ("key", "count"), order_by=1, descending=True, limit=10)
+
+import glob
+import heapq
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from sqlite3 import Error
+
+from dictionary_encoding import decode_column
+
+
+MERGE_KINDS = ("key", "count", "sum", "min", "max")
+
+PROJECT_TABLES = ("projects", "tasks")
+
+# Daty jako tekst niezależnie od tego, czy plik ma daty liczbowe (epoch_dates.py)
+_DATE_SQL = "CASE typeof({0}) WHEN 'integer' THEN date({0}, 'unixepoch') ELSE {0} END"
+
+
+def discover(directory=".", pattern="*.db", tables=PROJECT_TABLES):
+    """
+    Pliki bazy w katalogu, które mają wszystkie podane tabele
+    :return: posortowana lista ścieżek
+    """
+    files = []
+    for path in sorted(glob.glob(os.path.join(directory, pattern))):
+        try:
+            conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+            try:
+                names = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            finally:
+                conn.close()
+        except Error:
+            continue
+        if names.issuperset(tables):
+            files.append(path)
+    return files
+
+
+def _query_file(path, sql, params, decode):
+    """
+    Zapytanie na jednym pliku (w procesie z puli) - tylko do odczytu
+    :return: (ścieżka, wiersze, błąd)
+    """
+    try:
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            rows = conn.execute(sql, params).fetchall()
+            if decode is not None:
+                # Kody ze słownika (dictionary_encoding.py) są różne w każdym pliku -
+                # łączymy po nazwach, nie po kodach
+                table, column, position = decode
+                rows = list(decode_column(conn, table, column, rows, position))
+            return path, rows, None
+        finally:
+            conn.close()
+    except Error as e:
+        return path, [], str(e)
+
+
+def _merge(kind, current, value):
+    if current is None:
+        return value
+    if value is None:
+        return current
+    if kind in ("count", "sum"):
+        return current + value
+    if kind == "min":
+        return min(current, value)
+    return max(current, value)
+
+
+def merge_partials(partials, columns):
+    """
+    Połącz częściowe wyniki GROUP BY z wielu plików
+
+    :param partials: listy wierszy z kolejnych plików
+    :param columns: rodzaj każdej kolumny wyniku (MERGE_KINDS)
+    :return: lista połączonych wierszy, po jednym na grupę (kolejność pierwszego wystąpienia)
+    """
+    unknown = set(columns) - set(MERGE_KINDS)
+    if unknown:
+        raise ValueError(f"Nieznany rodzaj kolumny: {', '.join(sorted(unknown))}, dostępne: {', '.join(MERGE_KINDS)}")
+    keys = [i for i, kind in enumerate(columns) if kind == "key"]
+    groups = {}
+    for rows in partials:
+        for row in rows:
+            if len(row) != len(columns):
+                raise ValueError(f"Wiersz ma {len(row)} kolumn, a opis {len(columns)}")
+            group = tuple(row[i] for i in keys)
+            merged = groups.get(group)
+            if merged is None:
+                groups[group] = list(row)
+                continue
+            for i, kind in enumerate(columns):
+                if kind != "key":
+                    merged[i] = _merge(kind, merged[i], row[i])
+    return [tuple(row) for row in groups.values()]
+
+
+def _sort_key(order_by):
+    # None na końcu przy rosnącym sortowaniu, tak jak NULLS LAST
+    return lambda row: (row[order_by] is None, row[order_by])
+
+
+def top_k(rows, order_by, limit, descending=False):
+    """k pierwszych wierszy wg kolumny order_by (heapq - bez sortowania całości)"""
+    if descending:
+        return heapq.nlargest(limit, rows, key=lambda row: (row[order_by] is not None, row[order_by]))
+    return heapq.nsmallest(limit, rows, key=_sort_key(order_by))
+
+
+def federated_query(files, sql, columns, params=(), order_by=None, descending=False, limit=None,
+                    decode=None, processes=None):
+    """
+    To samo zapytanie na wielu plikach bazy, wyniki połączone jak z jednej bazy
+
+    :param files: ścieżki plików bazy (np. z discover())
+    :param sql: zapytanie zwracające częściowe agregaty (GROUP BY po kolumnach "key")
+    :param columns: rodzaj każdej kolumny wyniku (MERGE_KINDS)
+    :param params: parametry zapytania
+    :param order_by: pozycja kolumny do sortowania połączonego wyniku
+    :param descending: sortowanie malejące
+    :param limit: top-k - ile wierszy zwrócić (wymaga order_by)
+    :param decode: (tabela, kolumna, pozycja) - zamień kody ze słownika na nazwy przed łączeniem
+    :param processes: liczba procesów (None = liczba rdzeni, 1 = bez puli, po kolei)
+    :return: lista połączonych wierszy
+    """
+    if limit is not None and order_by is None:
+        raise ValueError("limit wymaga order_by - top-k bez kolejności nie jest określony")
+    partials = []
+    for path, rows, error in _map_files(files, sql, tuple(params), decode, processes):
+        if error is not None:
+            print(f"✗ {path}: {error}")
+            continue
+        partials.append(rows)
+    rows = merge_partials(partials, columns)
+    if order_by is None:
+        return rows
+    if limit is not None:
+        return top_k(rows, order_by, limit, descending)
+    if descending:
+        return sorted(rows, key=lambda row: (row[order_by] is not None, row[order_by]), reverse=True)
+    return sorted(rows, key=_sort_key(order_by))
+
+
+def _map_files(files, sql, params, decode, processes):
+    files = list(files)
+    if processes is None:
+        processes = min(len(files), os.cpu_count() or 1)
+    if processes <= 1 or len(files) <= 1:
+        return [_query_file(path, sql, params, decode) for path in files]
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        return list(pool.map(_query_file, files, [sql] * len(files), [params] * len(files),
+                             [decode] * len(files)))
+
+
+# ============================================
+# Gotowe raporty na plikach z projects / tasks
+# ============================================
+
+def tasks_per_project(files, limit=None, processes=None):
+    """
+    Liczba zadań w projekcie (jak select_with_group_by() z 6_get_data.py) ze wszystkich plików
+    :return: lista (nazwa projektu, liczba zadań), od największej
+    """
+    sql = """
+    SELECT projects.nazwa, COUNT(tasks.id) AS liczba_zadan
+    FROM projects
+    LEFT JOIN tasks ON projects.id = tasks.project_id
+    GROUP BY projects.nazwa
+    """
+    return federated_query(files, sql, ("key", "count"), order_by=1, descending=True, limit=limit,
+                           processes=processes)
+
+
+def status_summary(files, processes=None):
+    """
+    Zadania wg statusu ze wszystkich plików
+    :return: lista (status, liczba zadań, najwcześniejszy start, najpóźniejszy koniec)
+    """
+    sql = f"""
+    SELECT status, COUNT(*), MIN({_DATE_SQL.format('start_date')}), MAX({_DATE_SQL.format('end_date')})
+    FROM tasks
+    GROUP BY status
+    """
+    return federated_query(files, sql, ("key", "count", "min", "max"), order_by=1, descending=True,
+                           decode=("tasks", "status", 0), processes=processes)
+
+
+def project_totals(files, processes=None):
+    """
+    Liczba projektów i zadań w każdym pliku i razem
+    :return: (lista (plik, projekty, zadania), (razem projekty, razem zadania))
+    """
+    sql = "SELECT (SELECT COUNT(*) FROM projects), (SELECT COUNT(*) FROM tasks)"
+    per_file = []
+    for path, rows, error in _map_files(files, sql, (), None, processes):
+        if error is not None:
+            print(f"✗ {path}: {error}")
+            continue
+        per_file.append((os.path.basename(path), *rows[0]))
+    total = merge_partials([[row[1:]] for row in per_file], ("sum", "sum"))
+    return per_file, (total[0] if total else (0, 0))
+
+
+if __name__ == "__main__":
+    import random
+    import tempfile
+    import time
+
+    print("="*70)
+    print("ZAPYTANIA PRZEZ WIELE PLIKÓW BAZY")
+    print("="*70)
+
+    files = discover()
+    print(f"\nPliki z tabelami projects / tasks: {', '.join(os.path.basename(f) for f in files)}")
+
+    per_file, (projects, tasks) = project_totals(files)
+    for name, n_projects, n_tasks in per_file:
+        print(f"  {name:<22} projektów: {n_projects:>5}  zadań: {n_tasks:>6}")
+    print(f"  {'RAZEM':<22} projektów: {projects:>5}  zadań: {tasks:>6}")
+
+    print("\nTop 5 projektów wg liczby zadań (wszystkie pliki):")
+    for nazwa, liczba in tasks_per_project(files, limit=5):
+        print(f"  {nazwa:<40} {liczba}")
+
+    print("\nZadania wg statusu:")
+    for status, liczba, start, koniec in status_summary(files):
+        print(f"  {str(status):<20} {liczba:>6}  {start} → {koniec}")
+
+    # Skalowanie - 8 większych plików, po kolei vs pula procesów
+    directory = tempfile.mkdtemp()
+    rng = random.Random(1)
+    big = []
+    for n in range(8):
+        path = os.path.join(directory, f"shard_{n}.db")
+        conn = sqlite3.connect(path)
+        conn.execute("CREATE TABLE projects (id INTEGER PRIMARY KEY, nazwa TEXT NOT NULL, start_date TEXT, end_date TEXT)")
+        conn.execute("""CREATE TABLE tasks (id INTEGER PRIMARY KEY, project_id INTEGER NOT NULL, nazwa TEXT NOT NULL,
+                        opis TEXT, status TEXT NOT NULL, start_date TEXT NOT NULL, end_date TEXT NOT NULL)""")
+        conn.executemany("INSERT INTO projects (nazwa, start_date, end_date) VALUES (?, '2024-01-01', '2024-12-31')",
+                         [(f"Projekt {i}",) for i in range(200)])
+        conn.executemany("INSERT INTO tasks (project_id, nazwa, opis, status, start_date, end_date) "
+                         "VALUES (?, 'Zadanie', '', ?, '2024-01-01', '2024-02-01')",
+                         [(rng.randint(1, 200), rng.choice(("Nowe", "W trakcie", "Ukończone")))
+                          for _ in range(200000)])
+        conn.commit()
+        conn.close()
+        big.append(path)
+
+    started = time.perf_counter()
+    serial = tasks_per_project(big, processes=1)
+    serial_time = time.perf_counter() - started
+    started = time.perf_counter()
+    parallel = tasks_per_project(big)
+    parallel_time = time.perf_counter() - started
+    print(f"\n8 plików × 200 000 zadań: po kolei {serial_time:.2f} s, "
+          f"pula {min(len(big), os.cpu_count() or 1)} procesów {parallel_time:.2f} s")
+    print(f"✓ Wyniki zgodne: {serial == parallel}, zadań razem: {sum(row[1] for row in parallel)}")
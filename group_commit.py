@@ -0,0 +1,136 @@
+# ============================================
+# Group commit - wspólne zatwierdzanie wielu INSERT-ów
+# ============================================
+# add_project() i add_task() robią conn.commit() po KAŻDYM wierszu,
+# czyli jeden fsync na wiersz. GroupCommitWriter udaje połączenie:
+# INSERT-y wykonują się od razu (więc lastrowid jest poprawny),
+# a prawdziwy commit następuje dopiero po N wierszach albo po X sekundach.
+#
+# Uwaga: nie ma tu wątku ani timera - oba progi są sprawdzane tylko przy
+# kolejnym commit(). Jeśli po ostatnim wierszu nic już nie przychodzi,
+# wiersze czekają niezatwierdzone, dopóki nie zawołamy flush() albo nie
+# wyjdziemy z bloku "with". Commit z innego wątku wymagałby połączenia
+# z check_same_thread=False i mógłby rozciąć zapis w połowie.
+#
+# Użycie z istniejącymi funkcjami - bez zmiany ich kodu:
+#
+#   with GroupCommitWriter(conn, max_rows=1000) as writer:
+#       pid = add_project(writer, project)
+#       add_task(writer, (pid, ...))
+#   # tu wszystko jest już zatwierdzone na dysku
+
+import time
+from sqlite3 import Error
+
+
+class GroupCommitWriter:
+    """
+    Opakowanie połączenia, które grupuje commit() w większe transakcje
+
+    :param conn: obiekt Connection
+    :param max_rows: po ilu wywołaniach commit() zrobić prawdziwy commit
+    :param max_delay: po ilu sekundach od pierwszego niezatwierdzonego wiersza zrobić commit -
+                      sprawdzane przy następnym commit(), nie w tle
+                      (ostatnie wiersze zatwierdza flush() albo wyjście z "with")
+    """
+
+    def __init__(self, conn, max_rows=500, max_delay=1.0):
+        self.conn = conn
+        self.max_rows = max_rows
+        self.max_delay = max_delay
+        self.pending = 0            # wiersze czekające na commit
+        self.flushes = 0            # ile razy zrobiono prawdziwy commit
+        self.rows_written = 0
+        self._first_pending_at = None
+
+    def cursor(self):
+        return self.conn.cursor()
+
+    def execute(self, sql, parameters=()):
+        return self.conn.execute(sql, parameters)
+
+    def insert(self, sql, parameters):
+        """
+        Wykonaj INSERT w ramach grupy
+        :return: lastrowid nowego wiersza
+        """
+        cur = self.conn.cursor()
+        cur.execute(sql, parameters)
+        self.commit()
+        return cur.lastrowid
+
+    def commit(self):
+        """
+        Zaznacz wiersz jako gotowy - fizyczny commit dopiero po przekroczeniu progu
+        """
+        if self.pending == 0:
+            self._first_pending_at = time.monotonic()
+        self.pending += 1
+        self.rows_written += 1
+        if self.pending >= self.max_rows or self._delay_exceeded():
+            self.flush()
+
+    def _delay_exceeded(self):
+        if self.max_delay is None or self._first_pending_at is None:
+            return False
+        return time.monotonic() - self._first_pending_at >= self.max_delay
+
+    def flush(self):
+        """Zatwierdź wszystkie oczekujące wiersze jednym commit"""
+        if self.pending == 0 and not self.conn.in_transaction:
+            return
+        self.conn.commit()
+        self.flushes += 1
+        self.pending = 0
+        self._first_pending_at = None
+
+    def rollback(self):
+        """Wycofaj wszystkie niezatwierdzone wiersze"""
+        self.conn.rollback()
+        self.pending = 0
+        self._first_pending_at = None
+
+    def __getattr__(self, name):
+        # Pozostałe metody (close, in_transaction, ...) idą do prawdziwego połączenia
+        return getattr(self.conn, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # Tak jak "with conn:" - commit przy sukcesie, rollback przy wyjątku
+        if exc_type is None:
+            self.flush()
+        else:
+            self.rollback()
+        return False
+
+
+if __name__ == "__main__":
+    import importlib
+    import sqlite3
+
+    # Nazwa modułu zaczyna się od cyfry, więc importujemy go przez importlib
+    db = importlib.import_module("9_bazy_czasowniki")
+
+    print("="*70)
+    print("GROUP COMMIT - DEMONSTRACJA")
+    print("="*70)
+
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE projects (id INTEGER PRIMARY KEY, nazwa TEXT NOT NULL, start_date TEXT, end_date TEXT)")
+    conn.execute("""CREATE TABLE tasks (id INTEGER PRIMARY KEY, project_id INTEGER NOT NULL,
+                    nazwa VARCHAR(250) NOT NULL, opis TEXT, status VARCHAR(15) NOT NULL,
+                    start_date TEXT NOT NULL, end_date TEXT NOT NULL)""")
+
+    start = time.perf_counter()
+    try:
+        with GroupCommitWriter(conn, max_rows=1000) as writer:
+            for i in range(10000):
+                pid = db.add_project(writer, (f"Projekt {i}", "2024-01-01", "2024-12-31"))
+                db.add_task(writer, (pid, f"Zadanie {i}", "", "started", "2024-01-01", "2024-01-02"))
+        elapsed = time.perf_counter() - start
+        print(f"✓ Zapisano {writer.rows_written} wierszy w {writer.flushes} transakcjach ({elapsed:.3f} s)")
+    except Error as e:
+        print(f"✗ Błąd zapisu: {e}")
+    conn.close()
@@ -0,0 +1,249 @@
+# ============================================
+# Stronicowanie keyset (seek) dla zadań i książek
+# ============================================
+# LIMIT/OFFSET musi przejść przez wszystkie pominięte wiersze,
+# więc strona 1000 jest 1000 razy wolniejsza niż strona 1.
+# Keyset zapamiętuje klucz sortowania OSTATNIEGO wiersza strony
+# i następną stronę zaczyna od "WHERE (klucz) > (ostatni_klucz)".
+# Z indeksem na kolumnie sortowania każda strona kosztuje tyle samo.
+#
+# Klucz ostatniego wiersza trafia do nieprzezroczystego tokenu (base64),
+# który klient odsyła, żeby dostać kolejną stronę:
+#
+#   rows, token = page_tasks(conn, order_by="start_date")
+#   rows, token = page_tasks(conn, order_by="start_date", token=token)
+
+import base64
+import json
+from datetime import date
+
+from dictionary_encoding import ENCODED_COLUMNS, decode_column, is_encoded
+from epoch_dates import from_epoch, to_epoch
+
+
+# Kolumny sortowania: (wyrażenie SQL, pozycja w wierszu wyniku)
+# Ostatnią kolumną jest zawsze id - dzięki temu klucz jest unikalny.
+TASK_ORDERINGS = {
+    "id": [("id", 0)],
+    "start_date": [("start_date", 5), ("id", 0)],
+    "status": [("status", 4), ("id", 0)],
+}
+
+BOOK_ORDERINGS = {
+    "tytul": [("books.tytul", 1), ("books.id", 0)],
+    "autor": [("books.autor", 2), ("books.tytul", 1), ("books.id", 0)],
+}
+
+# Indeksy, dzięki którym "WHERE klucz > ? ORDER BY klucz LIMIT n" nie sortuje całej tabeli
+PAGINATION_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_tasks_start_date ON tasks (start_date)",
+    "CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks (status)",
+    "CREATE INDEX IF NOT EXISTS idx_books_tytul ON books (tytul)",
+    "CREATE INDEX IF NOT EXISTS idx_books_autor ON books (autor, tytul)",
+]
+
+
+def encode_token(listing, order_by, descending, key):
+    """
+    Zakoduj klucz ostatniego wiersza jako token tekstowy
+    Daty (datetime z kolumn EPOCH, patrz epoch_dates.py) zapisujemy jako liczby
+    sekund, a ich pozycje w "t" - decode_token() zamienia je z powrotem.
+    """
+    dates = [i for i, value in enumerate(key) if isinstance(value, date)]
+    key = [to_epoch(value) if i in dates else value for i, value in enumerate(key)]
+    state = {"l": listing, "o": order_by, "d": descending, "k": key}
+    if dates:
+        state["t"] = dates
+    payload = json.dumps(state, separators=(",", ":"), ensure_ascii=False)
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+
+def decode_token(token):
+    """
+    Odkoduj token
+    :return: słownik z kluczami l (listing), o (order_by), d (descending), k (klucz)
+    :raises ValueError: gdy token jest uszkodzony
+    """
+    try:
+        state = json.loads(base64.urlsafe_b64decode(token.encode("ascii")))
+        for i in state.pop("t", []):
+            state["k"][i] = from_epoch(state["k"][i])
+        return state
+    except (ValueError, UnicodeError, TypeError, IndexError, KeyError, OverflowError, OSError):
+        raise ValueError("Niepoprawny token stronicowania")
+
+
+def _token_key(token, listing, order_by, descending, length):
+    """Klucz z tokenu - po sprawdzeniu, że token pochodzi z tego samego stronicowania"""
+    state = decode_token(token)
+    if (state.get("l"), state.get("o"), state.get("d")) != (listing, order_by, descending):
+        raise ValueError("Token pochodzi z innego stronicowania (inna lista lub sortowanie)")
+    # Daty wracają do zapytania jako liczby sekund - tak, jak są zapisane w kolumnach EPOCH,
+    # niezależnie od adapterów zarejestrowanych w tym procesie
+    key = [to_epoch(value) if isinstance(value, date) else value for value in state["k"]]
+    if len(key) != length:
+        raise ValueError("Niepoprawny token stronicowania")
+    return key
+
+
+def _check_page_size(page_size):
+    # Przy page_size < 1 strona byłaby pusta, a token brany z rows[-1]
+    if not isinstance(page_size, int) or page_size < 1:
+        raise ValueError(f"page_size musi być liczbą całkowitą >= 1, podano {page_size!r}")
+
+
+def _keyset_page(conn, listing, select_sql, orderings, order_by, page_size, token, descending):
+    if order_by not in orderings:
+        raise ValueError(f"Nie można sortować po '{order_by}', dostępne: {', '.join(orderings)}")
+    columns = [expr for expr, _ in orderings[order_by]]
+    positions = [pos for _, pos in orderings[order_by]]
+    direction = "DESC" if descending else "ASC"
+    compare = "<" if descending else ">"
+
+    def query(prefix_len, key, limit):
+        # Równość na pierwszych prefix_len kolumnach, nierówność na następnej.
+        # Taki warunek SQLite zamienia na zwykłe wyszukiwanie w indeksie -
+        # w przeciwieństwie do porównania (a, b) > (?, ?), które przy wielu
+        # równych wartościach "a" przegląda je wszystkie.
+        conditions = [f"{column} = ?" for column in columns[:prefix_len]]
+        parameters = list(key[:prefix_len])
+        if key:
+            conditions.append(f"{columns[prefix_len]} {compare} ?")
+            parameters.append(key[prefix_len])
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        order = ", ".join(f"{column} {direction}" for column in columns[prefix_len:])
+        sql = f"{select_sql} {where} ORDER BY {order} LIMIT ?"
+        return conn.execute(sql, (*parameters, limit)).fetchall()
+
+    # Pobieramy jeden wiersz więcej - tak wiemy, czy istnieje następna strona
+    wanted = page_size + 1
+    if token is None:
+        rows = query(0, [], wanted)
+    else:
+        key = _token_key(token, listing, order_by, descending, len(columns))
+        # Najpierw reszta wierszy z tym samym prefiksem klucza, potem coraz krótsze prefiksy
+        rows = []
+        for prefix_len in range(len(columns) - 1, -1, -1):
+            rows += query(prefix_len, key, wanted - len(rows))
+            if len(rows) >= wanted:
+                break
+
+    next_token = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        next_token = encode_token(listing, order_by, descending, [last[p] for p in positions])
+    return rows, next_token
+
+
+def _encoded_status_page(conn, page_size, token, descending):
+    """
+    Strona zadań po zakodowanym statusie - w kolejności NAZW statusów, nie kodów
+    Statusów jest kilka, więc przechodzimy je po kolei (ORDER BY nazwa w tabeli
+    słownika) i dla każdego pobieramy "status = kod ORDER BY id" - każde zapytanie
+    to wyszukanie w idx_tasks_status. Token trzyma nazwę statusu i id.
+    """
+    direction = "DESC" if descending else "ASC"
+    compare = "<" if descending else ">"
+    lookup = ENCODED_COLUMNS[("tasks", "status")]
+    statuses = conn.execute(f"SELECT nazwa, id FROM {lookup} ORDER BY nazwa {direction}").fetchall()
+    key = None if token is None else _token_key(token, "tasks", "status", descending, 2)
+
+    wanted = page_size + 1
+    rows = []
+    for nazwa, code in statuses:
+        sql = "SELECT * FROM tasks WHERE status = ?"
+        parameters = [code]
+        if key is not None:
+            if nazwa == key[0]:
+                sql += f" AND id {compare} ?"
+                parameters.append(key[1])
+            elif (nazwa < key[0]) != descending:
+                # Status przed ostatnim wierszem poprzedniej strony
+                continue
+        sql += f" ORDER BY id {direction} LIMIT ?"
+        rows += [row[:4] + (nazwa,) + row[5:]
+                 for row in conn.execute(sql, (*parameters, wanted - len(rows)))]
+        if len(rows) >= wanted:
+            break
+
+    next_token = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_token = encode_token("tasks", "status", descending, [rows[-1][4], rows[-1][0]])
+    return rows, next_token
+
+
+def page_tasks(conn, order_by="id", page_size=20, token=None, descending=False):
+    """
+    Pobierz jedną stronę zadań
+    :param conn: obiekt Connection
+    :param order_by: "id", "start_date" lub "status"
+    :param page_size: liczba wierszy na stronie
+    :param token: token z poprzedniej strony (None = pierwsza strona)
+    :param descending: True - sortowanie malejące
+    :return: (lista wierszy, token następnej strony lub None)
+    :raises ValueError: przy page_size < 1, nieznanym order_by lub złym tokenie
+    """
+    _check_page_size(page_size)
+    if order_by == "status" and is_encoded(conn, "tasks", "status"):
+        # Kody słownika nie są posortowane jak nazwy - sortujemy po nazwach
+        return _encoded_status_page(conn, page_size, token, descending)
+    rows, next_token = _keyset_page(conn, "tasks", "SELECT * FROM tasks", TASK_ORDERINGS,
+                                    order_by, page_size, token, descending)
+    # Token trzyma surowy klucz (przy zakodowanym statusie - kod), wiersze dostają tekst
+    return list(decode_column(conn, "tasks", "status", rows, 4)), next_token
+
+
+def page_books(conn, order_by="tytul", page_size=20, token=None, descending=False):
+    """
+    Pobierz jedną stronę książek (te same kolumny co select_all_books)
+    :param order_by: "tytul" lub "autor"
+    :return: (lista wierszy, token następnej strony lub None)
+    :raises ValueError: przy page_size < 1, nieznanym order_by lub złym tokenie
+    """
+    _check_page_size(page_size)
+    select_sql = """
+    SELECT books.id, books.tytul, books.autor, books.rok_wydania,
+           categories.nazwa, books.dostepna
+    FROM books
+    INNER JOIN categories ON books.category_id = categories.id
+    """
+    return _keyset_page(conn, "books", select_sql, BOOK_ORDERINGS,
+                        order_by, page_size, token, descending)
+
+
+def create_pagination_indexes(conn):
+    """Utwórz indeksy pod kolumny sortowania (idempotentne)"""
+    for sql in PAGINATION_INDEXES:
+        table = sql.split(" ON ")[1].split()[0]
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+                        (table,)).fetchone():
+            conn.execute(sql)
+    conn.commit()
+
+
+if __name__ == "__main__":
+    import sqlite3
+    from sqlite3 import Error
+
+    print("="*70)
+    print("STRONICOWANIE KEYSET - ZADANIA")
+    print("="*70)
+
+    try:
+        conn = sqlite3.connect("fetch_practice.db")
+        create_pagination_indexes(conn)
+        token = None
+        page = 1
+        while True:
+            rows, token = page_tasks(conn, order_by="start_date", page_size=2, token=token)
+            print(f"\nStrona {page}:")
+            for task in rows:
+                print(f"  ID: {task[0]} | {task[2]:25} | Start: {task[5]}")
+            if token is None:
+                break
+            page += 1
+        conn.close()
+    except Error as e:
+        print(f"✗ Błąd: {e}")
@@ -0,0 +1,184 @@
+# ============================================
+# Profile wydajności SQLite (PRAGMA) ustawiane przy połączeniu
+# ============================================
+# Domyślnie SQLite pracuje z rollback journal, synchronous=FULL,
+# bez mmap i z małym cache stron. Tu zbieramy gotowe zestawy PRAGMA
+# pod konkretne zastosowania i nakładamy je na każde nowe połączenie.
+
+import sqlite3
+from sqlite3 import Error
+
+
+# Wartość None = nie zmieniaj ustawienia
+PROFILES = {
+    # Maksymalne bezpieczeństwo danych - klasyczny journal i fsync przy każdym commit
+    "durable": {
+        "journal_mode": "DELETE",
+        "synchronous": "FULL",
+        "mmap_size": 0,
+        "cache_size": -8192,         # ujemne = KiB, czyli 8 MB
+        "temp_store": "DEFAULT",
+        "busy_timeout": 5000,
+        "query_only": 0,
+    },
+    # WAL + synchronous=NORMAL - szybkie zapisy, odporne na awarię aplikacji
+    "balanced": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": 268435456,      # 256 MB
+        "cache_size": -65536,        # 64 MB
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+        "query_only": 0,
+    },
+    # Jednorazowe ładowanie dużej ilości danych - szybkość kosztem trwałości
+    "bulk-load": {
+        "journal_mode": "MEMORY",
+        "synchronous": "OFF",
+        "mmap_size": 268435456,
+        "cache_size": -262144,       # 256 MB
+        "temp_store": "MEMORY",
+        "busy_timeout": 30000,
+        "query_only": 0,
+    },
+    # Raporty i analizy - tylko odczyt, duży cache i mmap
+    "read-only-analytics": {
+        "journal_mode": None,
+        "synchronous": "NORMAL",
+        "mmap_size": 1073741824,     # 1 GB
+        "cache_size": -262144,
+        "temp_store": "MEMORY",
+        "busy_timeout": 10000,
+        "query_only": 1,
+    },
+}
+
+# Kolejność ma znaczenie - journal_mode musi być ustawiony przed query_only
+_PRAGMA_ORDER = ("journal_mode", "synchronous", "mmap_size", "cache_size",
+                 "temp_store", "busy_timeout", "query_only")
+
+_SYNCHRONOUS = {"OFF": 0, "NORMAL": 1, "FULL": 2, "EXTRA": 3}
+_TEMP_STORE = {"DEFAULT": 0, "FILE": 1, "MEMORY": 2}
+
+
+def _raw(conn):
+    # PooledConnection z connection_pool trzyma prawdziwe połączenie w .raw
+    return getattr(conn, "raw", conn)
+
+
+def check_profile(profile):
+    """
+    Sprawdź nazwę profilu (None jest dozwolone)
+    :raises ValueError: gdy profilu nie ma w PROFILES
+    """
+    if profile is not None and profile not in PROFILES:
+        raise ValueError(f"Nieznany profil '{profile}', dostępne: {', '.join(PROFILES)}")
+
+
+def apply_profile(conn, profile):
+    """
+    Ustaw PRAGMA z wybranego profilu na połączeniu
+    :param conn: obiekt Connection
+    :param profile: nazwa profilu z PROFILES (None = nic nie rób)
+    :return: słownik z aktualnymi ustawieniami po zmianie
+    """
+    check_profile(profile)
+    if profile is None:
+        return None
+
+    conn = _raw(conn)
+    settings = PROFILES[profile]
+    # Zdejmij ewentualną blokadę zapisu z poprzedniego profilu, inaczej
+    # zmiana journal_mode się nie powiedzie
+    conn.execute("PRAGMA query_only = 0")
+    for name in _PRAGMA_ORDER:
+        value = settings.get(name)
+        if value is None:
+            continue
+        conn.execute(f"PRAGMA {name} = {value}")
+    return current_settings(conn)
+
+
+def initializer(profile):
+    """
+    Funkcja do przekazania jako initializer puli połączeń
+    connection_pool.get_pool("baza.db", initializer=initializer("balanced"))
+    :raises ValueError: gdy profil nie istnieje - od razu, a nie przy pierwszym połączeniu
+    """
+    check_profile(profile)
+    if profile is None:
+        return None
+
+    def _init(conn):
+        apply_profile(conn, profile)
+    return _init
+
+
+def current_settings(conn):
+    """
+    Odczytaj bieżące wartości PRAGMA z połączenia
+    :return: słownik {nazwa_pragma: wartość}
+    """
+    conn = _raw(conn)
+    settings = {}
+    for name in _PRAGMA_ORDER:
+        # Baza w pamięci nie zwraca wiersza dla mmap_size
+        row = conn.execute(f"PRAGMA {name}").fetchone()
+        settings[name] = row[0] if row is not None else None
+    return settings
+
+
+def _is_file_db(conn):
+    # Baza w pamięci zawsze ma journal_mode=memory, więc go nie porównujemy
+    return conn.execute("PRAGMA database_list").fetchone()[2] != ""
+
+
+def active_profile(conn):
+    """
+    Sprawdź który profil jest aktywny na połączeniu
+    mmap_size nie jest porównywany - SQLite może go przyciąć do limitu kompilacji.
+    :return: nazwa profilu lub None jeśli ustawienia nie pasują do żadnego
+    """
+    conn = _raw(conn)
+    actual = current_settings(conn)
+    file_db = _is_file_db(conn)
+    for name, settings in PROFILES.items():
+        expected = {
+            "synchronous": _SYNCHRONOUS[settings["synchronous"]],
+            "cache_size": settings["cache_size"],
+            "temp_store": _TEMP_STORE[settings["temp_store"]],
+            "busy_timeout": settings["busy_timeout"],
+            "query_only": settings["query_only"],
+        }
+        if file_db and settings["journal_mode"] is not None:
+            expected["journal_mode"] = settings["journal_mode"].lower()
+        if all(actual[k] == v for k, v in expected.items()):
+            return name
+    return None
+
+
+def report(conn):
+    """Wyświetl aktywny profil i bieżące PRAGMA"""
+    name = active_profile(conn)
+    print(f"✓ Aktywny profil: {name or 'brak (ustawienia niestandardowe)'}")
+    for key, value in current_settings(conn).items():
+        print(f"   {key:13} = {value}")
+    return name
+
+
+if __name__ == "__main__":
+    print("="*70)
+    print("PROFILE WYDAJNOŚCI SQLITE")
+    print("="*70)
+
+    try:
+        conn = sqlite3.connect("project_manager.db")
+        report(conn)
+        for profile in PROFILES:
+            print(f"\nUstawiam profil '{profile}':")
+            apply_profile(conn, profile)
+            report(conn)
+        apply_profile(conn, "durable")
+        conn.close()
+    except Error as e:
+        print(f"✗ Błąd: {e}")
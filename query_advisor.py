@@ -0,0 +1,329 @@
+# ============================================
+# Analiza planów zapytań (EXPLAIN QUERY PLAN) i doradca indeksów
+# ============================================
+# Dla zapytań używanych w projekcie sprawdzamy plan wykonania i szukamy:
+#   - SCAN tabela             → przeglądanie całej tabeli
+#   - USE TEMP B-TREE         → sortowanie / grupowanie w tymczasowym drzewie
+#   - AUTOMATIC INDEX         → SQLite buduje indeks przy KAŻDYM zapytaniu
+# Zapytania zbieramy, wołając funkcje projektu na kopii bazy (query_tracing).
+# Następnie na KOPII bazy tworzymy kandydujące indeksy i proponujemy te
+# CREATE INDEX, które usuwają z planu SCAN / TEMP B-TREE - niezależnie od
+# czasu, bo na małej bazie pomiar to głównie szum. Indeks bez zmiany planu
+# proponujemy tylko przy wyraźnym zysku czasu.
+#
+#   python query_advisor.py sensors.db
+
+import importlib
+import io
+import re
+import sqlite3
+import sys
+import time
+from contextlib import redirect_stdout
+from sqlite3 import Error
+
+from query_tracing import QueryTracer
+
+
+# Funkcje projektu, których zapytania analizujemy: nazwa -> (plik, argumenty)
+# SQL nie jest tu kopiowany - capture_queries() woła funkcję i zapisuje to,
+# co naprawdę wysyła (query_tracing), więc lista nie rozjeżdża się z kodem.
+SHIPPED_HELPERS = {
+    "select_with_join": ("6_get_data.py", ()),
+    "select_with_group_by": ("6_get_data.py", ()),
+    "select_tasks_by_project": ("6_get_data.py", (1,)),
+    "get_sensors_in_warehouses": ("00_Bazy_piach.py", ()),
+    "select_all_books": ("14_my_base.py", ()),
+}
+
+_KEYWORDS = {"INNER", "LEFT", "RIGHT", "OUTER", "CROSS", "JOIN", "ON", "WHERE",
+             "GROUP", "ORDER", "LIMIT", "USING", "NATURAL"}
+_TABLE_REF = re.compile(r"\b(?:FROM|JOIN)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?", re.IGNORECASE)
+_JOIN_EQ = re.compile(r"(\w+)\.(\w+)\s*=\s*(\w+)\.(\w+)")
+_PARAM_EQ = re.compile(r"(?:(\w+)\.)?(\w+)\s*=\s*\?")
+_ORDER_BY = re.compile(r"\b(ORDER|GROUP)\s+BY\s+(.+?)(?:\bLIMIT\b|;|$)", re.IGNORECASE | re.DOTALL)
+
+
+# ============================================
+# Zapytania funkcji projektu
+# ============================================
+
+def _is_data_query(sql):
+    # Pomijamy zapytania o schemat (sqlite_master, pragma_*) - to nie są zapytania aplikacji
+    return (sql.split(None, 1)[0].upper() in ("SELECT", "WITH")
+            and not re.search(r"\b(sqlite_\w+|pragma_\w+)\b", sql, re.IGNORECASE))
+
+
+def capture_queries(conn, helpers=None):
+    """
+    Zbierz zapytania wysyłane przez funkcje projektu
+    Każda funkcja jest wołana dwa razy, a liczy się drugie wywołanie - pierwsze
+    może jednorazowo instalować liczniki, słowniki czy cache. Funkcje mogą
+    zapisywać do bazy, więc conn powinno być kopią.
+
+    :param conn: obiekt Connection (kopia bazy)
+    :param helpers: słownik jak SHIPPED_HELPERS (None = funkcje projektu)
+    :return: słownik nazwa -> (plik, sql, parametry); funkcja z kilkoma zapytaniami
+             daje nazwy "funkcja", "funkcja#2", ...; funkcja bez zapytań - (plik, None, ())
+    """
+    helpers = SHIPPED_HELPERS if helpers is None else helpers
+    tracer = QueryTracer(slow_threshold=float("inf"))
+    traced = tracer.attach(conn)
+    queries = {}
+    for name, (origin, args) in helpers.items():
+        function = getattr(importlib.import_module(origin[:-len(".py")]), name)
+        # Funkcje lekcji wypisują wyniki - tu ich nie potrzebujemy
+        with redirect_stdout(io.StringIO()):
+            function(traced, *args)
+            tracer.reset()
+            function(traced, *args)
+        statements = [item for item in tracer.statements() if _is_data_query(item["sql"])]
+        if not statements:
+            queries[name] = (origin, None, ())
+        for i, item in enumerate(statements):
+            queries[name if i == 0 else f"{name}#{i + 1}"] = (origin, item["sql"], item["parameters"] or ())
+    return queries
+
+
+# ============================================
+# Plan zapytania
+# ============================================
+
+def explain(conn, sql, parameters=()):
+    """Lista opisów z EXPLAIN QUERY PLAN (kolumna detail)"""
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", parameters)]
+
+
+def plan_flags(details):
+    """
+    Problemy w planie
+    :return: lista krotek (rodzaj, opis) - rodzaj: full_scan / temp_btree / automatic_index
+    """
+    flags = []
+    for detail in details:
+        if detail.startswith("SCAN") and "INDEX" not in detail:
+            flags.append(("full_scan", detail))
+        if "TEMP B-TREE" in detail:
+            flags.append(("temp_btree", detail))
+        if "AUTOMATIC" in detail:
+            flags.append(("automatic_index", detail))
+    return flags
+
+
+def time_query(conn, sql, parameters=(), repeat=5, budget=0.5):
+    """Najlepszy czas (s) z kilku wykonań zapytania łącznie z pobraniem wyników"""
+    best = None
+    spent = 0.0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        conn.execute(sql, parameters).fetchall()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+        spent += elapsed
+        if spent > budget:
+            break
+    return best
+
+
+# ============================================
+# Kandydaci na indeksy
+# ============================================
+
+def _aliases(sql):
+    aliases = {}
+    for table, alias in _TABLE_REF.findall(sql):
+        aliases[table] = table
+        if alias and alias.upper() not in _KEYWORDS:
+            aliases[alias] = table
+    return aliases
+
+
+def _table_info(conn, table):
+    return {row[1]: row for row in conn.execute("SELECT * FROM pragma_table_info(?)", (table,))}
+
+
+def _is_rowid(conn, table, column):
+    info = _table_info(conn, table).get(column)
+    # INTEGER PRIMARY KEY to rowid - ma już "indeks" w postaci samej tabeli
+    return info is not None and info[5] == 1 and info[2].upper() == "INTEGER"
+
+
+def _covered(conn, table, columns):
+    """Czy istniejący indeks zaczyna się od tych kolumn"""
+    for index in conn.execute("SELECT name FROM pragma_index_list(?)", (table,)).fetchall():
+        indexed = [row[2] for row in conn.execute("SELECT * FROM pragma_index_info(?)", (index[0],))]
+        if tuple(indexed[:len(columns)]) == tuple(columns):
+            return True
+    return False
+
+
+def candidate_indexes(conn, sql):
+    """
+    Kandydujące indeksy (tabela, kolumny) wyczytane z zapytania:
+    kolumny łączenia (a.x = b.y), filtry "kolumna = ?", ORDER BY / GROUP BY
+    """
+    aliases = _aliases(sql)
+    tables = sorted(set(aliases.values()))
+    candidates = []
+
+    def add(table, columns):
+        columns = tuple(columns)
+        if table not in tables or not columns:
+            return
+        info = _table_info(conn, table)
+        if any(column not in info for column in columns):
+            return
+        if len(columns) == 1 and _is_rowid(conn, table, columns[0]):
+            return
+        if _covered(conn, table, columns) or (table, columns) in candidates:
+            return
+        candidates.append((table, columns))
+
+    for left_alias, left_col, right_alias, right_col in _JOIN_EQ.findall(sql):
+        add(aliases.get(left_alias), (left_col,))
+        add(aliases.get(right_alias), (right_col,))
+
+    for alias, column in _PARAM_EQ.findall(sql):
+        if alias:
+            add(aliases.get(alias), (column,))
+        else:
+            for table in tables:
+                if column in _table_info(conn, table):
+                    add(table, (column,))
+
+    for _, clause in _ORDER_BY.findall(sql):
+        by_table = {}
+        for item in clause.split(","):
+            item = item.strip().split()[0] if item.strip() else ""
+            if "." in item:
+                alias, column = item.split(".", 1)
+                by_table.setdefault(aliases.get(alias), []).append(column)
+        for table, columns in by_table.items():
+            add(table, columns)
+
+    return candidates
+
+
+def _index_sql(table, columns):
+    """Nazwa i polecenie CREATE INDEX dla kandydata"""
+    name = "idx_" + table + "_" + "_".join(columns)
+    column_list = ", ".join(f'"{column}"' for column in columns)
+    return name, f'CREATE INDEX IF NOT EXISTS "{name}" ON "{table}" ({column_list})'
+
+
+# ============================================
+# Analiza
+# ============================================
+
+def _tables_exist(conn, sql):
+    existing = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    return all(table in existing for table in set(_aliases(sql).values()))
+
+
+def _uses_index(plan, index_name):
+    return any(f"INDEX {index_name}" in detail for detail in plan)
+
+
+def advise(db_file, queries=None, min_gain=0.10):
+    """
+    Przeanalizuj zapytania na kopii bazy i zaproponuj indeksy
+
+    :param db_file: plik bazy (nie jest modyfikowany - pracujemy na kopii w pamięci)
+    :param queries: słownik nazwa -> (plik, sql, parametry)
+                    (None = zapytania funkcji projektu, patrz capture_queries())
+    :param min_gain: minimalny względny zysk czasu, żeby zaproponować indeks,
+                     który nie usuwa z planu SCAN ani TEMP B-TREE
+    :return: lista raportów (słowniki) - po jednym na zapytanie
+    """
+    source = sqlite3.connect(":memory:")
+    disk = sqlite3.connect(db_file)
+    try:
+        disk.backup(source)
+    finally:
+        disk.close()
+    reports = []
+    try:
+        if queries is None:
+            queries = capture_queries(source)
+        for name, (origin, sql, parameters) in queries.items():
+            report = {"query": name, "file": origin, "plan": [], "flags": [],
+                      "suggestions": [], "skipped": None}
+            reports.append(report)
+            if sql is None:
+                report["skipped"] = "funkcja nie wysłała zapytań (brak tabel w tej bazie?)"
+                continue
+            if not _tables_exist(source, sql):
+                report["skipped"] = "brak tabel w tej bazie"
+                continue
+
+            # Każde zapytanie dostaje świeżą kopię, żeby indeksy z poprzednich nie wpływały na wynik
+            copy = sqlite3.connect(":memory:")
+            source.backup(copy)
+            try:
+                report["plan"] = explain(copy, sql, parameters)
+                report["flags"] = plan_flags(report["plan"])
+                before = time_query(copy, sql, parameters)
+                report["seconds_before"] = before
+                flags = set(report["flags"])
+
+                for table, columns in candidate_indexes(copy, sql):
+                    index_name, index_sql = _index_sql(table, columns)
+                    copy.execute(index_sql)
+                    new_plan = explain(copy, sql, parameters)
+                    new_flags = set(plan_flags(new_plan))
+                    after = time_query(copy, sql, parameters)
+                    # Przyjęte indeksy zostają na kopii, więc zysk kolejnych
+                    # propozycji jest łączny - względem stanu bez nowych indeksów
+                    gain = (before - after) / before if before else 0.0
+                    # Indeks użyty w planie, który usunął pełny skan lub tymczasowe drzewo,
+                    # proponujemy zawsze - pomiar czasu na małej bazie o tym nie rozstrzyga
+                    removes_flag = _uses_index(new_plan, index_name) and bool(flags - new_flags)
+                    if removes_flag or gain >= min_gain:
+                        flags = new_flags
+                        report["suggestions"].append({
+                            "sql": index_sql,
+                            "plan_after": new_plan,
+                            "seconds_after": after,
+                            "gain": round(gain, 3),
+                            "removes": sorted(detail for _, detail in set(report["flags"]) - new_flags),
+                        })
+                    else:
+                        copy.execute(f'DROP INDEX "{index_name}"')
+            finally:
+                copy.close()
+    finally:
+        source.close()
+    return reports
+
+
+def print_report(reports):
+    """Wyświetl raport w czytelnej formie"""
+    for report in reports:
+        print("\n" + "="*70)
+        print(f"{report['query']} ({report['file']})")
+        print("="*70)
+        if report["skipped"]:
+            print(f"  - pominięte: {report['skipped']}")
+            continue
+        for detail in report["plan"]:
+            print(f"  plan: {detail}")
+        for kind, detail in report["flags"]:
+            print(f"  ✗ {kind}: {detail}")
+        if not report["flags"]:
+            print("  ✓ plan bez pełnych skanów i tymczasowych drzew")
+        for suggestion in report["suggestions"]:
+            print(f"  → {suggestion['sql']};")
+            for detail in suggestion["removes"]:
+                print(f"    usuwa z planu: {detail}")
+            print(f"    czas: {report['seconds_before'] * 1000:.3f} ms → "
+                  f"{suggestion['seconds_after'] * 1000:.3f} ms (zysk {suggestion['gain']:.0%})")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("Użycie: python query_advisor.py <baza.db>")
+        sys.exit(1)
+    try:
+        print_report(advise(sys.argv[1]))
+    except Error as e:
+        print(f"✗ Błąd analizy: {e}")
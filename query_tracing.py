@@ -0,0 +1,349 @@
+# ============================================
+# Pomiar czasu zapytań i dziennik wolnych zapytań
+# ============================================
+# Funkcje w 5_db_funkctions.py, 6_get_data.py, 7_read_data.py i 14_my_base.py
+# wypisują tylko "✓ ...". QueryTracer opakowuje połączenie i dla każdego
+# polecenia SQL zapisuje:
+#   - czas wykonania (execute + pobieranie wierszy)
+#   - liczbę zwróconych lub zmienionych wierszy
+#   - nazwę funkcji, która wysłała zapytanie (np. "select_all_books") - pierwszą
+#     spoza modułów pomocniczych (pagination.py, table_counters.py, ...) i biblioteki
+#     standardowej, więc zapytanie z table_counters.tasks_per_project() wywołane
+#     przez select_with_group_by() jest zapisane jako "select_with_group_by"
+# Polecenia dłuższe niż próg trafiają do dziennika wolnych zapytań,
+# a zbiorcze statystyki (percentyle) można wyeksportować do JSON.
+#
+#   tracer = QueryTracer(slow_threshold=0.05, slow_log_file="slow.jsonl")
+#   conn = create_connection("project_manager.db", tracer=tracer)
+#   ...
+#   print(tracer.export_json())
+
+import json
+import os
+import re
+import sys
+import sysconfig
+import threading
+import time
+from collections import deque
+from functools import lru_cache
+
+
+_WHITESPACE = re.compile(r"\s+")
+# Moduły pomocnicze to pliki obok tego modułu, których nazwa nie zaczyna się od
+# cyfry - skrypty lekcji (5_db_funkctions.py, 14_my_base.py, ...) to kod wywołujący
+_LIBRARY_DIR = os.path.dirname(os.path.abspath(__file__))
+_STDLIB_DIR = os.path.normcase(os.path.abspath(sysconfig.get_paths()["stdlib"]))
+
+
+def _normalize(sql):
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+@lru_cache(maxsize=None)
+def _frame_kind(filename):
+    """
+    Rodzaj pliku ramki stosu
+    :return: "library" (moduł pomocniczy), "stdlib" albo None (kod wywołujący)
+    """
+    if filename.startswith("<frozen"):
+        return "stdlib"
+    path = os.path.abspath(filename)
+    if os.path.dirname(path) == _LIBRARY_DIR and not os.path.basename(path)[:1].isdigit():
+        return "library"
+    path = os.path.normcase(path)
+    if path.startswith(_STDLIB_DIR + os.sep) and "site-packages" not in path:
+        return "stdlib"
+    return None
+
+
+def _caller_name():
+    """
+    Nazwa pierwszej funkcji spoza modułów pomocniczych i biblioteki standardowej
+    Gdy cały stos to moduły pomocnicze (np. demo "python pagination.py" albo wątek
+    write_queue), bierzemy najbardziej zewnętrzną funkcję modułu pomocniczego.
+    """
+    frame = sys._getframe(2)
+    outermost = None
+    while frame is not None:
+        kind = _frame_kind(frame.f_code.co_filename)
+        if kind is None:
+            return frame.f_code.co_name
+        if kind == "library" and frame.f_code.co_name != "<module>":
+            outermost = frame
+        frame = frame.f_back
+    return outermost.f_code.co_name if outermost is not None else "?"
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class _Statement:
+    """Jedno wykonanie polecenia - otwarte do czasu pobrania wszystkich wierszy"""
+
+    __slots__ = ("sql", "caller", "parameters", "seconds", "rows", "done")
+
+    def __init__(self, sql, caller, parameters=None):
+        self.sql = sql
+        self.caller = caller
+        self.parameters = parameters
+        self.seconds = 0.0
+        self.rows = 0
+        self.done = False
+
+
+class QueryTracer:
+    """
+    Zbiera pomiary zapytań z połączeń opakowanych przez attach()
+
+    :param slow_threshold: próg w sekundach, powyżej którego zapytanie jest "wolne"
+    :param slow_log_file: plik JSONL na wolne zapytania (None = tylko w pamięci)
+    :param max_samples: ile ostatnich pomiarów trzymać na każde zapytanie
+    :param max_slow_queries: ile ostatnich wolnych zapytań trzymać w pamięci
+                             (pełny dziennik - w slow_log_file)
+    """
+
+    def __init__(self, slow_threshold=0.1, slow_log_file=None, max_samples=10000, max_slow_queries=1000):
+        self.slow_threshold = slow_threshold
+        self.slow_log_file = slow_log_file
+        self.max_samples = max_samples
+        self.slow_queries = deque(maxlen=max_slow_queries)
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def attach(self, conn):
+        """Opakuj połączenie - zwraca obiekt używany dokładnie jak Connection"""
+        return TracedConnection(conn, self)
+
+    def _record(self, statement):
+        if statement.done:
+            return
+        statement.done = True
+        key = (_normalize(statement.sql), statement.caller)
+        with self._lock:
+            entry = self._stats.get(key)
+            if entry is None:
+                entry = self._stats[key] = {"count": 0, "rows": 0, "total": 0.0,
+                                            "samples": deque(maxlen=self.max_samples),
+                                            "parameters": statement.parameters}
+            entry["count"] += 1
+            entry["rows"] += statement.rows
+            entry["total"] += statement.seconds
+            entry["samples"].append(statement.seconds)
+            slow = statement.seconds >= self.slow_threshold
+            if slow:
+                record = {
+                    "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+                    "caller": statement.caller,
+                    "sql": key[0],
+                    "seconds": round(statement.seconds, 6),
+                    "rows": statement.rows,
+                }
+                self.slow_queries.append(record)
+                if self.slow_log_file is not None:
+                    with open(self.slow_log_file, "a", encoding="utf-8") as f:
+                        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def summary(self):
+        """
+        Zbiorcze statystyki - lista słowników posortowana po łącznym czasie
+        """
+        with self._lock:
+            items = [(key, dict(entry, samples=sorted(entry["samples"])))
+                     for key, entry in self._stats.items()]
+        result = []
+        for (sql, caller), entry in items:
+            samples = entry["samples"]
+            result.append({
+                "sql": sql,
+                "caller": caller,
+                "count": entry["count"],
+                "rows": entry["rows"],
+                "total_ms": round(entry["total"] * 1000, 3),
+                "p50_ms": round(_percentile(samples, 0.50) * 1000, 3),
+                "p90_ms": round(_percentile(samples, 0.90) * 1000, 3),
+                "p99_ms": round(_percentile(samples, 0.99) * 1000, 3),
+                "max_ms": round(samples[-1] * 1000, 3) if samples else 0.0,
+            })
+        result.sort(key=lambda item: item["total_ms"], reverse=True)
+        return result
+
+    def statements(self):
+        """
+        Zarejestrowane polecenia w kolejności pierwszego wykonania
+        :return: lista słowników (sql, caller, parameters) - parametry z pierwszego
+                 wykonania (None dla executemany)
+        """
+        with self._lock:
+            return [{"sql": sql, "caller": caller, "parameters": entry["parameters"]}
+                    for (sql, caller), entry in self._stats.items()]
+
+    def export_json(self, path=None):
+        """
+        Statystyki jako JSON
+        :param path: jeśli podany - zapisz do pliku
+        :return: tekst JSON
+        """
+        text = json.dumps({"slow_threshold_ms": self.slow_threshold * 1000,
+                           "statements": self.summary()},
+                          ensure_ascii=False, indent=2)
+        if path is not None:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+        return text
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self.slow_queries.clear()
+
+
+class TracedCursor:
+    """Kursor mierzący czas execute() i pobierania wierszy"""
+
+    def __init__(self, cursor, tracer):
+        self._cursor = cursor
+        self._tracer = tracer
+        self._current = None
+
+    def _finish(self):
+        if self._current is not None:
+            self._tracer._record(self._current)
+            self._current = None
+
+    def _run(self, method, sql, parameters, many=False):
+        self._finish()
+        statement = _Statement(sql, _caller_name(), None if many else parameters)
+        start = time.perf_counter()
+        try:
+            method(sql, parameters)
+        finally:
+            statement.seconds = time.perf_counter() - start
+        if self._cursor.description is None:
+            # INSERT / UPDATE / DELETE - nie ma wierszy do pobrania
+            statement.rows = max(self._cursor.rowcount, 0)
+            self._tracer._record(statement)
+        else:
+            self._current = statement
+        return self
+
+    def execute(self, sql, parameters=()):
+        return self._run(self._cursor.execute, sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self._run(self._cursor.executemany, sql, seq_of_parameters, many=True)
+
+    def _fetch(self, method, *args):
+        start = time.perf_counter()
+        result = method(*args)
+        statement = self._current
+        if statement is not None:
+            statement.seconds += time.perf_counter() - start
+        return result, statement
+
+    def fetchone(self):
+        row, statement = self._fetch(self._cursor.fetchone)
+        if statement is not None:
+            if row is None:
+                self._finish()
+            else:
+                statement.rows += 1
+        return row
+
+    def fetchmany(self, size=None):
+        size = self._cursor.arraysize if size is None else size
+        rows, statement = self._fetch(self._cursor.fetchmany, size)
+        if statement is not None:
+            statement.rows += len(rows)
+            if len(rows) < size:
+                self._finish()
+        return rows
+
+    def fetchall(self):
+        rows, statement = self._fetch(self._cursor.fetchall)
+        if statement is not None:
+            statement.rows += len(rows)
+            self._finish()
+        return rows
+
+    def __iter__(self):
+        while True:
+            row = self.fetchone()
+            if row is None:
+                return
+            yield row
+
+    def close(self):
+        self._finish()
+        self._cursor.close()
+
+    def __del__(self):
+        try:
+            self._finish()
+        except Exception:
+            pass
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class TracedConnection:
+    """Połączenie, którego kursory są mierzone przez QueryTracer"""
+
+    def __init__(self, conn, tracer):
+        self._conn = conn
+        self.tracer = tracer
+
+    @property
+    def raw(self):
+        return getattr(self._conn, "raw", self._conn)
+
+    def cursor(self):
+        return TracedCursor(self._conn.cursor(), self.tracer)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def __enter__(self):
+        self._conn.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return self._conn.__exit__(exc_type, exc, tb)
+
+
+if __name__ == "__main__":
+    import importlib
+
+    db = importlib.import_module("6_get_data")
+
+    tracer = QueryTracer(slow_threshold=0.0005)
+    conn = db.create_connection("fetch_practice.db", tracer=tracer)
+    if conn is not None:
+        db.create_tables(conn)
+        db.add_sample_data(conn)
+        db.select_all_projects(conn)
+        db.select_with_join(conn)
+        db.select_with_group_by(conn)
+        conn.close()
+
+        print("\n" + "="*70)
+        print("STATYSTYKI ZAPYTAŃ")
+        print("="*70)
+        for item in tracer.summary():
+            print(f"{item['caller']:22} | {item['count']:3}x | p50 {item['p50_ms']:8} ms | "
+                  f"{item['rows']:4} wierszy | {item['sql'][:40]}")
+        print(f"\nWolne zapytania (> {tracer.slow_threshold * 1000} ms): {len(tracer.slow_queries)}")
+        if len(sys.argv) > 1:
+            tracer.export_json(sys.argv[1])
+            print(f"✓ Statystyki zapisane do {os.path.abspath(sys.argv[1])}")
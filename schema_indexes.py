@@ -0,0 +1,82 @@
+# ============================================
+# Indeksy pomocnicze - migracja schematu
+# ============================================
+# Bez indeksów zapytania typu WHERE project_id = ? albo JOIN po sensor_id
+# przeglądają całą tabelę (SCAN). ensure_indexes() tworzy brakujące indeksy
+# na kluczach obcych i kolumnach filtrów. Funkcja jest idempotentna -
+# można ją wołać przy każdym create_tables(), a indeks o złej definicji
+# zostanie przebudowany.
+
+from sqlite3 import Error
+
+
+# nazwa indeksu: (tabela, kolumny)
+INDEXES = {
+    "idx_tasks_project_id": ("tasks", ("project_id",)),
+    "idx_tasks_status": ("tasks", ("status",)),
+    "idx_books_category_id": ("books", ("category_id",)),
+    # Indeksy pokrywające (warehouse_locations.py) - zapytania o lokalizacje
+    # i "gdzie leży czujnik X" nie sięgają do tabeli warehouses.
+    # ilosc_sztuk zmienia każdy ruch magazynowy (stock_movements.py), więc jest
+    # tylko w idx_warehouses_location - każdy dodatkowy indeks z tą kolumną to
+    # dodatkowy zapis przy każdym ruchu
+    "idx_warehouses_sensor_id": ("warehouses", ("sensor_id", "nazwa_magazynu", "alejka", "regał",
+                                                "polka", "kuweta")),
+    # Kolejność jak w ORDER BY w get_sensors_in_warehouses()
+    "idx_warehouses_location": ("warehouses", ("nazwa_magazynu", "alejka", "regał", "polka", "kuweta",
+                                               "sensor_id", "ilosc_sztuk")),
+}
+
+
+def _table_exists(conn, table):
+    sql = "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?"
+    return conn.execute(sql, (table,)).fetchone() is not None
+
+
+def _index_columns(conn, name):
+    """Kolumny istniejącego indeksu lub None, gdy indeksu nie ma"""
+    rows = conn.execute(f'PRAGMA index_info("{name}")').fetchall()
+    if not rows:
+        return None
+    return tuple(row[2] for row in sorted(rows))
+
+
+def ensure_indexes(conn, tables=None):
+    """
+    Utwórz (lub przebuduj) indeksy z INDEXES
+    :param conn: obiekt Connection
+    :param tables: ogranicz do podanych tabel (None = wszystkie istniejące)
+    :return: lista nazw indeksów utworzonych w tym wywołaniu
+    """
+    created = []
+    try:
+        for name, (table, columns) in INDEXES.items():
+            if tables is not None and table not in tables:
+                continue
+            if not _table_exists(conn, table):
+                continue
+            existing = _index_columns(conn, name)
+            if existing == columns:
+                continue
+            if existing is not None:
+                # Indeks o tej nazwie ma inne kolumny - budujemy od nowa
+                conn.execute(f'DROP INDEX "{name}"')
+            column_list = ", ".join(f'"{column}"' for column in columns)
+            conn.execute(f'CREATE INDEX "{name}" ON "{table}" ({column_list})')
+            created.append(name)
+        conn.commit()
+        if created:
+            print(f"✓ Utworzono indeksy: {', '.join(created)}")
+    except Error as e:
+        print(f"✗ Błąd tworzenia indeksów: {e}")
+    return created
+
+
+if __name__ == "__main__":
+    import sqlite3
+
+    for db_file in ("project_manager.db", "moja_biblioteka.db", "sensors.db"):
+        conn = sqlite3.connect(db_file)
+        print(f"{db_file}:")
+        ensure_indexes(conn)
+        conn.close()
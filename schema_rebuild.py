@@ -0,0 +1,76 @@
+# ============================================
+# Przebudowa tabeli ze zmienionymi typami kolumn
+# ============================================
+# SQLite nie ma ALTER TABLE ... ALTER COLUMN - zmiana typu kolumny to
+# przepisanie tabeli: nowa tabela, kopia wierszy (z przeliczeniem wartości),
+# DROP starej, RENAME nowej. Indeksy i triggery znikają razem ze starą
+# tabelą, więc rebuild_table() zapamiętuje je i zakłada ponownie.
+#
+# Używają tego epoch_dates.py (daty jako liczby) i dictionary_encoding.py
+# (status / typ jako kody ze słownika):
+#
+#   with rebuild_session(conn):
+#       with conn:
+#           conn.execute("BEGIN")
+#           rebuild_table(conn, "tasks", {"status": "INTEGER"}, {"status": "..."})
+
+import re
+from contextlib import contextmanager
+
+
+def declared_types(conn, table):
+    """{kolumna: zadeklarowany typ} tabeli"""
+    return {row[1]: row[2] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+
+@contextmanager
+def rebuild_session(conn):
+    """
+    Ustawienia połączenia na czas przebudowy tabel
+    DROP TABLE przy włączonych kluczach obcych usuwałby powiązane wiersze;
+    legacy_alter_table - RENAME nie sprawdza triggerów innych tabel w trakcie przebudowy.
+    Obie PRAGMA działają tylko poza transakcją - bieżąca jest zatwierdzana.
+    """
+    foreign_keys = conn.execute("PRAGMA foreign_keys").fetchone()[0]
+    conn.commit()
+    conn.execute("PRAGMA foreign_keys = OFF")
+    conn.execute("PRAGMA legacy_alter_table = ON")
+    try:
+        yield conn
+    finally:
+        conn.execute("PRAGMA legacy_alter_table = OFF")
+        conn.execute(f"PRAGMA foreign_keys = {foreign_keys}")
+
+
+def rebuild_table(conn, table, column_types, expressions=None):
+    """
+    Przepisz tabelę z nowymi typami kolumn (w bieżącej transakcji)
+
+    :param conn: obiekt Connection
+    :param table: nazwa tabeli
+    :param column_types: {kolumna: nowy zadeklarowany typ}
+    :param expressions: {kolumna: wyrażenie SQL na nową wartość} - pozostałe kolumny kopiowane bez zmian
+    """
+    expressions = expressions or {}
+    types = declared_types(conn, table)
+    create_sql = conn.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?",
+                              (table,)).fetchone()[0]
+    for column, new_type in column_types.items():
+        create_sql = re.sub(rf"\b{column}\s+{re.escape(types[column])}", f"{column} {new_type}",
+                            create_sql, count=1, flags=re.I)
+    create_sql = re.sub(rf"^CREATE TABLE\s+(IF NOT EXISTS\s+)?\"?{table}\"?", f"CREATE TABLE {table}__rebuild",
+                        create_sql, flags=re.I)
+    # Indeksy i triggery znikną razem ze starą tabelą - zakładamy je z powrotem
+    extras = conn.execute("""
+        SELECT sql FROM sqlite_master
+        WHERE tbl_name = ? AND type IN ('index', 'trigger') AND sql IS NOT NULL
+        """, (table,)).fetchall()
+
+    columns = list(types)
+    select = ", ".join(expressions.get(column, column) for column in columns)
+    conn.execute(create_sql)
+    conn.execute(f"INSERT INTO {table}__rebuild ({', '.join(columns)}) SELECT {select} FROM {table}")
+    conn.execute(f"DROP TABLE {table}")
+    conn.execute(f"ALTER TABLE {table}__rebuild RENAME TO {table}")
+    for (sql,) in extras:
+        conn.execute(sql)
@@ -0,0 +1,282 @@
+# ============================================
+# Odczyty czujników - tabela szeregów czasowych i szybki zapis
+# ============================================
+# Tabela readings przechowuje pomiary z czujników z tabeli sensors
+# (DHT11, HC-SR04, BMP180, MQ-2). Jest to tabela WITHOUT ROWID z kluczem
+# (sensor_id, czas, kanal) - wiersze leżą na dysku posortowane po czujniku
+# i czasie, więc "odczyty czujnika 3 z ostatniej godziny" to jeden
+# ciągły fragment B-drzewa, bez osobnego indeksu.
+#
+#   czas   - milisekundy od 1970-01-01 UTC (INTEGER)
+#   kanal  - co mierzymy: DHT11 ma temperaturę i wilgotność, BMP180 ciśnienie
+#            i temperaturę - patrz CHANNELS
+#
+# ReadingsWriter zbiera odczyty w buforze i zapisuje je paczkami:
+#   - jedna transakcja i jedno executemany() na paczkę
+#   - paczka jest sortowana po kluczu, więc wstawienia idą po kolei
+#     wzdłuż B-drzewa zamiast skakać po losowych stronach
+#   - spóźnione i nieuporządkowane odczyty trafiają na swoje miejsce
+#     w kluczu; powtórzony odczyt (ten sam klucz) zastępuje poprzedni
+#
+#   with ReadingsWriter(conn) as writer:
+#       writer.add(1, czas_ms, 21.5, kanal="temperatura")
+#       writer.add_many(paczka_z_bramki)
+
+import time
+from datetime import datetime, timezone
+from sqlite3 import Error
+
+from streaming import iter_rows, DEFAULT_BATCH_SIZE
+
+
+# nazwa kanału → numer zapisywany w tabeli
+CHANNELS = {
+    "temperatura": 0,
+    "wilgotnosc": 1,
+    "odleglosc": 2,
+    "cisnienie": 3,
+    "gaz": 4,
+}
+CHANNEL_NAMES = {number: name for name, number in CHANNELS.items()}
+
+READINGS_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS readings (
+    sensor_id INTEGER NOT NULL,
+    czas INTEGER NOT NULL,
+    kanal INTEGER NOT NULL DEFAULT 0,
+    wartosc REAL NOT NULL,
+    PRIMARY KEY (sensor_id, czas, kanal)
+) WITHOUT ROWID
+"""
+
+_INSERT_SQL = "INSERT OR REPLACE INTO readings (sensor_id, czas, kanal, wartosc) VALUES (?, ?, ?, ?)"
+
+
+def create_readings_table(conn):
+    """
+    Utwórz tabelę readings (idempotentne)
+    """
+    try:
+        conn.execute(READINGS_TABLE_SQL)
+        conn.commit()
+        print("✓ Tabela 'readings' utworzona")
+    except Error as e:
+        print(f"✗ Błąd tworzenia tabeli: {e}")
+
+
+def to_millis(value):
+    """Czas jako liczba milisekund: int (już w ms) albo datetime (naiwny = UTC)"""
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return int(value.timestamp() * 1000)
+    return int(value)
+
+
+def channel_number(kanal):
+    """Numer kanału z nazwy ("temperatura") albo liczby"""
+    if isinstance(kanal, str):
+        try:
+            return CHANNELS[kanal]
+        except KeyError:
+            raise ValueError(f"Nieznany kanał '{kanal}', dostępne: {', '.join(CHANNELS)}") from None
+    return int(kanal)
+
+
+class ReadingsWriter:
+    """
+    Buforowany zapis odczytów - paczka trafia do bazy po max_rows odczytach
+    albo po max_delay sekundach
+
+    :param conn: obiekt Connection
+    :param max_rows: rozmiar paczki
+    :param max_delay: maksymalny czas (s) oczekiwania odczytu w buforze (None = bez limitu)
+    :param on_flush: funkcje (conn, fresh, late) wołane w transakcji zapisu paczki -
+        fresh: odczyty nowsze niż wszystko, co czujnik już zapisał; late: pozostałe
+    """
+
+    def __init__(self, conn, max_rows=50000, max_delay=1.0, on_flush=()):
+        self.conn = conn
+        self.max_rows = max_rows
+        self.max_delay = max_delay
+        self.on_flush = list(on_flush)
+        self.rows_written = 0
+        self.flushes = 0
+        self.late_rows = 0          # odczyty nie nowsze niż ostatni zapisany odczyt czujnika
+        self._buffer = []
+        self._first_pending_at = None
+        self._high_water = {}       # sensor_id → najnowszy zapisany czas
+
+    def add(self, sensor_id, czas, wartosc, kanal=0):
+        """Dodaj jeden odczyt do bufora"""
+        if not self._buffer:
+            self._first_pending_at = time.monotonic()
+        self._buffer.append((sensor_id, to_millis(czas), channel_number(kanal), wartosc))
+        if len(self._buffer) >= self.max_rows or self._delay_exceeded():
+            self.flush()
+
+    def add_many(self, readings):
+        """
+        Dodaj wiele odczytów naraz - krotki (sensor_id, czas_ms, kanal, wartosc)
+        Najszybsza ścieżka: czas w ms i numer kanału, bez konwersji pojedynczych wartości.
+        """
+        if not self._buffer:
+            self._first_pending_at = time.monotonic()
+        buffer = self._buffer
+        for reading in readings:
+            buffer.append(reading)
+            if len(buffer) >= self.max_rows:
+                self.flush()
+                buffer = self._buffer
+                self._first_pending_at = time.monotonic()
+        if self._delay_exceeded():
+            self.flush()
+
+    def _delay_exceeded(self):
+        if self.max_delay is None or self._first_pending_at is None or not self._buffer:
+            return False
+        return time.monotonic() - self._first_pending_at >= self.max_delay
+
+    def _sensor_high_water(self, sensor_id):
+        """Najnowszy zapisany czas czujnika - przy pierwszym użyciu odczytany z bazy"""
+        czas = self._high_water.get(sensor_id)
+        if czas is None:
+            row = self.conn.execute("SELECT MAX(czas) FROM readings WHERE sensor_id = ?",
+                                    (sensor_id,)).fetchone()
+            czas = self._high_water[sensor_id] = row[0] if row[0] is not None else float("-inf")
+        return czas
+
+    def flush(self):
+        """
+        Zapisz bufor jedną transakcją
+        :return: liczba zapisanych odczytów
+        """
+        if not self._buffer:
+            return 0
+        buffer, pending_since = self._buffer, self._first_pending_at
+        self._buffer = []
+        self._first_pending_at = None
+        # Powtórzony klucz w paczce - zostaje ostatnio przysłana wartość;
+        # sortowanie po kluczu - zapis kolejno wzdłuż B-drzewa
+        rows = sorted({(s, c, k): (s, c, k, v) for s, c, k, v in buffer}.values())
+
+        # Odczyty nie nowsze niż ostatni zapisany dla czujnika mogą zastąpić
+        # istniejący wiersz - dla nich słuchacze (np. rollupy) przeliczają dane
+        fresh, late = [], []
+        sensor_id = limit = None
+        newest = {}
+        for row in rows:
+            if row[0] != sensor_id:
+                sensor_id = row[0]
+                limit = self._sensor_high_water(sensor_id)
+            (late if row[1] <= limit else fresh).append(row)
+            newest[sensor_id] = row[1]  # po sortowaniu ostatni = najnowszy
+        try:
+            with self.conn:
+                self.conn.executemany(_INSERT_SQL, rows)
+                for callback in self.on_flush:
+                    callback(self.conn, fresh, late)
+        except Error:
+            # Nic nie zostało zapisane - odczyty wracają do bufora razem z czasem
+            # oczekiwania, żeby max_delay dalej wymuszał ponowną próbę
+            self._buffer = buffer + self._buffer
+            self._first_pending_at = pending_since
+            raise
+        high_water = self._high_water
+        for sensor_id, czas in newest.items():
+            if czas > high_water[sensor_id]:
+                high_water[sensor_id] = czas
+        self.late_rows += len(late)
+        self.rows_written += len(rows)
+        self.flushes += 1
+        return len(rows)
+
+    def stats(self):
+        return {"rows_written": self.rows_written, "flushes": self.flushes,
+                "late_rows": self.late_rows, "buffered": len(self._buffer)}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # Przy wyjątku nie zapisujemy bufora - dane mogą być niekompletne
+        if exc_type is None:
+            self.flush()
+        return False
+
+
+# ============================================
+# Odczyt
+# ============================================
+
+def iter_readings(conn, sensor_id, start, end, kanal=None, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Generator odczytów czujnika z przedziału [start, end) - zakres klucza głównego
+    :return: krotki (czas_ms, kanal, wartosc) posortowane po czasie
+    """
+    if kanal is None:
+        sql = """
+        SELECT czas, kanal, wartosc FROM readings
+        WHERE sensor_id = ? AND czas >= ? AND czas < ?
+        ORDER BY czas, kanal
+        """
+        parameters = (sensor_id, to_millis(start), to_millis(end))
+    else:
+        # kanal nie jest w przedrostku klucza po czasie - filtr na wierszach z zakresu
+        sql = """
+        SELECT czas, kanal, wartosc FROM readings
+        WHERE sensor_id = ? AND czas >= ? AND czas < ? AND kanal = ?
+        ORDER BY czas
+        """
+        parameters = (sensor_id, to_millis(start), to_millis(end), channel_number(kanal))
+    return iter_rows(conn, sql, parameters, batch_size=batch_size)
+
+
+def get_readings(conn, sensor_id, start, end, kanal=None):
+    """Lista odczytów czujnika z przedziału [start, end)"""
+    return list(iter_readings(conn, sensor_id, start, end, kanal))
+
+
+def latest_reading(conn, sensor_id, kanal=0):
+    """Najnowszy odczyt kanału czujnika (czas_ms, wartosc) lub None"""
+    sql = """
+    SELECT czas, wartosc FROM readings
+    WHERE sensor_id = ? AND kanal = ?
+    ORDER BY czas DESC LIMIT 1
+    """
+    return conn.execute(sql, (sensor_id, channel_number(kanal))).fetchone()
+
+
+if __name__ == "__main__":
+    import random
+    import sqlite3
+    import pragma_profiles
+
+    conn = sqlite3.connect(":memory:")
+    pragma_profiles.apply_profile(conn, "bulk-load")
+    create_readings_table(conn)
+
+    # 100 czujników, odczyt co sekundę, 10% odczytów spóźnionych o do 5 minut
+    rng = random.Random(7)
+    start_ms = 1_700_000_000_000
+    total = 1_000_000
+
+    def readings():
+        for i in range(total):
+            sensor_id = i % 100 + 1
+            czas = start_ms + (i // 100) * 1000
+            if rng.random() < 0.1:
+                czas -= rng.randint(1, 300) * 1000
+            yield (sensor_id, czas, i % 2, 20.0 + (i % 50) / 10)
+
+    batch = list(readings())
+    started = time.perf_counter()
+    with ReadingsWriter(conn) as writer:
+        writer.add_many(batch)
+    elapsed = time.perf_counter() - started
+    stats = writer.stats()
+    print(f"✓ Zapisano {stats['rows_written']} odczytów w {elapsed:.2f} s "
+          f"({stats['rows_written'] / elapsed:,.0f} odczytów/s, {stats['flushes']} paczek, "
+          f"spóźnionych: {stats['late_rows']})")
+    print(f"Najnowszy odczyt czujnika 1: {latest_reading(conn, 1)}")
+    conn.close()
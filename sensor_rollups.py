@@ -0,0 +1,263 @@
+# ============================================
+# Agregaty odczytów czujników: 1 minuta / 1 godzina / 1 dzień
+# ============================================
+# Wykres "min/max/średnia temperatury czujnika z ostatniego miesiąca"
+# na surowych odczytach to miliony wierszy. Tabele readings_1m, readings_1h
+# i readings_1d trzymają gotowe agregaty (liczba, suma, min, max) dla
+# przedziałów czasu - średnia to suma / liczba.
+#
+# Agregaty są aktualizowane w tej samej transakcji co zapis paczki odczytów
+# (ReadingsWriter z on_flush=[update_rollups]):
+#   - nowe odczyty - dodawane do agregatów bez czytania tabeli readings
+#   - spóźnione odczyty (mogły zastąpić istniejący wiersz) - dotknięte
+#     przedziały są przeliczane: 1m z surowych odczytów, 1h z 1m, 1d z 1h
+#
+# query_rollup() sam wybiera najgrubszą tabelę, której przedział mieści się
+# w żądanej rozdzielczości i pasuje do granic zakresu.
+#
+#   writer = rollup_writer(conn)
+#   query_rollup(conn, sensor_id=1, start=..., end=..., resolution=HOUR)
+
+from sqlite3 import Error
+
+from sensor_readings import ReadingsWriter, channel_number, to_millis
+
+
+MINUTE = 60 * 1000
+HOUR = 60 * MINUTE
+DAY = 24 * HOUR
+
+# Od najdrobniejszego: (tabela, długość przedziału w ms)
+LEVELS = [
+    ("readings_1m", MINUTE),
+    ("readings_1h", HOUR),
+    ("readings_1d", DAY),
+]
+
+_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS {table} (
+    sensor_id INTEGER NOT NULL,
+    kanal INTEGER NOT NULL,
+    okres INTEGER NOT NULL,
+    liczba INTEGER NOT NULL,
+    suma REAL NOT NULL,
+    minimum REAL NOT NULL,
+    maksimum REAL NOT NULL,
+    PRIMARY KEY (sensor_id, kanal, okres)
+) WITHOUT ROWID
+"""
+
+_UPSERT_SQL = """
+INSERT INTO {table} (sensor_id, kanal, okres, liczba, suma, minimum, maksimum)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (sensor_id, kanal, okres) DO UPDATE SET
+    liczba = liczba + excluded.liczba,
+    suma = suma + excluded.suma,
+    minimum = min(minimum, excluded.minimum),
+    maksimum = max(maksimum, excluded.maksimum)
+"""
+
+
+def create_rollup_tables(conn):
+    """
+    Utwórz tabele agregatów (idempotentne)
+    Jeśli tabela readings ma już odczyty, nowe tabele są od razu wypełniane.
+    """
+    try:
+        existing = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        for table, _ in LEVELS:
+            conn.execute(_TABLE_SQL.format(table=table))
+        conn.commit()
+        print(f"✓ Tabele agregatów utworzone: {', '.join(table for table, _ in LEVELS)}")
+        new_tables = any(table not in existing for table, _ in LEVELS)
+        if new_tables and "readings" in existing and conn.execute("SELECT 1 FROM readings LIMIT 1").fetchone():
+            rebuild_rollups(conn)
+            print("✓ Agregaty przeliczone z istniejących odczytów")
+    except Error as e:
+        print(f"✗ Błąd tworzenia tabel agregatów: {e}")
+
+
+def _source_select(level):
+    """SELECT agregujący przedziały poziomu z poziomu niższego (albo z readings)"""
+    table, size = LEVELS[level]
+    if level == 0:
+        return f"""
+        SELECT sensor_id, kanal, czas - czas % {size}, COUNT(*), SUM(wartosc), MIN(wartosc), MAX(wartosc)
+        FROM readings
+        """, "czas"
+    lower = LEVELS[level - 1][0]
+    return f"""
+        SELECT sensor_id, kanal, okres - okres % {size}, SUM(liczba), SUM(suma), MIN(minimum), MAX(maksimum)
+        FROM {lower}
+        """, "okres"
+
+
+def _aggregate(rows, size):
+    """Agregaty nowych odczytów w Pythonie: (sensor_id, kanal, okres) → [liczba, suma, min, max]"""
+    buckets = {}
+    for sensor_id, czas, kanal, wartosc in rows:
+        key = (sensor_id, kanal, czas - czas % size)
+        bucket = buckets.get(key)
+        if bucket is None:
+            buckets[key] = [1, wartosc, wartosc, wartosc]
+        else:
+            bucket[0] += 1
+            bucket[1] += wartosc
+            if wartosc < bucket[2]:
+                bucket[2] = wartosc
+            elif wartosc > bucket[3]:
+                bucket[3] = wartosc
+    return buckets
+
+
+def _merge(buckets, size):
+    """Agregaty większych przedziałów złożone z agregatów mniejszych"""
+    merged = {}
+    for (sensor_id, kanal, okres), (liczba, suma, minimum, maksimum) in buckets.items():
+        key = (sensor_id, kanal, okres - okres % size)
+        bucket = merged.get(key)
+        if bucket is None:
+            merged[key] = [liczba, suma, minimum, maksimum]
+        else:
+            bucket[0] += liczba
+            bucket[1] += suma
+            bucket[2] = min(bucket[2], minimum)
+            bucket[3] = max(bucket[3], maksimum)
+    return merged
+
+
+def _recompute(conn, level, keys):
+    """Przelicz wskazane przedziały (sensor_id, kanal, okres) poziomu od nowa"""
+    table, size = LEVELS[level]
+    select, time_column = _source_select(level)
+    conn.executemany(f"DELETE FROM {table} WHERE sensor_id = ? AND kanal = ? AND okres = ?", keys)
+    conn.executemany(f"""
+        INSERT INTO {table} (sensor_id, kanal, okres, liczba, suma, minimum, maksimum)
+        {select}
+        WHERE sensor_id = ?1 AND kanal = ?2 AND {time_column} >= ?3 AND {time_column} < ?3 + {size}
+        GROUP BY 1, 2, 3
+        """, keys)
+
+
+def update_rollups(conn, fresh, late):
+    """
+    Zaktualizuj agregaty po zapisie paczki - do użycia jako on_flush ReadingsWriter
+    Woływane wewnątrz transakcji zapisu, więc odczyty i agregaty zmieniają się razem.
+
+    :param fresh: nowe odczyty (sensor_id, czas, kanal, wartosc) - dodawane przyrostowo
+    :param late: odczyty, które mogły zastąpić istniejące - ich przedziały są przeliczane
+    """
+    buckets = None
+    for table, size in LEVELS:
+        # Odczyty przechodzą przez Pythona raz - 1h i 1d składamy z przedziałów 1m
+        buckets = _aggregate(fresh, size) if buckets is None else _merge(buckets, size)
+        conn.executemany(_UPSERT_SQL.format(table=table),
+                         [key + tuple(values) for key, values in buckets.items()])
+    if late:
+        # Kolejno od 1m w górę - każdy poziom liczony z poprawionego niższego
+        for level, (_, size) in enumerate(LEVELS):
+            keys = sorted({(sensor_id, kanal, czas - czas % size) for sensor_id, czas, kanal, _ in late})
+            _recompute(conn, level, keys)
+
+
+def rollup_writer(conn, **kwargs):
+    """ReadingsWriter, który przy każdej paczce aktualizuje agregaty"""
+    on_flush = list(kwargs.pop("on_flush", ())) + [update_rollups]
+    return ReadingsWriter(conn, on_flush=on_flush, **kwargs)
+
+
+def rebuild_rollups(conn):
+    """Przelicz wszystkie agregaty od zera z tabeli readings (np. po imporcie starych danych)"""
+    with conn:
+        for level, (table, _) in enumerate(LEVELS):
+            select, _ = _source_select(level)
+            conn.execute(f"DELETE FROM {table}")
+            conn.execute(f"INSERT INTO {table} {select} GROUP BY 1, 2, 3")
+
+
+# ============================================
+# Zapytania
+# ============================================
+
+def choose_level(start, end, resolution):
+    """
+    Najgrubszy poziom dla zakresu [start, end) i rozdzielczości (wszystko w ms)
+    Przedział poziomu musi mieścić się w rozdzielczości (dzielić ją), a granice
+    zakresu muszą leżeć na granicach przedziałów - inaczej brzegowe przedziały
+    zawierałyby odczyty spoza zakresu.
+    :return: (tabela, długość przedziału) albo ("readings", 1) dla surowych odczytów
+    """
+    for table, size in reversed(LEVELS):
+        if resolution % size == 0 and start % size == 0 and end % size == 0:
+            return table, size
+    return "readings", 1
+
+
+def query_rollup(conn, sensor_id, start, end, resolution, kanal=0):
+    """
+    Statystyki czujnika w przedziałach o długości resolution
+
+    :param start, end: zakres [start, end) - ms albo datetime
+    :param resolution: długość przedziału wyniku w ms (np. HOUR)
+    :return: (użyta_tabela, lista (okres, liczba, minimum, maksimum, srednia))
+    """
+    start, end = to_millis(start), to_millis(end)
+    if resolution <= 0 or end <= start:
+        raise ValueError("Wymagane resolution > 0 i end > start")
+    table, _ = choose_level(start, end, resolution)
+    if table == "readings":
+        columns = "czas", "COUNT(*)", "SUM(wartosc)", "MIN(wartosc)", "MAX(wartosc)"
+    else:
+        columns = "okres", "SUM(liczba)", "SUM(suma)", "MIN(minimum)", "MAX(maksimum)"
+    time_column, count, total, minimum, maximum = columns
+    # Przedziały wyniku liczone od początku zakresu
+    sql = f"""
+    SELECT ?3 + ({time_column} - ?3) / ?5 * ?5 AS przedzial,
+           {count}, {minimum}, {maximum}, {total} / {count}
+    FROM {table}
+    WHERE sensor_id = ?1 AND kanal = ?2 AND {time_column} >= ?3 AND {time_column} < ?4
+    GROUP BY przedzial
+    ORDER BY przedzial
+    """
+    rows = conn.execute(sql, (sensor_id, channel_number(kanal), start, end, resolution)).fetchall()
+    return table, rows
+
+
+if __name__ == "__main__":
+    import random
+    import sqlite3
+    import time
+
+    from sensor_readings import create_readings_table
+
+    conn = sqlite3.connect(":memory:")
+    create_readings_table(conn)
+    create_rollup_tables(conn)
+
+    # 10 czujników, odczyt co 10 s przez 3 doby, 5% spóźnionych o do godziny
+    rng = random.Random(3)
+    start_ms = 1_700_006_400_000 - 1_700_006_400_000 % DAY
+    readings = []
+    for step in range(3 * DAY // 10000):
+        for sensor_id in range(1, 11):
+            czas = start_ms + step * 10000
+            if rng.random() < 0.05:
+                czas -= rng.randint(1, 360) * 10000
+            readings.append((sensor_id, max(czas, start_ms), 0, 20 + rng.random() * 5))
+
+    started = time.perf_counter()
+    with rollup_writer(conn) as writer:
+        writer.add_many(readings)
+    elapsed = time.perf_counter() - started
+    print(f"✓ Zapisano {writer.rows_written} odczytów z agregatami w {elapsed:.2f} s "
+          f"({writer.rows_written / elapsed:,.0f} odczytów/s)")
+
+    for label, resolution, end in (("dzień", DAY, start_ms + 3 * DAY), ("godzina", HOUR, start_ms + 3 * HOUR),
+                                   ("15 min", 15 * MINUTE, start_ms + HOUR), ("30 s", 30000, start_ms + 2 * MINUTE)):
+        started = time.perf_counter()
+        table, rows = query_rollup(conn, 1, start_ms, end, resolution)
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"\nRozdzielczość {label}: źródło {table}, {len(rows)} przedziałów, {elapsed:.2f} ms")
+        for okres, liczba, minimum, maksimum, srednia in rows[:3]:
+            print(f"  {okres} | {liczba:5} odczytów | min {minimum:.2f} | max {maksimum:.2f} | śr {srednia:.2f}")
+    conn.close()
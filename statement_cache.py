@@ -0,0 +1,147 @@
+# ============================================
+# Cache poleceń UPDATE dla dynamicznej funkcji update()
+# ============================================
+# update(conn, table, id, **kwargs) z 11_update.py za każdym razem składa
+# tekst SQL od nowa. Moduł sqlite3 ma własny cache przygotowanych poleceń,
+# ale kluczem jest DOKŁADNY tekst SQL - więc wystarczy zawsze budować
+# identyczny tekst dla tej samej tabeli i tego samego zestawu kolumn.
+#
+# Tu:
+#   - tekst SQL jest pamiętany dla klucza (tabela, posortowane kolumny)
+#   - nazwy kolumn sprawdzamy z zapamiętanym schematem tabeli
+#     (zamiast czekać na OperationalError z bazy)
+#   - update_many() robi jedno executemany() na każdy zestaw kolumn
+
+import threading
+import weakref
+from collections import OrderedDict
+from functools import lru_cache
+from sqlite3 import OperationalError
+
+
+# połączenie → {tabela: kolumny}
+# Słabe referencje - wpis znika razem z połączeniem, cache nie przedłuża mu życia.
+_schema_cache = weakref.WeakKeyDictionary()
+# Sam sqlite3.Connection nie obsługuje słabych referencji (opakowania z
+# connection_pool.py i query_tracing.py - tak). Dla niego: id(conn) →
+# (conn, {tabela: kolumny}) z referencją, żeby id nie zostało użyte ponownie
+# przez inny obiekt; rozmiar ograniczony, najstarsze wpisy wypadają.
+_SCHEMA_CACHE_SIZE = 64
+_plain_cache = OrderedDict()
+_schema_lock = threading.Lock()
+
+
+def _schemas(conn, create=False):
+    """Słownik {tabela: kolumny} połączenia (None, gdy go nie ma) - wołane pod _schema_lock"""
+    try:
+        schemas = _schema_cache.get(conn)
+        if schemas is None and create:
+            schemas = _schema_cache[conn] = {}
+        return schemas
+    except TypeError:
+        pass
+    key = id(conn)
+    entry = _plain_cache.get(key)
+    if entry is not None and entry[0] is conn:
+        _plain_cache.move_to_end(key)
+        return entry[1]
+    if not create:
+        return None
+    entry = _plain_cache[key] = (conn, {})
+    if len(_plain_cache) > _SCHEMA_CACHE_SIZE:
+        _plain_cache.popitem(last=False)
+    return entry[1]
+
+
+def table_columns(conn, table):
+    """
+    Zbiór kolumn tabeli - odczytany raz dla połączenia i zapamiętany
+    :raises OperationalError: gdy tabela nie istnieje
+    """
+    with _schema_lock:
+        schemas = _schemas(conn)
+        columns = schemas.get(table) if schemas is not None else None
+    if columns is not None:
+        return columns
+
+    rows = conn.execute("SELECT name FROM pragma_table_info(?)", (table,)).fetchall()
+    if not rows:
+        raise OperationalError(f"no such table: {table}")
+    columns = frozenset(row[0] for row in rows)
+    with _schema_lock:
+        _schemas(conn, create=True)[table] = columns
+    return columns
+
+
+def invalidate_schema_cache(conn=None):
+    """Wyczyść zapamiętane schematy (np. po ALTER TABLE); None = wszystkie połączenia"""
+    with _schema_lock:
+        if conn is None:
+            _schema_cache.clear()
+            _plain_cache.clear()
+            return
+        schemas = _schemas(conn)
+        if schemas is not None:
+            schemas.clear()
+
+
+@lru_cache(maxsize=256)
+def build_update_sql(table, columns):
+    """
+    Tekst polecenia UPDATE dla tabeli i krotki (posortowanych) kolumn
+    Ten sam klucz = ten sam obiekt tekstu = ponowne użycie przygotowanego polecenia.
+    """
+    parameters = ", ".join(f"{column} = ?" for column in columns)
+    return f"UPDATE {table} SET {parameters} WHERE id = ?"
+
+
+def prepare_update(conn, table, values):
+    """
+    Sprawdź kolumny i zwróć (sql, kolumny) dla słownika wartości
+    :raises OperationalError: dla nieznanej tabeli lub kolumny
+    """
+    columns = tuple(sorted(values))
+    if not columns:
+        raise OperationalError("UPDATE bez kolumn do zmiany")
+    known = table_columns(conn, table)
+    for column in columns:
+        if column not in known:
+            raise OperationalError(f"no such column: {column}")
+    return build_update_sql(table, columns), columns
+
+
+def check_rows(rows):
+    """
+    Sprawdź wiersze update_many() przed jakimkolwiek zapisem
+    :raises ValueError: gdy wiersz nie jest słownikiem albo nie ma klucza "id"
+    """
+    for position, row in enumerate(rows):
+        if not isinstance(row, dict):
+            raise ValueError(f"Wiersz {position} nie jest słownikiem: {row!r}")
+        if "id" not in row:
+            raise ValueError(f"Wiersz {position} nie ma klucza 'id': {row!r}")
+
+
+def update_many(conn, table, rows):
+    """
+    Zaktualizuj wiele wierszy - jedno executemany() na każdy zestaw kolumn
+    :param conn: obiekt Connection
+    :param table: nazwa tabeli
+    :param rows: lista słowników, każdy z kluczem "id" i kolumnami do zmiany
+    :return: liczba zmienionych wierszy
+    :raises ValueError: gdy któryś wiersz nie ma "id" (nic nie zostaje zmienione)
+    """
+    rows = list(rows)
+    check_rows(rows)
+    groups = {}
+    for row in rows:
+        values = dict(row)
+        row_id = values.pop("id")
+        sql, columns = prepare_update(conn, table, values)
+        groups.setdefault(sql, []).append(tuple(values[c] for c in columns) + (row_id,))
+
+    changed = 0
+    with conn:
+        for sql, parameters in groups.items():
+            changed += conn.executemany(sql, parameters).rowcount
+    return changed
@@ -0,0 +1,206 @@
+# ============================================
+# Ruchy magazynowe - zmiany ilości sztuk paczkami
+# ============================================
+# update_warehouse_quantity() ustawia ilosc_sztuk na wartość bezwzględną:
+# dwóch magazynierów czyta 50, jeden wydaje 10, drugi 5 - i jedna wydana
+# partia ginie. Do tego każda zmiana to osobny commit.
+#
+# Tutaj każda zmiana to ruch o względną wartość (zmiana = +przyjęcie / -wydanie):
+#   - UPDATE ... SET ilosc_sztuk = ilosc_sztuk + ? - bez odczytu przed zapisem,
+#     więc równoległe ruchy się nie nadpisują
+#   - warunek ilosc_sztuk + ? >= 0 w tym samym UPDATE - stan nie spadnie
+#     poniżej zera; ruch, który by to zrobił, jest odrzucany (reszta paczki idzie dalej)
+#   - każdy przyjęty ruch trafia do księgi stock_movements (tylko dopisywanie -
+#     triggery blokują UPDATE i DELETE) razem ze stanem po ruchu
+#   - setki ruchów w jednej transakcji BEGIN IMMEDIATE: blokada zapisu od
+#     razu na początku paczki, jeden commit na paczkę
+#
+#   results = apply_movements(conn, [(2, -10), (2, -5, "zamówienie 17"), (3, +40)])
+#   [r.ok for r in results]  # wynik dla każdego ruchu, w kolejności
+
+import time
+from collections import namedtuple
+from sqlite3 import Error, ProgrammingError
+
+import warehouse_locations
+
+
+Movement = namedtuple("Movement", "warehouse_id zmiana opis", defaults=(None,))
+
+# ok=False: ilosc_po to obecny stan (None, gdy lokalizacji nie ma), blad - powód
+MovementResult = namedtuple("MovementResult", "warehouse_id zmiana ok ilosc_po blad")
+
+MOVEMENTS_SCHEMA_SQL = [
+    """
+    CREATE TABLE IF NOT EXISTS stock_movements (
+        id INTEGER PRIMARY KEY,
+        warehouse_id INTEGER NOT NULL,
+        zmiana INTEGER NOT NULL,
+        ilosc_po INTEGER NOT NULL,
+        czas INTEGER NOT NULL,
+        opis TEXT
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_stock_movements_warehouse ON stock_movements (warehouse_id, id)",
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_stock_movements_no_update BEFORE UPDATE ON stock_movements
+    BEGIN SELECT RAISE(ABORT, 'stock_movements: ksiega ruchow jest tylko do dopisywania'); END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_stock_movements_no_delete BEFORE DELETE ON stock_movements
+    BEGIN SELECT RAISE(ABORT, 'stock_movements: ksiega ruchow jest tylko do dopisywania'); END
+    """,
+]
+
+_MOVE_SQL = """
+UPDATE warehouses
+SET ilosc_sztuk = ilosc_sztuk + ?1
+WHERE id = ?2 AND ilosc_sztuk + ?1 >= 0
+RETURNING ilosc_sztuk
+"""
+
+_LEDGER_SQL = "INSERT INTO stock_movements (warehouse_id, zmiana, ilosc_po, czas, opis) VALUES (?, ?, ?, ?, ?)"
+
+DEFAULT_BATCH_SIZE = 500
+
+
+def create_movements_table(conn):
+    """
+    Utwórz księgę ruchów stock_movements (idempotentne)
+    """
+    try:
+        for sql in MOVEMENTS_SCHEMA_SQL:
+            conn.execute(sql)
+        conn.commit()
+        print("✓ Tabela 'stock_movements' utworzona")
+    except Error as e:
+        print(f"✗ Błąd tworzenia tabeli: {e}")
+
+
+def _apply_batch(conn, batch):
+    """Jedna paczka ruchów w jednej transakcji → (wyniki, nowe stany lokalizacji)"""
+    results = []
+    ledger = []
+    quantities = {}
+    czas = int(time.time() * 1000)
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        for movement in batch:
+            warehouse_id, zmiana, opis = Movement(*movement)
+            if not isinstance(zmiana, int) or zmiana == 0:
+                results.append(MovementResult(warehouse_id, zmiana, False, None, "zmiana musi być niezerową liczbą całkowitą"))
+                continue
+            row = conn.execute(_MOVE_SQL, (zmiana, warehouse_id)).fetchone()
+            if row is not None:
+                quantities[warehouse_id] = row[0]
+                ledger.append((warehouse_id, zmiana, row[0], czas, opis))
+                results.append(MovementResult(warehouse_id, zmiana, True, row[0], None))
+                continue
+            # Ruch odrzucony - ustal dlaczego (stan odczytany w tej samej transakcji)
+            row = conn.execute("SELECT ilosc_sztuk FROM warehouses WHERE id = ?", (warehouse_id,)).fetchone()
+            if row is None:
+                results.append(MovementResult(warehouse_id, zmiana, False, None, "brak lokalizacji"))
+            else:
+                results.append(MovementResult(warehouse_id, zmiana, False, row[0],
+                                              f"niewystarczający stan ({row[0]} szt.)"))
+        conn.executemany(_LEDGER_SQL, ledger)
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    return results, quantities
+
+
+def apply_movements(conn, movements, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Zastosuj ruchy magazynowe paczkami - jedna transakcja na paczkę
+
+    Ruchy są wykonywane w podanej kolejności, więc kilka ruchów tej samej
+    lokalizacji w jednej paczce widzi nawzajem swoje zmiany. Odrzucony ruch
+    (stan < 0, brak lokalizacji) nie przerywa paczki. Błąd bazy wycofuje
+    całą bieżącą paczkę i jest zgłaszany dalej - wcześniejsze paczki
+    pozostają zatwierdzone.
+
+    :param conn: obiekt Connection
+    :param movements: krotki (warehouse_id, zmiana) lub (warehouse_id, zmiana, opis)
+    :param batch_size: ile ruchów na transakcję
+    :return: lista MovementResult - jeden wynik na ruch, w kolejności ruchów
+    :raises ProgrammingError: gdy połączenie ma otwartą transakcję - każda paczka
+                              kończy się commitem, który zatwierdziłby też ją
+    """
+    if conn.in_transaction:
+        raise ProgrammingError("apply_movements() wymaga połączenia bez otwartej transakcji - "
+                               "najpierw zatwierdź lub wycofaj własne zmiany")
+    results = []
+    movements = list(movements)
+    for start in range(0, len(movements), batch_size):
+        batch_results, quantities = _apply_batch(conn, movements[start:start + batch_size])
+        results.extend(batch_results)
+        for warehouse_id, ilosc_sztuk in quantities.items():
+            warehouse_locations.on_quantity(conn, warehouse_id, ilosc_sztuk)
+    return results
+
+
+def move_stock(conn, warehouse_id, zmiana, opis=None):
+    """Pojedynczy ruch - skrót do apply_movements()"""
+    return apply_movements(conn, [(warehouse_id, zmiana, opis)])[0]
+
+
+def movement_history(conn, warehouse_id, limit=50):
+    """
+    Ostatnie ruchy lokalizacji, od najnowszego
+    :return: lista (id, zmiana, ilosc_po, czas_ms, opis)
+    """
+    sql = """
+    SELECT id, zmiana, ilosc_po, czas, opis FROM stock_movements
+    WHERE warehouse_id = ?
+    ORDER BY id DESC LIMIT ?
+    """
+    return conn.execute(sql, (warehouse_id, limit)).fetchall()
+
+
+if __name__ == "__main__":
+    import os
+    import random
+    import sqlite3
+    import tempfile
+    import threading
+
+    path = os.path.join(tempfile.mkdtemp(), "stock.db")
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("""CREATE TABLE warehouses (id INTEGER PRIMARY KEY, sensor_id INTEGER NOT NULL,
+        nazwa_magazynu TEXT NOT NULL, alejka INTEGER NOT NULL, regał INTEGER NOT NULL,
+        polka INTEGER NOT NULL, kuweta INTEGER NOT NULL, ilosc_sztuk INTEGER NOT NULL)""")
+    conn.executemany("INSERT INTO warehouses VALUES (NULL, 1, 'Magazyn A', ?, 1, 1, 1, 300)",
+                     [(i,) for i in range(1, 101)])
+    conn.commit()
+    create_movements_table(conn)
+
+    # 4 magazynierów, każdy 20 000 losowych wydań i przyjęć na swoim połączeniu
+    def picker(seed, out):
+        worker = sqlite3.connect(path, timeout=30)
+        rng = random.Random(seed)
+        out.extend(apply_movements(worker, [(rng.randint(1, 100), rng.choice((-7, -3, -1, 2, 5)))
+                                            for _ in range(20000)]))
+        worker.close()
+
+    outputs = [[] for _ in range(4)]
+    threads = [threading.Thread(target=picker, args=(seed, out)) for seed, out in enumerate(outputs)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    results = [result for out in outputs for result in out]
+    accepted = [result for result in results if result.ok]
+    print(f"✓ {len(results)} ruchów w {elapsed:.2f} s ({len(results) / elapsed:,.0f} ruchów/s), "
+          f"przyjętych {len(accepted)}, odrzuconych {len(results) - len(accepted)}")
+    # Stan = stan początkowy + suma przyjętych ruchów (żaden ruch nie zginął)
+    expected = 100 * 300 + sum(result.zmiana for result in accepted)
+    actual = conn.execute("SELECT SUM(ilosc_sztuk) FROM warehouses").fetchone()[0]
+    print(f"✓ Suma stanów {actual} = oczekiwana {expected}: {actual == expected}")
+    print(f"Ostatnie ruchy lokalizacji 1: {movement_history(conn, 1, limit=3)}")
+    conn.close()
@@ -0,0 +1,31 @@
+# ============================================
+# Strumieniowe pobieranie wyników - fetchmany() zamiast fetchall()
+# ============================================
+# fetchall() buduje listę WSZYSTKICH wierszy w pamięci.
+# iter_rows() jest generatorem: pobiera wiersze partiami (fetchmany)
+# i oddaje je po jednym, więc w pamięci jest tylko jedna partia naraz.
+# Kursor zamyka się sam - po przejściu wszystkich wierszy, po break
+# w pętli for albo gdy generator zostanie porzucony (close / garbage collector).
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+def iter_rows(conn, sql, parameters=(), batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Generator wierszy wyniku zapytania
+    :param conn: obiekt Connection
+    :param sql: zapytanie SELECT
+    :param parameters: parametry zapytania (krotka)
+    :param batch_size: ile wierszy pobierać jednym fetchmany()
+    """
+    cur = conn.cursor()
+    try:
+        cur.execute(sql, parameters)
+        while True:
+            rows = cur.fetchmany(batch_size)
+            if not rows:
+                break
+            yield from rows
+    finally:
+        cur.close()
+
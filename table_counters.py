@@ -0,0 +1,232 @@
+# ============================================
+# Liczniki utrzymywane przez triggery
+# ============================================
+# select_with_group_by() przelicza COUNT(tasks.id) z LEFT JOIN i GROUP BY
+# przy każdym wywołaniu, a count_tasks() / count_projects() / count_books()
+# przeglądają całą tabelę (COUNT(*) = pełny skan indeksu).
+# Tu liczniki są zapisane w bazie i aktualizowane przez triggery:
+#   - table_counts          (tabela)             → liczba wierszy
+#   - project_task_counts   (project_id, status) → liczba zadań
+# Odczyt licznika to jedno wyszukanie po kluczu głównym.
+#
+# Uwaga: triggery DELETE wyłączają optymalizację "DELETE FROM tabela"
+# (truncate) - bulk_delete.truncate_table() na czas czyszczenia zdejmuje
+# triggery tabeli i zeruje jej liczniki (patrz suspended_counters()).
+
+from contextlib import contextmanager
+from sqlite3 import Error, OperationalError
+
+
+COUNTER_TABLES_SQL = [
+    """
+    CREATE TABLE IF NOT EXISTS table_counts (
+        tabela TEXT PRIMARY KEY,
+        liczba INTEGER NOT NULL
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS project_task_counts (
+        project_id INTEGER NOT NULL,
+        status TEXT NOT NULL,
+        liczba INTEGER NOT NULL,
+        PRIMARY KEY (project_id, status)
+    ) WITHOUT ROWID
+    """,
+]
+
+_INCREMENT_TABLE = """
+    INSERT INTO table_counts (tabela, liczba) VALUES ('{table}', 1)
+    ON CONFLICT (tabela) DO UPDATE SET liczba = liczba + 1;
+"""
+_DECREMENT_TABLE = "UPDATE table_counts SET liczba = liczba - 1 WHERE tabela = '{table}';"
+_INCREMENT_TASK = """
+    INSERT INTO project_task_counts (project_id, status, liczba) VALUES (NEW.project_id, NEW.status, 1)
+    ON CONFLICT (project_id, status) DO UPDATE SET liczba = liczba + 1;
+"""
+_DECREMENT_TASK = """
+    UPDATE project_task_counts SET liczba = liczba - 1
+    WHERE project_id = OLD.project_id AND status = OLD.status;
+"""
+
+# tabela: {nazwa triggera: (zdarzenie, ciało)}
+TRIGGERS = {
+    "projects": {
+        "trg_projects_count_insert": ("AFTER INSERT", _INCREMENT_TABLE.format(table="projects")),
+        "trg_projects_count_delete": ("AFTER DELETE", _DECREMENT_TABLE.format(table="projects")),
+    },
+    "tasks": {
+        "trg_tasks_count_insert": ("AFTER INSERT", _INCREMENT_TABLE.format(table="tasks") + _INCREMENT_TASK),
+        "trg_tasks_count_delete": ("AFTER DELETE", _DECREMENT_TABLE.format(table="tasks") + _DECREMENT_TASK),
+        # Zmiana statusu lub projektu przenosi zadanie między licznikami
+        "trg_tasks_count_update": ("AFTER UPDATE OF project_id, status", _DECREMENT_TASK + _INCREMENT_TASK),
+    },
+    "books": {
+        "trg_books_count_insert": ("AFTER INSERT", _INCREMENT_TABLE.format(table="books")),
+        "trg_books_count_delete": ("AFTER DELETE", _DECREMENT_TABLE.format(table="books")),
+    },
+}
+
+
+def _table_exists(conn, table):
+    sql = "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?"
+    return conn.execute(sql, (table,)).fetchone() is not None
+
+
+def _trigger_exists(conn, name):
+    sql = "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = ?"
+    return conn.execute(sql, (name,)).fetchone() is not None
+
+
+def _create_triggers(conn, table):
+    for name, (event, body) in TRIGGERS[table].items():
+        conn.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {event} ON {table} BEGIN {body} END")
+
+
+def _drop_triggers(conn, table):
+    for name in TRIGGERS[table]:
+        conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+
+
+def _recount(conn, table):
+    """Przelicz liczniki tabeli od zera (w bieżącej transakcji)"""
+    count = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    conn.execute("INSERT OR REPLACE INTO table_counts (tabela, liczba) VALUES (?, ?)", (table, count))
+    if table == "tasks":
+        conn.execute("DELETE FROM project_task_counts")
+        conn.execute("""
+        INSERT INTO project_task_counts (project_id, status, liczba)
+        SELECT project_id, status, COUNT(*) FROM tasks GROUP BY project_id, status
+        """)
+
+
+def install_counters(conn, tables=None):
+    """
+    Utwórz tabele liczników i triggery, a liczniki wypełnij aktualnymi danymi
+    Funkcja jest idempotentna - tabele, które już mają triggery, są pomijane.
+
+    :param conn: obiekt Connection
+    :param tables: ogranicz do podanych tabel (None = wszystkie istniejące z TRIGGERS)
+    :return: lista tabel, dla których założono liczniki w tym wywołaniu
+    """
+    installed = []
+    try:
+        conn.commit()
+        with conn:
+            conn.execute("BEGIN")
+            for sql in COUNTER_TABLES_SQL:
+                conn.execute(sql)
+            for table in TRIGGERS:
+                if tables is not None and table not in tables:
+                    continue
+                if not _table_exists(conn, table) or has_counters(conn, table):
+                    continue
+                # Triggery i przeliczenie w jednej transakcji - żaden wiersz nie umknie
+                _create_triggers(conn, table)
+                _recount(conn, table)
+                installed.append(table)
+        if installed:
+            print(f"✓ Liczniki utrzymywane przez triggery: {', '.join(installed)}")
+    except Error as e:
+        print(f"✗ Błąd tworzenia liczników: {e}")
+    return installed
+
+
+def has_counters(conn, table):
+    """Czy tabela ma komplet triggerów liczników"""
+    return table in TRIGGERS and all(_trigger_exists(conn, name) for name in TRIGGERS[table])
+
+
+def rebuild_counters(conn, table):
+    """Przelicz liczniki od nowa (np. po ręcznej zmianie danych z wyłączonymi triggerami)"""
+    with conn:
+        _recount(conn, table)
+
+
+def refresh_counter_triggers(conn, table):
+    """
+    Załóż triggery liczników tabeli od nowa, bez przeliczania (w bieżącej transakcji)
+    SQLite uruchamia triggery tego samego zdarzenia od najnowszego - liczniki muszą
+    zobaczyć wstawiony tekst, zanim trigger dictionary_encoding.py zamieni go na kod
+    (jego UPDATE przenosi wtedy zadanie z licznika tekstu do licznika kodu).
+    """
+    if has_counters(conn, table):
+        _drop_triggers(conn, table)
+        _create_triggers(conn, table)
+
+
+@contextmanager
+def suspended_counters(conn, table):
+    """
+    Zdejmij triggery liczników tabeli na czas bloku, potem przelicz i załóż je z powrotem
+    Wywołujący odpowiada za transakcję (BEGIN ... COMMIT) wokół bloku.
+    """
+    active = has_counters(conn, table)
+    if active:
+        _drop_triggers(conn, table)
+    yield active
+    if active:
+        _recount(conn, table)
+        _create_triggers(conn, table)
+
+
+# ============================================
+# Odczyt liczników
+# ============================================
+
+def count_rows(conn, table):
+    """
+    Liczba wierszy tabeli - z licznika, a gdy go nie ma - COUNT(*)
+    """
+    if has_counters(conn, table):
+        row = conn.execute("SELECT liczba FROM table_counts WHERE tabela = ?", (table,)).fetchone()
+        if row is not None:
+            return row[0]
+    return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def tasks_per_project(conn):
+    """
+    Lista (nazwa projektu, liczba zadań) - jak select_with_group_by(),
+    ale sumuje liczniki zamiast zliczać wiersze tasks
+    """
+    if not has_counters(conn, "tasks"):
+        raise OperationalError("Brak liczników dla tabeli tasks - wywołaj install_counters()")
+    sql = """
+    SELECT projects.nazwa, COALESCE(SUM(project_task_counts.liczba), 0) AS liczba_zadan
+    FROM projects
+    LEFT JOIN project_task_counts ON projects.id = project_task_counts.project_id
+    GROUP BY projects.nazwa;
+    """
+    return conn.execute(sql).fetchall()
+
+
+def status_counts(conn, project_id=None):
+    """
+    Słownik {status: liczba zadań} dla projektu (None = wszystkie projekty)
+    """
+    status = "status"
+    join = ""
+    if _table_exists(conn, "task_statuses"):
+        # Status zakodowany słownikiem (dictionary_encoding.py) - licznik trzyma kod
+        status = "COALESCE(task_statuses.nazwa, project_task_counts.status)"
+        join = "LEFT JOIN task_statuses ON task_statuses.id = project_task_counts.status"
+    if project_id is None:
+        sql = f"SELECT {status}, SUM(liczba) FROM project_task_counts {join} GROUP BY 1"
+        rows = conn.execute(sql).fetchall()
+    else:
+        sql = f"SELECT {status}, SUM(liczba) FROM project_task_counts {join} WHERE project_id = ? GROUP BY 1"
+        rows = conn.execute(sql, (project_id,)).fetchall()
+    return {status: count for status, count in rows if count}
+
+
+if __name__ == "__main__":
+    import sqlite3
+
+    for db_file in ("project_manager.db", "fetch_practice.db", "moja_biblioteka.db"):
+        conn = sqlite3.connect(db_file)
+        print(f"{db_file}:")
+        install_counters(conn)
+        for table in TRIGGERS:
+            if _table_exists(conn, table):
+                print(f"  {table}: {count_rows(conn, table)}")
+        conn.close()
@@ -0,0 +1,29 @@
+import contextlib
+import importlib
+import io
+import os
+import sys
+
+import pytest
+
+# Moduły leżą płasko w katalogu głównym repozytorium
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+def load(name):
+    """Import modułu, także takiego, którego nazwa zaczyna się od cyfry (5_db_funkctions)"""
+    return importlib.import_module(name)
+
+
+@contextlib.contextmanager
+def quiet():
+    """Wycisz komunikaty ✓ drukowane przez funkcje pomocnicze"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "test.db")
@@ -0,0 +1,125 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from conftest import load
+
+async_db = load("async_db")
+
+SLOW_QUERY = "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n) SELECT count(*) FROM n"
+
+
+def run(coroutine_function, db_path, **options):
+    async def main():
+        async with async_db.AsyncDatabase(db_path, **options) as db:
+            return await coroutine_function(db)
+    return asyncio.run(main())
+
+
+def test_cancel_interrupts_running_query(db_path):
+    async def scenario(db):
+        started = time.perf_counter()
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(db.read(lambda conn: conn.execute(SLOW_QUERY).fetchone()), timeout=0.2)
+        elapsed = time.perf_counter() - started
+        # To samo połączenie działa dalej
+        return elapsed, await db.read(lambda conn: conn.execute("SELECT 1").fetchone()[0])
+
+    elapsed, value = run(scenario, db_path, readers=1)
+    assert elapsed < 5
+    assert value == 1
+
+
+def test_cancelled_call_waiting_in_queue_never_runs(db_path):
+    release = threading.Event()
+    ran = []
+
+    async def scenario(db):
+        blocking = asyncio.create_task(db.read(lambda conn: release.wait(5)))
+        queued = asyncio.create_task(db.read(lambda conn: ran.append("queued")))
+        await asyncio.sleep(0.05)
+        queued.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        await blocking
+        with pytest.raises(asyncio.CancelledError):
+            await queued
+        # Następne wywołanie na tym samym wątku - kolejka za anulowanym jest już pusta
+        await db.read(lambda conn: None)
+
+    run(scenario, db_path, readers=1)
+    assert ran == []
+
+
+def _concurrency_probe():
+    """Funkcja dla workera i licznik: ile jej wywołań trwało naraz"""
+    lock = threading.Lock()
+    state = {"now": 0, "max": 0}
+
+    def probe(conn):
+        with lock:
+            state["now"] += 1
+            state["max"] = max(state["max"], state["now"])
+        time.sleep(0.02)
+        with lock:
+            state["now"] -= 1
+
+    return probe, state
+
+
+def test_writes_run_one_at_a_time(db_path):
+    probe, state = _concurrency_probe()
+
+    async def scenario(db):
+        await asyncio.gather(*(db.write(probe) for _ in range(8)))
+
+    run(scenario, db_path, readers=4)
+    assert state["max"] == 1
+
+
+def test_reads_fan_out_to_all_readers(db_path):
+    barrier = threading.Barrier(3, timeout=5)
+
+    async def scenario(db):
+        # Każde wywołanie czeka na pozostałe - uda się tylko na trzech różnych wątkach
+        return await asyncio.gather(*(db.read(lambda conn: barrier.wait()) for _ in range(3)))
+
+    assert sorted(run(scenario, db_path, readers=3)) == [0, 1, 2]
+
+
+def test_max_pending_bounds_calls_in_flight(db_path):
+    probe, state = _concurrency_probe()
+
+    async def scenario(db):
+        await asyncio.gather(*(db.read(probe) for _ in range(10)))
+
+    run(scenario, db_path, readers=4, max_pending=2)
+    assert state["max"] == 2
+
+
+def test_break_closes_the_generator_in_its_thread(db_path):
+    closed_in = []
+
+    def numbers(conn):
+        try:
+            yield from range(1000)
+        finally:
+            closed_in.append(threading.current_thread().name)
+
+    async def scenario(db):
+        seen = []
+        async for number in db.iterate(numbers, batch_size=10):
+            seen.append(number)
+            if number == 14:
+                break
+        # Pętla zdarzeń zamyka porzucony async generator, zamknięcie kursora
+        # idzie do wątku czytającego - następne wywołanie na nim czeka
+        await asyncio.sleep(0)
+        await db.read(lambda conn: None)
+        return seen, list(closed_in)
+
+    seen, closed_in = run(scenario, db_path, readers=1)
+    assert seen == list(range(15))
+    assert len(closed_in) == 1 and closed_in[0].startswith("db-reader")
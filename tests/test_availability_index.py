@@ -0,0 +1,94 @@
+import sqlite3
+
+import pytest
+
+from conftest import load, quiet
+
+availability_index = load("availability_index")
+library = load("14_my_base")
+bulk_delete = load("bulk_delete")
+updates = load("11_update")
+
+
+@pytest.fixture
+def conn(db_path):
+    conn = sqlite3.connect(db_path)
+    with quiet():
+        library.create_tables(conn)
+        category = library.add_category(conn, "IT")
+        for i in range(5):
+            library.add_book(conn, f"Tytuł {i}", "Autor", 2000, category)
+    yield conn
+    conn.close()
+
+
+def test_hooks_keep_index_in_sync(conn):
+    assert library.count_available_books(conn, 1) == (5, 5)
+    index = availability_index.get_index(conn)
+    with quiet():
+        library.update_book_availability(conn, 2, 0)
+        library.delete_book(conn, 3)
+        library.add_book(conn, "Nowa", "Autor", 2024, 1)
+    assert library.count_available_books(conn, 1) == (4, 5)
+    assert library.available_book_ids(conn, 1) == [1, 4, 5, 6]
+    # Zmiany z haków nie wymuszają przebudowy indeksu
+    assert availability_index.get_index(conn) is index
+
+
+def test_delete_many_invalidates_index(conn):
+    assert library.count_available_books(conn, 1) == (5, 5)
+    bulk_delete.delete_many(conn, "books", [1, 2])
+    assert library.count_available_books(conn, 1) == (3, 3)
+    assert library.available_book_ids(conn, 1) == [3, 4, 5]
+
+
+def test_truncate_invalidates_index(conn):
+    assert library.count_available_books(conn, 1) == (5, 5)
+    bulk_delete.truncate_table(conn, "books", vacuum="none")
+    assert library.count_available_books(conn, 1) == (0, 0)
+
+
+def test_generic_updates_invalidate_index(conn):
+    assert library.count_available_books(conn, 1) == (5, 5)
+    with quiet():
+        updates.update(conn, "books", 3, dostepna=0)
+    assert library.count_available_books(conn, 1) == (4, 5)
+    with quiet():
+        updates.update_many(conn, "books", [{"id": 1, "dostepna": 0}, {"id": 2, "dostepna": 0}])
+    assert library.available_book_ids(conn, 1) == [4, 5]
+
+
+def test_changes_from_other_connection(conn, db_path):
+    assert library.count_available_books(conn, 1) == (5, 5)
+    other = sqlite3.connect(db_path)
+    other.execute("DELETE FROM books WHERE id = 4")
+    other.commit()
+    other.close()
+    assert library.count_available_books(conn, 1) == (4, 4)
+
+
+def test_snapshot_is_not_stale(conn):
+    assert library.count_available_books(conn, 1) == (5, 5)
+    bulk_delete.delete_many(conn, "books", [1])
+    availability_index.drop_index(conn)
+    assert library.count_available_books(conn, 1) == (4, 4)
+
+
+def test_unchanged_database_costs_one_query(conn):
+    assert library.count_available_books(conn, 1) == (5, 5)
+    statements = []
+    conn.set_trace_callback(statements.append)
+    assert library.count_available_books(conn, 1) == (5, 5)
+    conn.set_trace_callback(None)
+    assert statements == ["PRAGMA data_version"]
+
+
+def test_hook_does_not_hide_concurrent_change(conn, db_path):
+    assert library.count_available_books(conn, 1) == (5, 5)
+    other = sqlite3.connect(db_path)
+    other.execute("DELETE FROM books WHERE id = 4")
+    other.commit()
+    other.close()
+    with quiet():
+        library.update_book_availability(conn, 2, 0)
+    assert library.available_book_ids(conn, 1) == [1, 3, 5]
@@ -0,0 +1,46 @@
+import sqlite3
+
+import pytest
+
+from conftest import load
+
+benchmark = load("benchmark")
+
+
+def _report(size="1k", ops=1000, p50=1.0, python="3.11.7"):
+    return {"meta": {"size": size, "rows": benchmark.SIZES[size], "ops": ops, "seed": 42,
+                     "environment": {"python": python, "sqlite": "3.40.1"}},
+            "results": {"insert.add_task": {"p50_ms": p50}}}
+
+
+def test_compare_same_parameters():
+    rows = benchmark.compare(_report(p50=2.0), _report(p50=1.0))
+    assert rows == [("insert.add_task", 1.0, 2.0, 1.0, "WOLNIEJ")]
+
+
+@pytest.mark.parametrize("baseline", [_report(size="100k"), _report(ops=500)])
+def test_compare_refuses_different_parameters(baseline):
+    with pytest.raises(ValueError):
+        benchmark.compare(_report(), baseline)
+    assert benchmark.compare(_report(), baseline, force=True)[0][4] == "bez zmian"
+
+
+def test_environment_differences_are_reported_not_refused():
+    params, env = benchmark.meta_differences(_report(), _report(python="3.12.0"))
+    assert (params, env) == ([], [("python", "3.12.0", "3.11.7")])
+    benchmark.compare(_report(), _report(python="3.12.0"))
+
+
+def test_crud_covers_every_schema(db_path):
+    conn = sqlite3.connect(db_path)
+    counts = benchmark.generate_all(conn, 200)
+    results = benchmark.run_benchmarks(conn, counts, ops=20)
+    assert {"insert.add_sensor", "insert.add_warehouse", "insert.student",
+            "lookup.find_sensor_locations", "lookup.warehouse_by_id", "lookup.student_by_id",
+            "update.update_warehouse_quantity", "update.student",
+            "delete.delete_where_warehouses", "delete.delete_where_students"} <= set(results)
+    assert conn.execute("SELECT COUNT(*) FROM sensors").fetchone()[0] == counts["sensors"] + 20
+    assert conn.execute("SELECT COUNT(*) FROM students WHERE imie LIKE 'Nowy %'").fetchone()[0] == 20
+    assert conn.execute("SELECT COUNT(*) FROM warehouses").fetchone()[0] < counts["warehouses"] + 20
+    assert conn.execute("SELECT COUNT(*) FROM students").fetchone()[0] < counts["students"] + 20
+    conn.close()
@@ -0,0 +1,74 @@
+import sqlite3
+
+import pytest
+
+from conftest import load, quiet
+
+library = load("14_my_base")
+book_search = load("book_search")
+bulk_delete = load("bulk_delete")
+updates = load("11_update")
+
+
+@pytest.fixture
+def conn(db_path):
+    conn = sqlite3.connect(db_path)
+    with quiet():
+        library.create_tables(conn)
+        category_id = library.add_category(conn, "Powieść")
+        library.add_book(conn, "Mistrz i Małgorzata", "Michaił Bułhakow", 1967, category_id)
+        library.add_book(conn, "Rok 1984", "George Orwell", 1949, category_id)
+        library.add_book(conn, "Folwark zwierzęcy", "George Orwell", 1945, category_id)
+    assert book_search.has_search_index(conn)
+    yield conn
+    conn.close()
+
+
+def _titles(conn, text):
+    return sorted(row[1] for row in book_search.search(conn, text))
+
+
+def _check_index(conn):
+    """Każda książka jest znajdowana po pełnym tytule i autorze (bez prefiksów)"""
+    conn.execute("INSERT INTO books_fts (books_fts) VALUES ('integrity-check')")
+    for book_id, tytul, autor in conn.execute("SELECT id, tytul, autor FROM books").fetchall():
+        for column, text in (("tytul", tytul), ("autor", autor)):
+            found = book_search.search(conn, text, limit=1000, prefix=False, column=column)
+            assert book_id in [row[0] for row in found]
+
+
+def test_search_folds_polish_letters_and_prefixes(conn):
+    assert _titles(conn, "mistr malg") == ["Mistrz i Małgorzata"]
+    assert _titles(conn, "bulhakow") == ["Mistrz i Małgorzata"]
+    assert _titles(conn, "orw") == ["Folwark zwierzęcy", "Rok 1984"]
+    _check_index(conn)
+
+
+def test_index_follows_updates(conn):
+    with quiet():
+        updates.update(conn, "books", 2, tytul="Dziewiętnaście osiemdziesiąt cztery")
+        library.update_book_availability(conn, 3, 0)
+    assert _titles(conn, "rok") == []
+    assert _titles(conn, "dziewietnascie") == ["Dziewiętnaście osiemdziesiąt cztery"]
+    assert _titles(conn, "folwark") == ["Folwark zwierzęcy"]
+    _check_index(conn)
+
+
+def test_index_follows_deletes(conn):
+    with quiet():
+        library.delete_book(conn, 1)
+        bulk_delete.delete_many(conn, "books", [3])
+    assert _titles(conn, "mistrz") == []
+    assert _titles(conn, "orwell") == ["Rok 1984"]
+    _check_index(conn)
+
+
+def test_index_after_truncate(conn):
+    with quiet():
+        bulk_delete.truncate_table(conn, "books", vacuum="none")
+    assert _titles(conn, "orwell") == []
+    assert book_search.has_search_index(conn)
+    with quiet():
+        library.add_book(conn, "Łódź i okolice", "Jan Kowalski", 2001, 1)
+    assert _titles(conn, "lodz") == ["Łódź i okolice"]
+    _check_index(conn)
@@ -0,0 +1,46 @@
+import sqlite3
+
+import pytest
+
+from conftest import load, quiet
+
+db_tasks = load("5_db_funkctions")
+bulk_delete = load("bulk_delete")
+
+
+@pytest.fixture
+def conn(db_path):
+    conn = sqlite3.connect(db_path)
+    with quiet():
+        db_tasks.create_tables(conn)
+        for i in range(5):
+            db_tasks.add_project(conn, (f"Projekt {i}", "2024-01-01", "2024-12-31"))
+    yield conn
+    conn.close()
+
+
+def _projects(conn):
+    return [row[0] for row in conn.execute("SELECT nazwa FROM projects ORDER BY id")]
+
+
+def test_delete_many_in_chunks(conn):
+    summary = bulk_delete.delete_many(conn, "projects", [1, 3, 5, 99], chunk_size=2)
+    assert (summary["keys"], summary["deleted"], summary["chunks"]) == (4, 3, 2)
+    assert _projects(conn) == ["Projekt 1", "Projekt 3"]
+
+
+def test_delete_many_refuses_open_transaction(conn):
+    conn.execute("INSERT INTO projects (nazwa) VALUES ('Niezatwierdzony')")
+    with pytest.raises(sqlite3.ProgrammingError):
+        bulk_delete.delete_many(conn, "projects", [1])
+    conn.rollback()
+    assert _projects(conn) == [f"Projekt {i}" for i in range(5)]
+
+
+def test_truncate_refuses_open_transaction(conn):
+    conn.execute("INSERT INTO projects (nazwa) VALUES ('Niezatwierdzony')")
+    with pytest.raises(sqlite3.ProgrammingError):
+        bulk_delete.truncate_table(conn, "projects", vacuum="none")
+    conn.rollback()
+    assert bulk_delete.truncate_table(conn, "projects", vacuum="none")["deleted"] == 5
+    assert _projects(conn) == []
@@ -0,0 +1,111 @@
+import json
+import sqlite3
+
+import pytest
+
+from conftest import load, quiet
+
+db_tasks = load("5_db_funkctions")
+bulk_import = load("bulk_import")
+dictionary_encoding = load("dictionary_encoding")
+
+
+def _tasks(statuses, project="Projekt"):
+    return [{"projekt": project, "nazwa": f"Zadanie {i}", "status": status,
+             "start_date": "2024-01-01", "end_date": "2024-02-01"} for i, status in enumerate(statuses)]
+
+
+@pytest.fixture(params=[False, True], ids=["text", "encoded"])
+def conn(request, db_path):
+    conn = sqlite3.connect(db_path)
+    with quiet():
+        db_tasks.create_tables(conn, encode_status=request.param)
+        db_tasks.add_project(conn, ("Projekt", "2024-01-01", "2024-12-31"))
+    yield conn
+    conn.close()
+
+
+def test_import_tasks_by_project_name(conn):
+    statuses = ["Nowe", "W trakcie", "Zablokowane", "Nowe", "12"]
+    summary = bulk_import.bulk_import(conn, "tasks", _tasks(statuses))
+    assert (summary["inserted"], summary["rejected"]) == (5, 0)
+    assert [task[4] for task in db_tasks.get_all_tasks(conn)] == statuses
+
+
+def test_encoded_statuses_are_written_as_codes(conn):
+    bulk_import.bulk_import(conn, "tasks", _tasks(["Nowe", "Gotowe", "7"]))
+    types = {row[0] for row in conn.execute("SELECT typeof(status) FROM tasks")}
+    if dictionary_encoding.is_encoded(conn, "tasks", "status"):
+        assert types == {"integer"}
+        names = dict(conn.execute("SELECT nazwa, id FROM task_statuses"))
+        assert [row[0] for row in conn.execute("SELECT status FROM tasks ORDER BY id")] == \
+            [names["Nowe"], names["Gotowe"], names["7"]]
+    else:
+        assert types == {"text"}
+
+
+def test_invalid_rows_are_rejected(conn):
+    errors = []
+    rows = _tasks(["Nowe", "Nowe"]) + [{"projekt": "Brak", "nazwa": "X", "status": "Nowe",
+                                        "start_date": "2024-01-01", "end_date": "2024-02-01"},
+                                       {"projekt": "Projekt", "nazwa": "Y", "status": "Nowe",
+                                        "start_date": "nie-data", "end_date": "2024-02-01"}]
+    summary = bulk_import.bulk_import(conn, "tasks", rows, on_error=lambda *error: errors.append(error))
+    assert (summary["inserted"], summary["rejected"]) == (2, 2)
+    assert [line_no for line_no, _, _ in errors] == [3, 4]
+
+
+def test_malformed_jsonl_lines_are_rejected(conn, tmp_path):
+    path = tmp_path / "tasks.jsonl"
+    lines = [json.dumps(row) for row in _tasks(["Nowe", "Gotowe"])]
+    path.write_text("\n".join([lines[0], '{"projekt": "Projekt", ', "[1, 2]", lines[1]]), encoding="utf-8")
+    errors = []
+    summary = bulk_import.bulk_import(conn, "tasks", str(path), on_error=lambda *error: errors.append(error))
+    assert (summary["inserted"], summary["rejected"]) == (2, 2)
+    assert [line_no for line_no, _, _ in errors] == [2, 3]
+    with pytest.raises(ValueError):
+        list(bulk_import.read_rows(str(path)))
+
+
+def test_integrity_error_rejects_only_the_row(conn):
+    rows = _tasks(["Nowe", "Nowe", "Nowe"])
+    for i, row in enumerate(rows):
+        row["id"] = [10, 10, 11][i]
+    errors = []
+    summary = bulk_import.bulk_import(conn, "tasks", rows, on_error=lambda *error: errors.append(error))
+    assert (summary["inserted"], summary["rejected"]) == (2, 1)
+    assert errors[0][0] == 2 and "UNIQUE" in errors[0][2]
+    assert [task[0] for task in db_tasks.get_all_tasks(conn)] == [10, 11]
+
+
+def test_failing_source_leaves_no_partial_chunk(conn):
+    indexes = conn.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'tasks'").fetchall()
+
+    def rows():
+        yield from _tasks(["Nowe", "Nowe"])
+        raise OSError("plik zniknął")
+
+    with pytest.raises(OSError):
+        bulk_import.bulk_import(conn, "tasks", rows(), chunk_size=1)
+    assert db_tasks.get_all_tasks(conn) == []
+    assert conn.execute("SELECT name FROM sqlite_master WHERE type = 'index' "
+                        "AND tbl_name = 'tasks'").fetchall() == indexes
+
+
+def test_open_transaction_is_refused(conn):
+    conn.execute("INSERT INTO projects (nazwa) VALUES ('Niezatwierdzony')")
+    with pytest.raises(sqlite3.ProgrammingError):
+        bulk_import.bulk_import(conn, "tasks", _tasks(["Nowe"]))
+    conn.rollback()
+    assert [row[0] for row in conn.execute("SELECT nazwa FROM projects")] == ["Projekt"]
+    assert db_tasks.get_all_tasks(conn) == []
+
+
+def test_unique_indexes_stay_during_import(conn):
+    conn.execute("CREATE UNIQUE INDEX idx_tasks_unique_name ON tasks (project_id, nazwa)")
+    conn.commit()
+    rows = _tasks(["Nowe", "Nowe"])
+    rows[1]["nazwa"] = rows[0]["nazwa"]
+    summary = bulk_import.bulk_import(conn, "tasks", rows)
+    assert (summary["inserted"], summary["rejected"]) == (1, 1)
+    assert conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'idx_tasks_unique_name'").fetchone()
@@ -0,0 +1,76 @@
+import sqlite3
+
+import pytest
+
+from conftest import load, quiet
+
+db_tasks = load("5_db_funkctions")
+connection_pool = load("connection_pool")
+
+
+@pytest.fixture(autouse=True)
+def close_pools():
+    yield
+    connection_pool.close_all_pools()
+
+
+def _setting(conn, name):
+    return conn.execute(f"PRAGMA {name}").fetchone()[0]
+
+
+def test_pooled_connections_follow_the_requested_profile(db_path):
+    with quiet():
+        balanced = db_tasks.create_connection(db_path, use_pool=True, profile="balanced")
+        analytics = db_tasks.create_connection(db_path, use_pool=True, profile="read-only-analytics")
+        plain = db_tasks.create_connection(db_path, use_pool=True)
+    assert (_setting(balanced, "synchronous"), _setting(balanced, "query_only")) == (1, 0)
+    assert _setting(analytics, "query_only") == 1
+    assert _setting(plain, "query_only") == 0
+    assert balanced.raw is not analytics.raw
+    for conn in (balanced, analytics, plain):
+        conn.close()
+    # Oddane połączenie wraca tylko do puli swojego profilu
+    with quiet():
+        again = db_tasks.create_connection(db_path, use_pool=True, profile="read-only-analytics")
+    assert _setting(again, "query_only") == 1
+    again.close()
+
+
+@pytest.mark.parametrize("use_pool", [False, True])
+def test_unknown_profile_returns_none(db_path, use_pool):
+    with quiet():
+        assert db_tasks.create_connection(db_path, use_pool=use_pool, profile="turbo") is None
+    with pytest.raises(ValueError):
+        connection_pool.get_pool(db_path, profile="turbo")
+
+
+def test_dropped_connection_returns_its_slot(db_path):
+    pool = connection_pool.get_pool(db_path, max_size=1)
+    conn = connection_pool.connect(db_path)
+    raw = conn.raw
+    del conn
+    # Bez finalizera pula byłaby pełna i acquire() czekałoby do timeoutu
+    again = connection_pool.connect(db_path, timeout=0.1)
+    assert again.raw is raw
+    assert pool.stats()["in_use"] == 1
+    again.close()
+    again.close()
+    assert pool.stats()["in_use"] == 0
+
+
+def test_dropped_connection_rolls_back(db_path):
+    conn = connection_pool.connect(db_path)
+    conn.execute("CREATE TABLE t (x)")
+    conn.commit()
+    conn.execute("INSERT INTO t VALUES (1)")
+    del conn
+    conn = connection_pool.connect(db_path)
+    assert conn.execute("SELECT COUNT(*) FROM t").fetchone() == (0,)
+    conn.close()
+
+
+def test_memory_database_is_not_pooled():
+    with pytest.raises(sqlite3.NotSupportedError):
+        connection_pool.get_pool(":memory:")
+    with quiet():
+        assert db_tasks.create_connection(":memory:", use_pool=True) is None
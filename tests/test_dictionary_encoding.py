@@ -0,0 +1,91 @@
+import sqlite3
+
+import pytest
+
+from conftest import load, quiet
+
+db_tasks = load("5_db_funkctions")
+dictionary_encoding = load("dictionary_encoding")
+table_counters = load("table_counters")
+deletes = load("13_bazy_delete")
+updates = load("11_update")
+db_select = load("6_get_data")
+db_read = load("7_read_data")
+
+
+@pytest.fixture
+def conn(db_path):
+    conn = sqlite3.connect(db_path)
+    with quiet():
+        db_tasks.create_tables(conn, encode_status=True)
+        project_id = db_tasks.add_project(conn, ("Projekt", "2024-01-01", "2024-12-31"))
+        for i, status in enumerate(["Nowe", "W trakcie", "Ukończone", "Ukończone", "W trakcie"]):
+            db_tasks.add_task(conn, (project_id, f"Zadanie {i}", "", status, "2024-01-01", "2024-02-01"))
+    yield conn
+    conn.close()
+
+
+def _statuses(conn):
+    return [task[4] for task in db_tasks.get_all_tasks(conn)]
+
+
+def test_column_stores_codes(conn):
+    assert dictionary_encoding.is_encoded(conn, "tasks", "status")
+    assert {row[0] for row in conn.execute("SELECT typeof(status) FROM tasks")} == {"integer"}
+    assert _statuses(conn) == ["Nowe", "W trakcie", "Ukończone", "Ukończone", "W trakcie"]
+
+
+def test_delete_many_encodes_multi_column_keys(conn):
+    with quiet():
+        summary = deletes.delete_many(conn, "tasks", [(1, "Ukończone"), (1, "Nowe")],
+                                      columns=("project_id", "status"))
+    assert summary["deleted"] == 3
+    assert _statuses(conn) == ["W trakcie", "W trakcie"]
+
+
+def test_delete_where_encodes_filters(conn):
+    with quiet():
+        deletes.delete_where(conn, "tasks", status="W trakcie")
+    assert _statuses(conn) == ["Nowe", "Ukończone", "Ukończone"]
+
+
+@pytest.mark.parametrize("status", ["1", "2", " 3.0 ", "1e2"])
+def test_numeric_looking_status_round_trips(conn, status):
+    with quiet():
+        task_id = db_tasks.add_task(conn, (1, "Liczbowy", "", status, "2024-01-01", "2024-02-01"))
+    assert db_tasks.get_all_tasks(conn)[-1][4] == status
+    with quiet():
+        db_tasks.update_task_status(conn, 1, status)
+        updates.update(conn, "tasks", 2, status=status)
+    rows = {task[0]: task[4] for task in db_tasks.get_all_tasks(conn)}
+    assert rows[1] == rows[2] == rows[task_id] == status
+    # Filtr po nieznanym tekście liczbowym nie trafia w cudzy kod
+    assert dictionary_encoding.encode(conn, "tasks", "status", "999") is None
+
+
+def test_counters_follow_encoded_writes(conn):
+    with quiet():
+        db_tasks.update_task_status(conn, 1, "Zablokowane")
+        db_tasks.add_task(conn, (1, "Nowe zadanie", "", "7", "2024-01-01", "2024-02-01"))
+        db_tasks.delete_task(conn, 3)
+    expected = {}
+    for status in _statuses(conn):
+        expected[status] = expected.get(status, 0) + 1
+    assert table_counters.status_counts(conn) == expected
+
+
+@pytest.mark.parametrize("helper", [
+    lambda conn: list(db_select.iter_all_tasks(conn)),
+    db_select.select_all_tasks,
+    db_select.select_with_where,
+    db_select.select_with_limit,
+    lambda conn: db_select.select_tasks_by_project(conn, 1),
+    db_read.select_all_tasks,
+    lambda conn: db_read.select_tasks_by_project(conn, 1),
+    lambda conn: db_read.select_by_status(conn, "Ukończone"),
+])
+def test_task_helpers_return_status_names(conn, helper):
+    with quiet():
+        rows = helper(conn)
+    assert rows
+    assert {row[4] for row in rows} <= {"Nowe", "W trakcie", "Ukończone"}
@@ -0,0 +1,71 @@
+import sqlite3
+from datetime import date, datetime
+
+import pytest
+
+from conftest import load, quiet
+
+db_tasks = load("5_db_funkctions")
+connection_pool = load("connection_pool")
+epoch_dates = load("epoch_dates")
+updates = load("11_update")
+
+
+@pytest.fixture
+def epoch_db(db_path):
+    with quiet():
+        conn = db_tasks.create_connection(db_path)
+        db_tasks.create_tables(conn, epoch_dates=True)
+        project_id = db_tasks.add_project(conn, ("Projekt", "2024-01-01", "2024-06-30"))
+        db_tasks.add_task(conn, (project_id, "Zadanie", "", "Nowe", "2024-01-05", "2024-01-10 12:00:00"))
+    conn.close()
+    yield db_path
+    connection_pool.close_all_pools()
+
+
+@pytest.mark.parametrize("use_pool", [False, True])
+def test_create_connection_returns_dates(epoch_db, use_pool):
+    with quiet():
+        conn = db_tasks.create_connection(epoch_db, use_pool=use_pool)
+        tasks = db_tasks.get_all_tasks(conn)
+        projects = db_tasks.get_all_projects(conn)
+    conn.close()
+    assert tasks[0][5:] == (datetime(2024, 1, 5), datetime(2024, 1, 10, 12))
+    assert projects[0][2:] == (datetime(2024, 1, 1), datetime(2024, 6, 30))
+
+
+def test_tasks_between_uses_interval_index(epoch_db):
+    with quiet():
+        conn = db_tasks.create_connection(epoch_db)
+        assert [task[2] for task in db_tasks.get_tasks_between(conn, "2024-01-08", "2024-01-09")] == ["Zadanie"]
+        assert db_tasks.get_tasks_between(conn, "2024-02-01", "2024-02-28") == []
+    conn.close()
+
+
+def test_plain_connections_keep_default_date_storage(epoch_db, tmp_path):
+    with quiet():
+        db_tasks.create_connection(epoch_db).close()
+    conn = sqlite3.connect(tmp_path / "plain.db")
+    conn.execute("CREATE TABLE t (d TEXT)")
+    # Domyślny adapter sqlite3 (tekst ISO) - nie liczba sekund z epoch_dates
+    conn.execute("INSERT INTO t VALUES (?)", (datetime(2024, 1, 5, 12),))
+    assert conn.execute("SELECT d FROM t").fetchone() == ("2024-01-05 12:00:00",)
+    conn.close()
+
+
+@pytest.mark.parametrize("epoch", [False, True], ids=["text", "epoch"])
+def test_helpers_accept_datetime_parameters(db_path, epoch):
+    conn = epoch_dates.connect(db_path)
+    with quiet():
+        db_tasks.create_tables(conn, epoch_dates=epoch)
+        project_id = db_tasks.add_project(conn, ("Projekt", date(2024, 1, 1), datetime(2024, 6, 30)))
+        task_id = db_tasks.add_task(conn, (project_id, "Zadanie", "", "Nowe", date(2024, 1, 5),
+                                           datetime(2024, 1, 10, 12)))
+        updates.update(conn, "tasks", task_id, end_date=datetime(2024, 1, 11, 8))
+    raw = conn.execute("SELECT typeof(start_date), start_date, end_date FROM tasks").fetchone()
+    if epoch:
+        assert raw == ("integer", datetime(2024, 1, 5), datetime(2024, 1, 11, 8))
+    else:
+        assert raw == ("text", "2024-01-05", "2024-01-11 08:00:00")
+    assert [task[0] for task in db_tasks.get_tasks_between(conn, "2024-01-11", "2024-01-11 09:00:00")] == [task_id]
+    conn.close()
@@ -0,0 +1,72 @@
+import sqlite3
+
+import pytest
+
+from conftest import load, quiet
+
+db_tasks = load("5_db_funkctions")
+federated = load("federated")
+
+
+def _shard(path, tasks, encode_status=False):
+    """Plik z projects / tasks; tasks - lista (projekt, status, start, koniec)"""
+    conn = sqlite3.connect(path)
+    with quiet():
+        db_tasks.create_tables(conn, encode_status=encode_status)
+        projects = {}
+        for nazwa, status, start, end in tasks:
+            if nazwa not in projects:
+                projects[nazwa] = db_tasks.add_project(conn, (nazwa, "2024-01-01", "2024-12-31"))
+            db_tasks.add_task(conn, (projects[nazwa], "Zadanie", "", status, start, end))
+    conn.close()
+    return str(path)
+
+
+def test_merge_partials_combines_every_kind():
+    partials = [
+        [("A", 2, 10, 3, 7), ("B", 1, 5, 5, 5)],
+        [("A", 3, 1, 1, 9)],
+        [("B", 4, 20, None, 2), ("C", 1, 1, 1, 1)],
+    ]
+    merged = federated.merge_partials(partials, ("key", "count", "sum", "min", "max"))
+    assert merged == [("A", 5, 11, 1, 9), ("B", 5, 25, 5, 5), ("C", 1, 1, 1, 1)]
+
+
+def test_merge_partials_rejects_unknown_kind():
+    with pytest.raises(ValueError):
+        federated.merge_partials([[("A", 1)]], ("key", "avg"))
+
+
+def test_split_group_reaches_top_k_after_merge(tmp_path):
+    # Na żadnym pliku "Wspólny" nie jest pierwszy, po zsumowaniu - jest
+    files = [
+        _shard(tmp_path / "a.db", [("Wspólny", "Nowe", "2024-01-01", "2024-02-01")] * 3
+               + [("Tylko A", "Nowe", "2024-01-01", "2024-02-01")] * 4),
+        _shard(tmp_path / "b.db", [("Wspólny", "Nowe", "2024-01-01", "2024-02-01")] * 3
+               + [("Tylko B", "Nowe", "2024-01-01", "2024-02-01")] * 5),
+    ]
+    assert federated.tasks_per_project(files, limit=1, processes=1) == [("Wspólny", 6)]
+    assert federated.tasks_per_project(files, limit=3, processes=1) == \
+        [("Wspólny", 6), ("Tylko B", 5), ("Tylko A", 4)]
+
+
+def test_status_summary_merges_by_name_across_dictionaries(tmp_path):
+    # Ten sam status ma w każdym pliku inny kod słownika
+    files = [
+        _shard(tmp_path / "a.db", [("P", "Nowe", "2024-01-05", "2024-02-01"),
+                                   ("P", "Gotowe", "2024-01-01", "2024-03-01")], encode_status=True),
+        _shard(tmp_path / "b.db", [("P", "Gotowe", "2024-02-01", "2024-04-01"),
+                                   ("P", "Nowe", "2024-01-02", "2024-01-20"),
+                                   ("P", "Nowe", "2024-01-03", "2024-05-01")], encode_status=True),
+        _shard(tmp_path / "c.db", [("P", "Nowe", "2024-03-01", "2024-03-02")]),
+    ]
+    codes = []
+    for path in files[:2]:
+        conn = sqlite3.connect(path)
+        codes.append(dict(conn.execute("SELECT nazwa, id FROM task_statuses")))
+        conn.close()
+    assert codes[0]["Nowe"] != codes[1]["Nowe"]
+    assert federated.status_summary(files, processes=1) == [
+        ("Nowe", 4, "2024-01-02", "2024-05-01"),
+        ("Gotowe", 2, "2024-01-01", "2024-04-01"),
+    ]
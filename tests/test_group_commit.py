@@ -0,0 +1,56 @@
+import sqlite3
+import time
+
+import pytest
+
+from conftest import load
+
+group_commit = load("group_commit")
+
+
+@pytest.fixture
+def conns(db_path):
+    writer = sqlite3.connect(db_path)
+    writer.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, nazwa TEXT)")
+    writer.commit()
+    reader = sqlite3.connect(db_path)
+    yield writer, reader
+    writer.close()
+    reader.close()
+
+
+def _committed(reader):
+    return reader.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+
+
+def test_rows_are_committed_every_max_rows(conns):
+    conn, reader = conns
+    writer = group_commit.GroupCommitWriter(conn, max_rows=3, max_delay=None)
+    for i in range(7):
+        writer.insert("INSERT INTO items (nazwa) VALUES (?)", (f"x{i}",))
+    assert (_committed(reader), writer.flushes) == (6, 2)
+    writer.flush()
+    assert _committed(reader) == 7
+
+
+def test_max_delay_is_checked_on_the_next_commit(conns):
+    conn, reader = conns
+    writer = group_commit.GroupCommitWriter(conn, max_rows=100, max_delay=0.01)
+    writer.insert("INSERT INTO items (nazwa) VALUES ('a')", ())
+    time.sleep(0.02)
+    # Bez kolejnego commit() nic nie zatwierdza wiersza w tle
+    assert _committed(reader) == 0
+    writer.insert("INSERT INTO items (nazwa) VALUES ('b')", ())
+    assert _committed(reader) == 2
+
+
+def test_context_manager_commits_or_rolls_back(conns):
+    conn, reader = conns
+    with group_commit.GroupCommitWriter(conn) as writer:
+        writer.insert("INSERT INTO items (nazwa) VALUES ('a')", ())
+    assert _committed(reader) == 1
+    with pytest.raises(RuntimeError):
+        with group_commit.GroupCommitWriter(conn) as writer:
+            writer.insert("INSERT INTO items (nazwa) VALUES ('b')", ())
+            raise RuntimeError("przerwane")
+    assert _committed(reader) == 1
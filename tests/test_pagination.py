@@ -0,0 +1,81 @@
+import random
+
+import pytest
+
+from conftest import load, quiet
+
+db_tasks = load("5_db_funkctions")
+epoch_dates = load("epoch_dates")
+pagination = load("pagination")
+
+STATUSES = ("Nowe", "W trakcie", "Ukończone", "Oczekujące")
+
+
+@pytest.fixture(params=["text", "epoch", "encoded"])
+def conn(request, db_path):
+    conn = epoch_dates.connect(db_path)
+    with quiet():
+        db_tasks.create_tables(conn, epoch_dates=request.param == "epoch",
+                               encode_status=request.param == "encoded")
+    rng = random.Random(7)
+    conn.execute("INSERT INTO projects (nazwa, start_date, end_date) VALUES ('P', '2024-01-01', '2024-12-31')")
+    conn.executemany(
+        "INSERT INTO tasks (project_id, nazwa, opis, status, start_date, end_date) VALUES (1, ?, '', ?, ?, ?)",
+        [(f"Zadanie {i}", rng.choice(STATUSES), f"2024-0{rng.randint(1, 3)}-1{rng.randint(0, 9)}", "2024-12-31")
+         for i in range(57)])
+    conn.commit()
+    pagination.create_pagination_indexes(conn)
+    yield conn
+    conn.close()
+
+
+def _all_pages(conn, order_by, descending=False):
+    rows, token = pagination.page_tasks(conn, order_by=order_by, page_size=10, descending=descending)
+    pages = [rows]
+    while token is not None:
+        rows, token = pagination.page_tasks(conn, order_by=order_by, page_size=10, token=token,
+                                            descending=descending)
+        pages.append(rows)
+    return pages
+
+
+@pytest.mark.parametrize("order_by", ["id", "start_date", "status"])
+@pytest.mark.parametrize("descending", [False, True])
+def test_pages_cover_all_rows_in_order(conn, order_by, descending):
+    pages = _all_pages(conn, order_by, descending)
+    rows = [row for page in pages for row in page]
+    assert all(len(page) == 10 for page in pages[:-1])
+    assert len(rows) == len({row[0] for row in rows}) == 57
+
+    position = {"id": 0, "start_date": 5, "status": 4}[order_by]
+    keys = [(row[position], row[0]) for row in rows]
+    assert keys == sorted(keys, reverse=descending)
+
+
+def test_date_token_round_trip(conn):
+    rows, token = pagination.page_tasks(conn, order_by="start_date", page_size=5)
+    state = pagination.decode_token(token)
+    assert state["k"] == [rows[-1][5], rows[-1][0]]
+
+
+def test_token_from_other_ordering_is_rejected(conn):
+    _, token = pagination.page_tasks(conn, order_by="start_date", page_size=5)
+    with pytest.raises(ValueError):
+        pagination.page_tasks(conn, order_by="status", token=token)
+    with pytest.raises(ValueError):
+        pagination.page_tasks(conn, order_by="start_date", token="nie-token")
+
+
+@pytest.mark.parametrize("page_size", [0, -1])
+def test_page_size_must_be_positive(conn, page_size):
+    with pytest.raises(ValueError):
+        pagination.page_tasks(conn, page_size=page_size)
+    with pytest.raises(ValueError):
+        pagination.page_tasks(conn, order_by="status", page_size=page_size)
+    with pytest.raises(ValueError):
+        pagination.page_books(conn, page_size=page_size)
+
+
+def test_status_rows_are_decoded(conn):
+    rows = [row for page in _all_pages(conn, "status") for row in page]
+    assert {row[4] for row in rows} <= set(STATUSES)
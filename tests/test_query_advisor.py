@@ -0,0 +1,46 @@
+import sqlite3
+
+from conftest import load
+
+db_select = load("6_get_data")
+query_advisor = load("query_advisor")
+table_counters = load("table_counters")
+
+
+def _plain_db(path):
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+    CREATE TABLE projects (id INTEGER PRIMARY KEY, nazwa TEXT NOT NULL, start_date TEXT, end_date TEXT);
+    CREATE TABLE tasks (id INTEGER PRIMARY KEY, project_id INTEGER NOT NULL, nazwa TEXT NOT NULL,
+                        opis TEXT, status TEXT NOT NULL, start_date TEXT NOT NULL, end_date TEXT NOT NULL);
+    INSERT INTO projects VALUES (1, 'P', '2024-01-01', '2024-02-01');
+    INSERT INTO tasks VALUES (1, 1, 'T', '', 'Nowe', '2024-01-01', '2024-01-02');
+    """)
+    return conn
+
+
+def test_captured_sql_follows_the_helpers(db_path):
+    conn = _plain_db(db_path)
+    queries = query_advisor.capture_queries(conn)
+    assert "LEFT JOIN tasks" in queries["select_with_group_by"][1]
+    assert queries["select_tasks_by_project"][2] == (1,)
+    assert queries["select_all_books"][1] is None
+    # Z licznikami select_with_group_by nie czyta już tabeli tasks
+    table_counters.install_counters(conn)
+    queries = query_advisor.capture_queries(conn)
+    assert "project_task_counts" in queries["select_with_group_by"][1]
+    conn.close()
+
+
+def test_index_removing_a_scan_is_suggested_regardless_of_timing(db_path):
+    _plain_db(db_path).close()
+    # Nawet gdy pomiar pokazuje stratę, indeks usuwający SCAN z planu jest proponowany
+    reports = {report["query"]: report
+               for report in query_advisor.advise(db_path, min_gain=float("inf"))}
+    suggestions = [s["sql"] for s in reports["select_tasks_by_project"]["suggestions"]]
+    assert suggestions == ['CREATE INDEX IF NOT EXISTS "idx_tasks_project_id" ON "tasks" ("project_id")']
+    assert reports["select_tasks_by_project"]["suggestions"][0]["removes"] == ["SCAN tasks"]
+    # Baza na dysku nie jest zmieniana
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT COUNT(*) FROM sqlite_master WHERE type = 'index'").fetchone()[0] == 0
+    conn.close()
@@ -0,0 +1,44 @@
+import sqlite3
+
+from conftest import load, quiet
+
+db_select = load("6_get_data")
+pagination = load("pagination")
+query_tracing = load("query_tracing")
+
+
+def _callers(tracer):
+    return {item["caller"] for item in tracer.summary()}
+
+
+def test_helper_queries_are_credited_to_the_calling_function(db_path):
+    tracer = query_tracing.QueryTracer()
+    with quiet():
+        conn = db_select.create_connection(db_path, tracer=tracer)
+        db_select.create_tables(conn)
+        db_select.add_sample_data(conn)
+        tracer.reset()
+        db_select.select_with_group_by(conn)
+    conn.close()
+    assert _callers(tracer) == {"select_with_group_by"}
+
+
+def test_direct_helper_call_is_credited_to_the_caller(db_path):
+    tracer = query_tracing.QueryTracer()
+    with quiet():
+        conn = db_select.create_connection(db_path, tracer=tracer)
+        db_select.create_tables(conn)
+        db_select.add_sample_data(conn)
+    tracer.reset()
+    pagination.page_tasks(conn, page_size=2)
+    conn.close()
+    assert _callers(tracer) == {"test_direct_helper_call_is_credited_to_the_caller"}
+
+
+def test_slow_query_log_keeps_the_newest_entries():
+    tracer = query_tracing.QueryTracer(slow_threshold=0, max_slow_queries=3)
+    conn = tracer.attach(sqlite3.connect(":memory:"))
+    for n in range(10):
+        conn.execute(f"SELECT {n}").fetchall()
+    conn.close()
+    assert [entry["sql"] for entry in tracer.slow_queries] == ["SELECT 7", "SELECT 8", "SELECT 9"]
@@ -0,0 +1,68 @@
+import sqlite3
+import time
+
+import pytest
+
+from conftest import load, quiet
+
+sensor_readings = load("sensor_readings")
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(":memory:")
+    with quiet():
+        sensor_readings.create_readings_table(conn)
+    yield conn
+    conn.close()
+
+
+def _all(conn):
+    return conn.execute("SELECT sensor_id, czas, kanal, wartosc FROM readings").fetchall()
+
+
+def test_duplicate_key_keeps_last_value(conn):
+    with sensor_readings.ReadingsWriter(conn) as writer:
+        writer.add_many([(1, 1000, 0, 20.0), (1, 1000, 0, 21.0), (1, 2000, 0, 22.0)])
+    writer = sensor_readings.ReadingsWriter(conn)
+    writer.add(1, 1000, 25.0, kanal="temperatura")
+    writer.flush()
+    assert _all(conn) == [(1, 1000, 0, 25.0), (1, 2000, 0, 22.0)]
+
+
+def test_late_rows_are_split_by_high_water(conn):
+    conn.execute("INSERT INTO readings VALUES (1, 5000, 0, 1.0)")
+    conn.commit()
+    batches = []
+    writer = sensor_readings.ReadingsWriter(
+        conn, on_flush=[lambda conn, fresh, late: batches.append((fresh, late))])
+    writer.add_many([(1, 6000, 0, 2.0), (1, 4000, 0, 3.0), (2, 100, 0, 4.0)])
+    writer.flush()
+    # Najnowszy zapisany czas czujnika 1 to teraz 6000 - 5500 jest spóźniony
+    writer.add_many([(1, 5500, 0, 5.0), (1, 7000, 0, 6.0), (2, 100, 0, 7.0)])
+    writer.flush()
+    assert batches == [
+        ([(1, 6000, 0, 2.0), (2, 100, 0, 4.0)], [(1, 4000, 0, 3.0)]),
+        ([(1, 7000, 0, 6.0)], [(1, 5500, 0, 5.0), (2, 100, 0, 7.0)]),
+    ]
+    assert writer.stats()["late_rows"] == 3
+
+
+def test_failed_flush_keeps_rows_and_delay(conn):
+    failures = [sqlite3.OperationalError("database is locked")]
+
+    def fail_once(conn, fresh, late):
+        if failures:
+            raise failures.pop()
+
+    writer = sensor_readings.ReadingsWriter(conn, max_delay=0.05, on_flush=[fail_once])
+    writer.add(1, 1000, 20.0)
+    with pytest.raises(sqlite3.OperationalError):
+        writer.flush()
+    assert _all(conn) == []
+    assert writer.stats()["buffered"] == 1
+    time.sleep(0.06)
+    # Odczyt czeka w buforze od pierwszej próby - następne add() wymusza zapis
+    writer.add(1, 2000, 21.0)
+    assert writer.stats()["buffered"] == 0
+    assert [row[1] for row in _all(conn)] == [1000, 2000]
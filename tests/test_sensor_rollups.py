@@ -0,0 +1,84 @@
+import random
+import sqlite3
+
+import pytest
+
+from conftest import load, quiet
+
+sensor_readings = load("sensor_readings")
+sensor_rollups = load("sensor_rollups")
+
+START = 1_700_006_400_000 - 1_700_006_400_000 % sensor_rollups.DAY
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(":memory:")
+    with quiet():
+        sensor_readings.create_readings_table(conn)
+        sensor_rollups.create_rollup_tables(conn)
+    yield conn
+    conn.close()
+
+
+def _write(conn, max_rows=500):
+    # 3 czujniki x 2 kanały przez 2 doby co 5 min, część odczytów spóźniona
+    # albo powtórzona z inną wartością (INSERT OR REPLACE)
+    rng = random.Random(11)
+    readings = []
+    for step in range(2 * sensor_rollups.DAY // (5 * sensor_rollups.MINUTE)):
+        for sensor_id in (1, 2, 3):
+            for kanal in (0, 1):
+                czas = START + step * 5 * sensor_rollups.MINUTE
+                if rng.random() < 0.1:
+                    czas -= rng.randint(0, 30) * 5 * sensor_rollups.MINUTE
+                readings.append((sensor_id, max(czas, START), kanal, round(rng.uniform(-5, 30), 2)))
+    with sensor_rollups.rollup_writer(conn, max_rows=max_rows, max_delay=None) as writer:
+        writer.add_many(readings)
+    assert writer.late_rows > 0
+
+
+def _raw(conn, size):
+    return conn.execute(f"""
+        SELECT sensor_id, kanal, czas - czas % {size}, COUNT(*), SUM(wartosc), MIN(wartosc), MAX(wartosc)
+        FROM readings GROUP BY 1, 2, 3 ORDER BY 1, 2, 3
+        """).fetchall()
+
+
+def _rounded(rows):
+    return [row[:4] + (round(row[4], 6),) + row[5:] for row in rows]
+
+
+@pytest.mark.parametrize("table, size", sensor_rollups.LEVELS)
+def test_rollups_match_raw_aggregates(conn, table, size):
+    _write(conn)
+    stored = conn.execute(f"SELECT * FROM {table} ORDER BY 1, 2, 3").fetchall()
+    assert _rounded(stored) == _rounded(_raw(conn, size))
+
+
+def test_rebuild_gives_the_same_rollups(conn):
+    _write(conn)
+    before = [_rounded(conn.execute(f"SELECT * FROM {table} ORDER BY 1, 2, 3").fetchall())
+              for table, _ in sensor_rollups.LEVELS]
+    sensor_rollups.rebuild_rollups(conn)
+    after = [_rounded(conn.execute(f"SELECT * FROM {table} ORDER BY 1, 2, 3").fetchall())
+             for table, _ in sensor_rollups.LEVELS]
+    assert before == after
+
+
+@pytest.mark.parametrize("resolution, end, expected_table", [
+    (sensor_rollups.DAY, START + 2 * sensor_rollups.DAY, "readings_1d"),
+    (sensor_rollups.HOUR, START + 6 * sensor_rollups.HOUR, "readings_1h"),
+    (15 * sensor_rollups.MINUTE, START + sensor_rollups.HOUR, "readings_1m"),
+    (sensor_rollups.HOUR, START + 6 * sensor_rollups.HOUR + 30000, "readings"),
+])
+def test_query_rollup_matches_raw_readings(conn, resolution, end, expected_table):
+    _write(conn)
+    table, rows = sensor_rollups.query_rollup(conn, 2, START, end, resolution, kanal=1)
+    assert table == expected_table
+    raw = conn.execute("""
+        SELECT ?1 + (czas - ?1) / ?3 * ?3 AS przedzial, COUNT(*), MIN(wartosc), MAX(wartosc), AVG(wartosc)
+        FROM readings WHERE sensor_id = 2 AND kanal = 1 AND czas >= ?1 AND czas < ?2
+        GROUP BY przedzial ORDER BY przedzial
+        """, (START, end, resolution)).fetchall()
+    assert [row[:4] + (round(row[4], 6),) for row in rows] == [row[:4] + (round(row[4], 6),) for row in raw]
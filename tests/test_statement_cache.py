@@ -0,0 +1,53 @@
+import gc
+import sqlite3
+import weakref
+
+import pytest
+
+from conftest import load, quiet
+
+statement_cache = load("statement_cache")
+updates = load("11_update")
+
+
+class WeakConnection(sqlite3.Connection):
+    """Podklasa - w przeciwieństwie do sqlite3.Connection obsługuje słabe referencje"""
+
+
+@pytest.fixture(params=[sqlite3.Connection, WeakConnection], ids=["plain", "weak"])
+def conn(request):
+    conn = sqlite3.connect(":memory:", factory=request.param)
+    conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, nazwa TEXT, ilosc INTEGER)")
+    conn.executemany("INSERT INTO items VALUES (?, ?, ?)", [(1, "a", 1), (2, "b", 2)])
+    conn.commit()
+    yield conn
+    conn.close()
+
+
+def test_columns_are_cached_until_invalidated(conn):
+    assert statement_cache.table_columns(conn, "items") == {"id", "nazwa", "ilosc"}
+    conn.execute("ALTER TABLE items ADD COLUMN opis TEXT")
+    assert "opis" not in statement_cache.table_columns(conn, "items")
+    statement_cache.invalidate_schema_cache(conn)
+    assert "opis" in statement_cache.table_columns(conn, "items")
+
+
+def test_cache_does_not_keep_connection_alive():
+    conn = sqlite3.connect(":memory:", factory=WeakConnection)
+    conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY)")
+    statement_cache.table_columns(conn, "items")
+    alive = weakref.ref(conn)
+    conn.close()
+    del conn
+    gc.collect()
+    assert alive() is None
+
+
+def test_update_many_rejects_row_without_id(conn):
+    with quiet():
+        changed = updates.update_many(conn, "items", [{"id": 1, "ilosc": 10}, {"ilosc": 20}])
+    assert changed == 0
+    assert not conn.in_transaction
+    assert conn.execute("SELECT ilosc FROM items ORDER BY id").fetchall() == [(1,), (2,)]
+    with pytest.raises(ValueError):
+        statement_cache.update_many(conn, "items", [{"nazwa": "c"}])
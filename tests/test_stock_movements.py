@@ -0,0 +1,60 @@
+import sqlite3
+
+import pytest
+
+from conftest import load, quiet
+
+stock_movements = load("stock_movements")
+
+
+@pytest.fixture
+def conn(db_path):
+    conn = sqlite3.connect(db_path)
+    conn.execute("""CREATE TABLE warehouses (id INTEGER PRIMARY KEY, sensor_id INTEGER NOT NULL,
+        nazwa_magazynu TEXT NOT NULL, alejka INTEGER NOT NULL, regał INTEGER NOT NULL,
+        polka INTEGER NOT NULL, kuweta INTEGER NOT NULL, ilosc_sztuk INTEGER NOT NULL)""")
+    conn.executemany("INSERT INTO warehouses VALUES (NULL, 1, 'Magazyn A', ?, 1, 1, 1, 10)",
+                     [(i,) for i in range(1, 4)])
+    conn.commit()
+    with quiet():
+        stock_movements.create_movements_table(conn)
+    yield conn
+    conn.close()
+
+
+def _quantities(conn):
+    return [row[0] for row in conn.execute("SELECT ilosc_sztuk FROM warehouses ORDER BY id")]
+
+
+def test_open_transaction_is_refused(conn):
+    conn.execute("UPDATE warehouses SET ilosc_sztuk = 99 WHERE id = 1")
+    with pytest.raises(sqlite3.ProgrammingError):
+        stock_movements.apply_movements(conn, [(2, -1)])
+    conn.rollback()
+    assert _quantities(conn) == [10, 10, 10]
+
+
+def test_movements_never_go_below_zero(conn):
+    results = stock_movements.apply_movements(conn, [(1, -4), (1, -7), (1, -6), (1, +3)])
+    assert [(r.ok, r.ilosc_po) for r in results] == [(True, 6), (False, 6), (True, 0), (True, 3)]
+    assert "niewystarczający stan" in results[1].blad
+    assert _quantities(conn) == [3, 10, 10]
+
+
+def test_one_result_per_movement_in_order(conn):
+    results = stock_movements.apply_movements(
+        conn, [(2, +5, "przyjęcie"), (99, -1), (3, 0), (3, "5"), (2, -15)], batch_size=2)
+    assert [(r.warehouse_id, r.ok, r.ilosc_po) for r in results] == \
+        [(2, True, 15), (99, False, None), (3, False, None), (3, False, None), (2, True, 0)]
+    assert results[1].blad == "brak lokalizacji"
+    assert _quantities(conn) == [10, 0, 10]
+    # Tylko przyjęte ruchy trafiają do księgi, od najnowszego
+    assert [row[1:3] for row in stock_movements.movement_history(conn, 2)] == [(-15, 0), (5, 15)]
+    assert stock_movements.movement_history(conn, 2)[1][4] == "przyjęcie"
+
+
+def test_ledger_is_append_only(conn):
+    stock_movements.move_stock(conn, 1, -1)
+    with pytest.raises(sqlite3.IntegrityError):
+        conn.execute("DELETE FROM stock_movements")
+    conn.rollback()
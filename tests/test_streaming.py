@@ -0,0 +1,38 @@
+import sqlite3
+
+import pytest
+
+from conftest import load
+
+streaming = load("streaming")
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE numbers (n INTEGER PRIMARY KEY)")
+    conn.executemany("INSERT INTO numbers VALUES (?)", [(n,) for n in range(1, 2501)])
+    conn.commit()
+    yield conn
+    conn.close()
+
+
+@pytest.mark.parametrize("batch_size", [1, 7, 1000, 5000])
+def test_iter_rows_returns_every_row_in_order(conn, batch_size):
+    rows = streaming.iter_rows(conn, "SELECT n FROM numbers WHERE n > ? ORDER BY n", (100,),
+                               batch_size=batch_size)
+    assert [n for (n,) in rows] == list(range(101, 2501))
+
+
+def test_iter_rows_empty_result(conn):
+    assert list(streaming.iter_rows(conn, "SELECT n FROM numbers WHERE n < 0")) == []
+
+
+def test_abandoned_iterator_closes_cursor(conn):
+    rows = streaming.iter_rows(conn, "SELECT n FROM numbers ORDER BY n", batch_size=10)
+    for (n,) in rows:
+        if n == 5:
+            break
+    rows.close()
+    # Otwarte zapytanie blokowałoby usunięcie tabeli ("database table is locked")
+    conn.execute("DROP TABLE numbers")
@@ -0,0 +1,74 @@
+import sqlite3
+
+import pytest
+
+from conftest import load, quiet
+
+db_tasks = load("5_db_funkctions")
+table_counters = load("table_counters")
+bulk_delete = load("bulk_delete")
+deletes = load("13_bazy_delete")
+updates = load("11_update")
+
+
+@pytest.fixture(params=[False, True], ids=["text", "encoded"])
+def conn(request, db_path):
+    conn = sqlite3.connect(db_path)
+    with quiet():
+        db_tasks.create_tables(conn, encode_status=request.param)
+        for name in ("A", "B", "C"):
+            project_id = db_tasks.add_project(conn, (name, "2024-01-01", "2024-12-31"))
+            for i, status in enumerate(["Nowe", "W trakcie", "Ukończone", "Nowe"]):
+                db_tasks.add_task(conn, (project_id, f"{name}{i}", "", status, "2024-01-01", "2024-02-01"))
+    assert table_counters.has_counters(conn, "tasks")
+    yield conn
+    conn.close()
+
+
+def _check(conn):
+    """Liczniki zgadzają się z COUNT(*) na surowych tabelach"""
+    for table in ("projects", "tasks"):
+        assert table_counters.count_rows(conn, table) == \
+            conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    raw = conn.execute("""
+        SELECT projects.nazwa, COUNT(tasks.id) FROM projects
+        LEFT JOIN tasks ON projects.id = tasks.project_id GROUP BY projects.nazwa
+        """).fetchall()
+    assert sorted(table_counters.tasks_per_project(conn)) == sorted(raw)
+    tasks = db_tasks.get_all_tasks(conn)
+    for project_id in (None, 1, 2, 3):
+        expected = {}
+        for task in tasks:
+            if project_id in (None, task[1]):
+                expected[task[4]] = expected.get(task[4], 0) + 1
+        assert table_counters.status_counts(conn, project_id) == expected
+
+
+def test_counters_after_updates(conn):
+    with quiet():
+        db_tasks.update_task_status(conn, 1, "Ukończone")
+        updates.update(conn, "tasks", 2, project_id=3)
+        updates.update_many(conn, "tasks", [{"id": 3, "status": "Zablokowane"},
+                                            {"id": 4, "project_id": 2, "status": "W trakcie"}])
+    _check(conn)
+
+
+def test_counters_after_deletes(conn):
+    with quiet():
+        db_tasks.delete_task(conn, 1)
+        deletes.delete_where(conn, "tasks", status="W trakcie")
+        bulk_delete.delete_many(conn, "tasks", [(2, "Nowe"), (3, "Ukończone")],
+                                columns=("project_id", "status"))
+        db_tasks.delete_project(conn, 3)
+    _check(conn)
+
+
+def test_counters_after_truncate(conn):
+    with quiet():
+        bulk_delete.truncate_table(conn, "tasks", vacuum="none")
+    _check(conn)
+    assert table_counters.has_counters(conn, "tasks")
+    with quiet():
+        db_tasks.add_task(conn, (1, "Po czyszczeniu", "", "Nowe", "2024-01-01", "2024-02-01"))
+    _check(conn)
+    assert table_counters.count_rows(conn, "tasks") == 1
@@ -0,0 +1,62 @@
+import sqlite3
+
+import pytest
+
+from conftest import load, quiet
+
+sensors = load("00_Bazy_piach")
+schema_indexes = load("schema_indexes")
+warehouse_locations = load("warehouse_locations")
+
+
+@pytest.fixture
+def conn(db_path):
+    conn = sqlite3.connect(db_path)
+    with quiet():
+        sensors.create_sensors_table(conn)
+        sensors.create_warehouses_table(conn)
+        sensors.add_sensor(conn, "DHT22", "Temperatura i Wilgotność", 3)
+        for alejka in (1, 2, 3):
+            sensors.add_warehouse(conn, 1, "Magazyn A", alejka, 1, 1, 1, 100)
+    yield conn
+    warehouse_locations.invalidate(conn)
+    conn.close()
+
+
+def _quantities(conn):
+    return [location.ilosc_sztuk for location in sensors.find_sensor_locations(conn, 1)]
+
+
+def test_hooks_keep_index_in_sync(conn):
+    assert _quantities(conn) == [100, 100, 100]
+    index = warehouse_locations.get_index(conn)
+    with quiet():
+        sensors.update_warehouse_quantity(conn, 2, 40)
+        sensors.add_warehouse(conn, 1, "Magazyn A", 4, 1, 1, 1, 5)
+    assert _quantities(conn) == [100, 40, 100, 5]
+    assert warehouse_locations.get_index(conn) is index
+
+
+def test_unchanged_database_costs_one_query(conn):
+    warehouse_locations.get_index(conn)
+    statements = []
+    conn.set_trace_callback(statements.append)
+    warehouse_locations.get_index(conn)
+    conn.set_trace_callback(None)
+    assert statements == ["PRAGMA data_version"]
+
+
+def test_changes_from_other_connection(conn, db_path):
+    assert _quantities(conn) == [100, 100, 100]
+    other = sqlite3.connect(db_path)
+    other.execute("UPDATE warehouses SET ilosc_sztuk = 7 WHERE id = 3")
+    other.execute("DELETE FROM warehouses WHERE id = 1")
+    other.commit()
+    other.close()
+    assert _quantities(conn) == [100, 7]
+
+
+def test_quantity_is_in_one_covering_index():
+    indexes = [name for name, (table, columns) in schema_indexes.INDEXES.items()
+               if table == "warehouses" and "ilosc_sztuk" in columns]
+    assert indexes == ["idx_warehouses_location"]
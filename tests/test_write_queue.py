@@ -0,0 +1,88 @@
+import sqlite3
+import threading
+
+import pytest
+
+from conftest import load, quiet
+
+db_tasks = load("5_db_funkctions")
+write_queue = load("write_queue")
+
+
+@pytest.fixture
+def service(db_path):
+    conn = sqlite3.connect(db_path)
+    with quiet():
+        db_tasks.create_tables(conn)
+    conn.close()
+    service = write_queue.DatabaseService(db_path, readers=2)
+    yield service
+    service.close()
+
+
+def _count(path, table="projects"):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_failed_call_is_rolled_back(service, db_path):
+    def insert_then_fail(conn):
+        conn.execute("INSERT INTO projects (nazwa, start_date, end_date) VALUES ('boom', '2024-01-01', '2024-01-02')")
+        raise RuntimeError("boom")
+
+    future = service.submit_write(insert_then_fail)
+    with pytest.raises(RuntimeError, match="boom"):
+        future.result()
+    assert _count(db_path) == 0
+
+
+def test_failed_call_does_not_affect_rest_of_batch(service, db_path):
+    started, gate = threading.Event(), threading.Event()
+    # Wątek zapisujący czeka, a kolejne wywołania zbierają się w jedną paczkę
+    blocker = service.submit_write(lambda conn: (started.set(), gate.wait()))
+    started.wait()
+
+    def insert_then_fail(conn):
+        conn.execute("INSERT INTO projects (nazwa, start_date, end_date) VALUES ('boom', '2024-01-01', '2024-01-02')")
+        raise RuntimeError("boom")
+
+    with quiet():
+        before = service.add_project(("Przed", "2024-01-01", "2024-12-31"))
+        failing = service.submit_write(insert_then_fail)
+        after = service.add_project(("Po", "2024-01-01", "2024-12-31"))
+        gate.set()
+        blocker.result()
+        assert before.result() is not None
+        assert after.result() is not None
+    with pytest.raises(RuntimeError):
+        failing.result()
+
+    names = [row[1] for row in service.get_all_projects().result()]
+    assert names == ["Przed", "Po"]
+
+
+def test_writes_and_reads(service):
+    with quiet():
+        project_id = service.add_project(("Projekt", "2024-01-01", "2024-12-31")).result()
+        futures = [service.add_task((project_id, f"Zadanie {i}", "", "Nowe", "2024-01-01", "2024-02-01"))
+                   for i in range(50)]
+        task_ids = [future.result() for future in futures]
+        assert service.update_task_status(task_ids[0], "Ukończone").result() is True
+        tasks = service.get_tasks_by_project(project_id).result()
+    assert len(tasks) == 50
+    assert tasks[0][4] == "Ukończone"
+
+
+def test_full_queue_raises(db_path):
+    sqlite3.connect(db_path).close()
+    with write_queue.DatabaseService(db_path, readers=1, max_queue=1, put_timeout=0.05) as service:
+        started, gate = threading.Event(), threading.Event()
+        service.submit_write(lambda conn: (started.set(), gate.wait()))
+        started.wait()
+        service.submit_write(lambda conn: None)
+        with pytest.raises(write_queue.WriteQueueFullError):
+            service.submit_write(lambda conn: None)
+        gate.set()
@@ -0,0 +1,285 @@
+# ============================================
+# Indeks lokalizacji w magazynach
+# ============================================
+# Lokalizacja w tabeli warehouses to hierarchia:
+#   magazyn → alejka → regał → półka → kuweta
+# W bazie obsługuje ją indeks idx_warehouses_location (schema_indexes.py)
+# na tych pięciu kolumnach + sensor_id i ilosc_sztuk - indeks pokrywający:
+# lista z get_sensors_in_warehouses() czyta tabelę warehouses wyłącznie
+# z indeksu, już w kolejności ORDER BY (bez USE TEMP B-TREE).
+#
+# LocationIndex to ta sama hierarchia w pamięci:
+#   - locations: lista wpisów posortowana jak indeks → zakresy alejek
+#     i regałów przez bisect, bez zapytań do bazy
+#   - tree: zagnieżdżone słowniki magazyn → alejka → regał → półka → kuweta
+#   - by_sensor: gdzie leży czujnik X
+#
+# add_warehouse() i update_warehouse_quantity() w 00_Bazy_piach.py
+# aktualizują załadowany indeks, a usuwanie z warehouses go unieważnia
+# (zostanie wczytany ponownie przy następnym użyciu). Zmiany zatwierdzone
+# przez inne połączenie (także z innego procesu) wykrywa get_index() -
+# przed odczytem sprawdza PRAGMA data_version.
+
+import bisect
+import os
+import threading
+from collections import namedtuple
+from sqlite3 import ProgrammingError
+
+from streaming import iter_rows
+
+
+# Kolejność pól = kolejność kolumn idx_warehouses_location (na końcu rowid), więc
+# lista wpisów posortowana w Pythonie ma tę samą kolejność co indeks w bazie
+Location = namedtuple("Location", "nazwa_magazynu alejka regał polka kuweta sensor_id ilosc_sztuk warehouse_id")
+
+# SQLite czyta idx_warehouses_location po kolei - bez sortowania
+_LOAD_SQL = """
+SELECT nazwa_magazynu, alejka, regał, polka, kuweta, sensor_id, ilosc_sztuk, id
+FROM warehouses
+ORDER BY nazwa_magazynu, alejka, regał, polka, kuweta
+"""
+
+
+class LocationIndex:
+    """
+    Hierarchia lokalizacji w pamięci - odczyt bez dotykania SQLite
+
+    Wszystkie metody są bezpieczne dla wielu wątków (jedna blokada).
+    """
+
+    def __init__(self, locations=()):
+        self._lock = threading.Lock()
+        self.locations = []
+        self.tree = {}
+        self.by_sensor = {}
+        self._by_id = {}
+        for location in locations:
+            self._insert(Location(*location), presorted=True)
+        # Dane są już prawie posortowane - sort() tylko porządkuje remisy (O(n) w praktyce)
+        self.locations.sort()
+
+    @classmethod
+    def from_db(cls, conn):
+        """Wczytaj indeks jednym przejściem po idx_warehouses_location"""
+        return cls(iter_rows(conn, _LOAD_SQL, batch_size=10000))
+
+    # -------- zmiany --------
+
+    def _insert(self, location, presorted=False):
+        if presorted:
+            self.locations.append(location)
+        else:
+            bisect.insort(self.locations, location)
+        shelf = self.tree.setdefault(location.nazwa_magazynu, {}).setdefault(location.alejka, {}) \
+            .setdefault(location.regał, {}).setdefault(location.polka, {})
+        shelf.setdefault(location.kuweta, []).append(location)
+        self.by_sensor.setdefault(location.sensor_id, []).append(location)
+        self._by_id[location.warehouse_id] = location
+
+    def _remove(self, location):
+        position = bisect.bisect_left(self.locations, location)
+        del self.locations[position]
+        path = (location.nazwa_magazynu, location.alejka, location.regał, location.polka)
+        nodes = [self.tree]
+        for key in path:
+            nodes.append(nodes[-1][key])
+        nodes[-1][location.kuweta].remove(location)
+        # Puste gałęzie usuwamy od liścia w górę
+        keys = list(path) + [location.kuweta]
+        for node, key in zip(reversed(nodes), reversed(keys)):
+            if node[key]:
+                break
+            del node[key]
+        self.by_sensor[location.sensor_id].remove(location)
+        if not self.by_sensor[location.sensor_id]:
+            del self.by_sensor[location.sensor_id]
+        del self._by_id[location.warehouse_id]
+
+    def add(self, warehouse_id, sensor_id, nazwa_magazynu, alejka, regał, polka, kuweta, ilosc_sztuk):
+        """Nowy wpis (argumenty jak w add_warehouse)"""
+        with self._lock:
+            self._insert(Location(nazwa_magazynu, alejka, regał, polka, kuweta,
+                                  sensor_id, ilosc_sztuk, warehouse_id))
+
+    def set_quantity(self, warehouse_id, ilosc_sztuk):
+        """
+        Zmień ilość sztuk
+        :return: False, gdy wpisu nie ma w indeksie
+        """
+        with self._lock:
+            location = self._by_id.get(warehouse_id)
+            if location is None:
+                return False
+            self._remove(location)
+            self._insert(location._replace(ilosc_sztuk=ilosc_sztuk))
+            return True
+
+    def remove(self, warehouse_id):
+        with self._lock:
+            location = self._by_id.get(warehouse_id)
+            if location is not None:
+                self._remove(location)
+
+    # -------- odczyt --------
+
+    def _range(self, low, high):
+        # low/high to przedrostki krotek Location - wszystko, co zaczyna się od low... do high włącznie
+        start = bisect.bisect_left(self.locations, low)
+        end = bisect.bisect_left(self.locations, high)
+        return self.locations[start:end]
+
+    def listing(self):
+        """Wszystkie wpisy w kolejności magazyn, alejka, regał, półka, kuweta"""
+        with self._lock:
+            return list(self.locations)
+
+    def in_aisles(self, nazwa_magazynu, alejka_od, alejka_do=None):
+        """Wpisy z alejek alejka_od..alejka_do (włącznie) jednego magazynu"""
+        alejka_do = alejka_od if alejka_do is None else alejka_do
+        with self._lock:
+            return self._range((nazwa_magazynu, alejka_od), (nazwa_magazynu, alejka_do + 1))
+
+    def in_racks(self, nazwa_magazynu, alejka, regal_od, regal_do=None):
+        """Wpisy z regałów regal_od..regal_do (włącznie) jednej alejki"""
+        regal_do = regal_od if regal_do is None else regal_do
+        with self._lock:
+            return self._range((nazwa_magazynu, alejka, regal_od), (nazwa_magazynu, alejka, regal_do + 1))
+
+    def at(self, nazwa_magazynu, alejka, regał, polka, kuweta):
+        """Wpisy w jednej kuwecie"""
+        with self._lock:
+            try:
+                return list(self.tree[nazwa_magazynu][alejka][regał][polka][kuweta])
+            except KeyError:
+                return []
+
+    def children(self, *path):
+        """
+        Posortowane klucze poziomu pod ścieżką:
+        children() → magazyny, children("Magazyn A") → alejki, children("Magazyn A", 1) → regały...
+        """
+        with self._lock:
+            node = self.tree
+            for key in path:
+                node = node.get(key)
+                if node is None:
+                    return []
+            return sorted(node) if isinstance(node, dict) else []
+
+    def where_is(self, sensor_id):
+        """Wszystkie lokalizacje czujnika, posortowane"""
+        with self._lock:
+            return sorted(self.by_sensor.get(sensor_id, []))
+
+    def total_quantity(self, sensor_id):
+        with self._lock:
+            return sum(location.ilosc_sztuk for location in self.by_sensor.get(sensor_id, []))
+
+
+# ============================================
+# Indeks dla bazy - ładowany raz na proces
+# ============================================
+
+# pełna ścieżka pliku bazy (baza w pamięci: samo połączenie) → LocationIndex
+_indexes = {}
+# połączenie → [klucz bazy, PRAGMA data_version przy ostatnim użyciu indeksu]
+# data_version zmienia się tylko po commicie INNEGO połączenia - własne zapisy
+# połączenia aktualizują indeks przez haki. Trzymamy same połączenia (nie id():
+# nowe połączenie pod tym samym adresem zaczyna od tej samej data_version),
+# a zamknięte usuwamy przy dopisywaniu kolejnego.
+_connections = {}
+_indexes_lock = threading.Lock()
+
+
+def _key(conn):
+    for _, name, path in conn.execute("PRAGMA database_list").fetchall():
+        if name == "main":
+            return os.path.abspath(path) if path else conn
+    return conn
+
+
+def _is_open(conn):
+    try:
+        conn.total_changes
+        return True
+    except ProgrammingError:
+        return False
+
+
+def get_index(conn):
+    """
+    Indeks lokalizacji dla bazy połączenia - przy pierwszym użyciu wczytany z warehouses
+    Przed odczytem jedno PRAGMA data_version: gdy inne połączenie zatwierdziło zmiany
+    od ostatniego użycia indeksu przez to połączenie, indeks jest wczytywany od nowa.
+    """
+    data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+    with _indexes_lock:
+        seen = _connections.get(conn)
+        if seen is not None:
+            key, version = seen
+            index = _indexes.get(key)
+            if index is not None and version == data_version:
+                return index
+    if seen is None:
+        key = _key(conn)
+        with _indexes_lock:
+            for other in [other for other in _connections if not _is_open(other)]:
+                del _connections[other]
+            # Pierwsze użycie przez to połączenie - załadowany indeks sprawdzały poprzednie
+            index = _indexes.get(key)
+            _connections[conn] = [key, data_version]
+            if index is not None:
+                return index
+
+    index = LocationIndex.from_db(conn)
+    with _indexes_lock:
+        _indexes[key] = index
+        _connections[conn] = [key, data_version]
+    return index
+
+
+def _loaded(conn):
+    with _indexes_lock:
+        if not _indexes:
+            return None
+        seen = _connections.get(conn)
+    key = seen[0] if seen is not None else _key(conn)
+    with _indexes_lock:
+        return _indexes.get(key)
+
+
+def invalidate(conn):
+    """Zapomnij indeks bazy - np. po usunięciu wierszy z warehouses"""
+    key = _key(conn)
+    with _indexes_lock:
+        _indexes.pop(key, None)
+        _connections.pop(conn, None)
+
+
+def on_insert(conn, warehouse_id, sensor_id, nazwa_magazynu, alejka, regał, polka, kuweta, ilosc_sztuk):
+    """Wywołaj po dodaniu wpisu do warehouses (bez załadowanego indeksu nic nie robi)"""
+    index = _loaded(conn)
+    if index is not None:
+        index.add(warehouse_id, sensor_id, nazwa_magazynu, alejka, regał, polka, kuweta, ilosc_sztuk)
+
+
+def on_quantity(conn, warehouse_id, ilosc_sztuk):
+    """Wywołaj po zmianie ilości sztuk"""
+    index = _loaded(conn)
+    if index is not None:
+        index.set_quantity(warehouse_id, ilosc_sztuk)
+
+
+if __name__ == "__main__":
+    import sqlite3
+
+    conn = sqlite3.connect("sensors.db")
+    index = get_index(conn)
+    print(f"✓ Wczytano {len(index.listing())} lokalizacji")
+    for nazwa in index.children():
+        print(f"{nazwa}: alejki {index.children(nazwa)}")
+        for location in index.in_aisles(nazwa, 1, 2):
+            print(f"  alejka {location.alejka} regał {location.regał} półka {location.polka} "
+                  f"kuweta {location.kuweta}: czujnik {location.sensor_id}, {location.ilosc_sztuk} szt.")
+    conn.close()
@@ -0,0 +1,283 @@
+# ============================================
+# Jeden wątek zapisujący + pula połączeń do odczytu
+# ============================================
+# Kilka wątków piszących do project_manager.db przez własne połączenia walczy
+# o jedną blokadę zapisu SQLite i dostaje "database is locked".
+# DatabaseService ustawia zapisy w kolejkę:
+#   - wszystkie zapisy (add_project, add_task, update_project,
+#     update_task_status, delete_task, ...) wykonuje JEDEN wątek na JEDNYM
+#     połączeniu, więc nie ma z kim walczyć o blokadę
+#   - wątek zapisujący zbiera z kolejki to, co się nazbierało (do max_batch),
+#     i zatwierdza całą paczkę jednym commit (GroupCommitWriter z group_commit.py)
+#   - odczyty idą do puli wątków z połączeniami tylko do odczytu (WAL -
+#     czytają równolegle z zapisem)
+#   - każdy zapis w paczce ma własny SAVEPOINT: wyjątek wycofuje tylko jego
+#     zmiany, reszta paczki idzie dalej
+#   - każde wywołanie zwraca Future; wynik zapisu jest ustawiany dopiero
+#     po commit, więc future.result() oznacza "zapisane", a wyjątek - "nic
+#     z tego wywołania nie zostało w bazie"
+#   - pełna kolejka zapisów blokuje wywołującego (back-pressure), a po
+#     put_timeout sekundach zgłasza WriteQueueFullError
+#
+#   with DatabaseService("project_manager.db") as service:
+#       future = service.add_task((pid, "Zadanie", "", "W trakcie", "2024-01-01", "2024-02-01"))
+#       tasks = service.get_tasks_by_project(pid).result()
+#       task_id = future.result()
+
+import importlib
+import queue
+import sqlite3
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from sqlite3 import Error
+
+import epoch_dates
+import pragma_profiles
+from group_commit import GroupCommitWriter
+
+
+db_tasks = importlib.import_module("5_db_funkctions")
+
+_STOP = object()
+
+
+class WriteQueueFullError(Error):
+    """Kolejka zapisów pełna przez put_timeout sekund"""
+
+
+class DatabaseService:
+    """
+    Zapisy przez jeden wątek z kolejką, odczyty przez pulę połączeń tylko do odczytu
+
+    :param db_file: ścieżka do pliku bazy (nie ":memory:" - każdy wątek ma własne połączenie)
+    :param readers: liczba wątków / połączeń do odczytu
+    :param max_queue: pojemność kolejki zapisów (pełna = wywołujący czeka)
+    :param max_batch: ile zapisów najwyżej w jednej transakcji
+    :param put_timeout: ile sekund czekać na miejsce w kolejce (None = bez limitu)
+    """
+
+    def __init__(self, db_file, readers=4, max_queue=1000, max_batch=500, put_timeout=None):
+        if db_file == ":memory:":
+            raise ValueError("DatabaseService wymaga pliku bazy - baza w pamięci nie jest wspólna dla połączeń")
+        self.db_file = db_file
+        self.max_batch = max_batch
+        self.put_timeout = put_timeout
+        self.batches = 0            # statystyki
+        self.writes = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._closed = False
+
+        # Połączenie zapisujące otwieramy od razu - ustawia WAL, zanim ruszą odczyty
+        self._writer_conn = epoch_dates.connect(db_file, check_same_thread=False)
+        pragma_profiles.apply_profile(self._writer_conn, "balanced")
+        self._writer = threading.Thread(target=self._write_loop, name="db-writer", daemon=True)
+        self._writer.start()
+
+        self._local = threading.local()
+        self._reader_conns = []
+        self._reader_lock = threading.Lock()
+        self._readers = ThreadPoolExecutor(max_workers=readers, thread_name_prefix="db-reader",
+                                           initializer=self._open_reader)
+
+    # ---------- zapisy ----------
+
+    def submit_write(self, func, *args, **kwargs):
+        """
+        Ustaw func(conn, *args) w kolejce zapisów
+        :return: Future z wynikiem func - ustawiany po zatwierdzeniu paczki
+        """
+        if self._closed:
+            raise RuntimeError("DatabaseService jest zamknięty")
+        future = Future()
+        try:
+            self._queue.put((future, func, args, kwargs), timeout=self.put_timeout)
+        except queue.Full:
+            raise WriteQueueFullError(f"Kolejka zapisów pełna ({self._queue.maxsize}) przez {self.put_timeout} s")
+        return future
+
+    def _next_batch(self):
+        """Czekaj na pierwszy zapis, potem dobierz to, co już czeka w kolejce"""
+        batch = [self._queue.get()]
+        while len(batch) < self.max_batch and batch[-1] is not _STOP:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write_loop(self):
+        writer = GroupCommitWriter(self._writer_conn, max_rows=float("inf"), max_delay=None)
+        while True:
+            batch = self._next_batch()
+            stop = batch[-1] is _STOP
+            if stop:
+                batch.pop()
+            done = []
+            for future, func, args, kwargs in batch:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                self._call(writer, future, func, args, kwargs, done)
+            try:
+                writer.flush()
+            except Error as e:
+                # Paczka wycofana w całości - błąd dostaje każdy jej zapis
+                writer.rollback()
+                done = [(future, None, e) for future, _, _ in done]
+            if done:
+                self.batches += 1
+                self.writes += len(done)
+            for future, result, error in done:
+                if error is None:
+                    future.set_result(result)
+                else:
+                    future.set_exception(error)
+            if stop:
+                return
+
+    def _call(self, writer, future, func, args, kwargs, done):
+        """
+        Jeden zapis paczki pod własnym SAVEPOINT - błąd wycofuje tylko jego zmiany
+        Wynik trafia do listy done jako (future, wynik, błąd).
+        """
+        conn = self._writer_conn
+        if not conn.in_transaction:
+            # Jawny BEGIN - RELEASE zewnętrznego SAVEPOINT zatwierdziłby transakcję
+            conn.execute("BEGIN")
+        conn.execute("SAVEPOINT queued_write")
+        try:
+            result = func(writer, *args, **kwargs)
+        except Exception as e:
+            try:
+                conn.execute("ROLLBACK TO queued_write")
+                conn.execute("RELEASE queued_write")
+            except Error as rollback_error:
+                # SQLite wycofał już całą transakcję - przepadły też wcześniejsze zapisy paczki
+                writer.rollback()
+                done[:] = [(earlier, None, rollback_error) for earlier, _, _ in done]
+            done.append((future, None, e))
+            return
+        try:
+            conn.execute("RELEASE queued_write")
+        except Error as e:
+            # Transakcja skończyła się wewnątrz func (np. SQLite wycofał ją po błędzie)
+            writer.rollback()
+            done[:] = [(earlier, None, e) for earlier, _, _ in done]
+            done.append((future, None, e))
+            return
+        done.append((future, result, None))
+
+    # ---------- odczyty ----------
+
+    def _open_reader(self):
+        # check_same_thread=False - close() zamyka połączenia z wątku wywołującego
+        conn = epoch_dates.connect(self.db_file, check_same_thread=False)
+        pragma_profiles.apply_profile(conn, "read-only-analytics")
+        self._local.conn = conn
+        with self._reader_lock:
+            self._reader_conns.append(conn)
+
+    def _read(self, func, args, kwargs):
+        return func(self._local.conn, *args, **kwargs)
+
+    def submit_read(self, func, *args, **kwargs):
+        """
+        Wykonaj func(conn, *args) na jednym z połączeń do odczytu
+        :return: Future z wynikiem func
+        """
+        if self._closed:
+            raise RuntimeError("DatabaseService jest zamknięty")
+        return self._readers.submit(self._read, func, args, kwargs)
+
+    # ---------- zamykanie ----------
+
+    def close(self):
+        """Dokończ zapisy z kolejki i odczyty w toku, zamknij połączenia"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._writer.join()
+        self._writer_conn.close()
+        self._readers.shutdown(wait=True)
+        for conn in self._reader_conns:
+            conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+def _mirror(func, kind):
+    """Metoda zwracająca Future wywołania funkcji modułu przez submit_read() / submit_write()"""
+    def method(self, *args, **kwargs):
+        return getattr(self, kind)(func, *args, **kwargs)
+    method.__name__ = func.__name__
+    method.__doc__ = func.__doc__
+    return method
+
+
+READS = ("get_all_projects", "get_all_tasks", "get_tasks_by_project", "get_tasks_between")
+WRITES = ("add_project", "add_task", "update_project", "update_task_status", "delete_project", "delete_task")
+
+for _name in READS:
+    setattr(DatabaseService, _name, _mirror(getattr(db_tasks, _name), "submit_read"))
+for _name in WRITES:
+    setattr(DatabaseService, _name, _mirror(getattr(db_tasks, _name), "submit_write"))
+
+
+if __name__ == "__main__":
+    import contextlib
+    import io
+    import os
+    import tempfile
+    import time
+
+    path = os.path.join(tempfile.mkdtemp(), "service_demo.db")
+    conn = sqlite3.connect(path)
+    db_tasks.create_tables(conn)
+    conn.close()
+
+    THREADS, PER_THREAD = 8, 2000
+
+    with DatabaseService(path, readers=4, max_queue=1000) as service:
+        project_id = service.add_project(("Projekt wspólny", "2024-01-01", "2024-12-31")).result()
+
+        # 8 wątków jednocześnie dodaje zadania i zmienia ich statusy
+        def worker(n):
+            futures = [service.add_task((project_id, f"Zadanie {n}-{i}", "", "Nowe", "2024-01-01", "2024-02-01"))
+                       for i in range(PER_THREAD)]
+            task_ids = [future.result() for future in futures]
+            updates = [service.update_task_status(task_id, "W trakcie") for task_id in task_ids[::2]]
+            return sum(1 for future in updates if future.result())
+
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):  # funkcje z 5_db_funkctions.py drukują ✓ przy każdym wierszu
+            with ThreadPoolExecutor(max_workers=THREADS) as pool:
+                results = pool.map(worker, range(THREADS))
+                # Odczyty w trakcie zapisów - nie czekają na wątek zapisujący
+                seen = []
+                for _ in range(20):
+                    seen.append(len(service.get_tasks_by_project(project_id).result()))
+                    time.sleep(0.05)
+                updated = sum(results)
+        elapsed = time.perf_counter() - started
+
+        print(f"✓ {service.writes} zapisów z {THREADS} wątków w {elapsed:.2f} s "
+              f"({service.writes / elapsed:,.0f} zapisów/s) w {service.batches} transakcjach")
+        print(f"✓ Zmieniono status {updated} zadań, odczyty w trakcie widziały od {min(seen)} do {max(seen)} zadań")
+        print(f"Zadań w bazie: {len(service.get_all_tasks().result())}")
+
+    # Back-pressure - pełna kolejka i put_timeout
+    with DatabaseService(path, max_queue=1, put_timeout=0.1) as service:
+        started, gate = threading.Event(), threading.Event()
+        service.submit_write(lambda conn: (started.set(), gate.wait()))   # wątek zapisujący czeka
+        started.wait()
+        service.submit_write(lambda conn: None)              # zajmuje jedyne miejsce w kolejce
+        try:
+            service.submit_write(lambda conn: None)
+        except WriteQueueFullError as e:
+            print(f"✓ {e}")
+        gate.set()